@@ -0,0 +1,6 @@
+"""Performance benchmarks for filestat.
+
+Run a benchmark from the repository root, e.g.::
+
+    python -m benchmarks.bench_walker
+"""
@@ -0,0 +1,88 @@
+"""Compare the NumPy and pure-Python content metrics kernels.
+
+Writes an ASCII and a UTF-8 text file, checks that both kernels agree on
+each, and reports MB/s for:
+
+- ``count_lines`` alone (what a scan reads without ``--metrics``),
+- ``content_metrics`` with the "python" kernel,
+- ``content_metrics`` with the "numpy" kernel, when NumPy is installed.
+
+Timings are the best of ``--repeat`` runs with a warm page cache.
+
+Usage::
+
+    python -m benchmarks.bench_metrics [--mb N] [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from filestat.counting import count_lines
+from filestat.metrics import content_metrics, numpy_available
+
+
+# Words of the generated text; the UTF-8 file also uses the accented ones
+ASCII_WORDS = [b"def", b"return", b"self", b"value", b"    ", b"(x):", b"# note", b"\n", b"\n", b"\t"]
+UTF8_WORDS = ASCII_WORDS + [b"caf\xc3\xa9", b"na\xc3\xafve", b"\xe2\x82\xac", b"\xe6\x97\xa5\xe6\x9c\xac"]
+
+
+def write_text(path: str, mb: int, words: list, seed: int = 0) -> None:
+    """Write ``mb`` MiB of space-separated random words."""
+    rng = random.Random(seed)
+    block = b" ".join(rng.choice(words) for _ in range(200000))
+    with open(path, "wb") as f:
+        written = 0
+        while written < mb * 1024 * 1024:
+            f.write(block)
+            written += len(block)
+
+
+def best_of(func, path: str, repeat: int) -> float:
+    """Return the fastest of ``repeat`` runs in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    kernels = ["python", "numpy"] if numpy_available() else ["python"]
+    if len(kernels) == 1:
+        print("NumPy is not installed; timing the python kernel only\n")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, words in (("ascii", ASCII_WORDS), ("utf-8", UTF8_WORDS)):
+            path = os.path.join(workdir, f"{name}.txt")
+            write_text(path, args.mb, words)
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+
+            results = [content_metrics(path, kernel).to_dict() for kernel in kernels]
+            assert all(result == results[0] for result in results), "kernels disagree"
+            assert results[0]["lines"] == count_lines(path), "line counts disagree"
+
+            lines_only = best_of(count_lines, path, args.repeat)
+            print(f"{name} text, {size_mb:.0f} MiB: {results[0]}")
+            print(f"  {'count_lines:':<24}{size_mb / lines_only:10.0f} MB/s")
+            baseline = None
+            for kernel in kernels:
+                seconds = best_of(lambda p: content_metrics(p, kernel), path, args.repeat)
+                speedup = f" ({baseline / seconds:.1f}x python)" if baseline else ""
+                print(f"  {'metrics, ' + kernel + ':':<24}{size_mb / seconds:10.0f} MB/s{speedup}")
+                baseline = baseline or seconds
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
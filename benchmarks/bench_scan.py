@@ -0,0 +1,106 @@
+"""Time analyze_directory end to end, across git revisions.
+
+Generates a tree with ``benchmarks.treegen`` and times
+``FileAnalyzer(root).analyze_directory()`` (serial, default options) for
+the working tree and for each ``--rev``. Every revision is exported with
+``git archive`` and timed in its own child processes, so revisions never
+share imports. Revisions take turns for ``--repeat`` rounds, so drift in
+machine load affects them alike, and the best run of each is reported,
+with a warm page cache since the tree was just written. Speedups are
+relative to the first revision given.
+
+Usage::
+
+    python -m benchmarks.bench_scan [--files N] [--mean-size BYTES] [--repeat N]
+        [--rev REV ...]
+
+For example, ``--rev $(git rev-list --max-parents=0 HEAD)`` compares the
+working tree with the first commit.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.treegen import generate_tree
+
+
+# Child program: times analyze_directory and prints the best run as JSON
+_CHILD = """
+import json, sys, time
+from filestat.analyzer import FileAnalyzer
+root, repeat = sys.argv[1], int(sys.argv[2])
+timings = []
+for _ in range(repeat):
+    start = time.perf_counter()
+    stats = FileAnalyzer(root).analyze_directory()
+    timings.append(time.perf_counter() - start)
+print(json.dumps({"seconds": min(timings), "files": stats["total_files"], "lines": stats["total_lines"]}))
+"""
+
+
+def export_revision(rev: str, target: str) -> None:
+    """Extract the ``filestat`` package of a git revision into ``target``."""
+    archive = subprocess.run(["git", "archive", rev, "filestat"], capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(target)
+
+
+def time_scan(root: str, repeat: int, package_dir: Optional[str] = None) -> Dict[str, float]:
+    """Time a scan in a child process importing filestat from ``package_dir``."""
+    env = dict(os.environ)
+    if package_dir is not None:
+        env["PYTHONPATH"] = package_dir
+    cwd = package_dir or os.getcwd()
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, root, str(repeat)], capture_output=True, text=True, check=True, env=env, cwd=cwd
+    )
+    return json.loads(result.stdout)
+
+
+def main() -> int:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--mean-size", type=int, default=2048)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rev", action="append", default=[], help="Git revision to compare (repeatable)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        root = os.path.join(workdir, "tree")
+        generate_tree(root, files=args.files, mean_size=args.mean_size, binary_ratio=0.1, seed=1)
+
+        packages: List[Tuple[str, Optional[str]]] = []
+        for rev in args.rev:
+            package_dir = os.path.join(workdir, rev.replace("/", "_"))
+            export_revision(rev, package_dir)
+            packages.append((rev, package_dir))
+        packages.append(("working tree", None))
+
+        best: Dict[str, Dict[str, float]] = {}
+        for _ in range(args.repeat):
+            for name, package_dir in packages:
+                result = time_scan(root, 1, package_dir)
+                if name not in best or result["seconds"] < best[name]["seconds"]:
+                    best[name] = result
+        results = [(name, best[name]) for name, _ in packages]
+
+    baseline = results[0][1]["seconds"]
+    print(f"{'revision':<16}{'seconds':>10}{'files/s':>12}{'speedup':>10}  lines")
+    for name, result in results:
+        print(
+            f"{name[:15]:<16}{result['seconds']:10.3f}{result['files'] / result['seconds']:12,.0f}"
+            f"{baseline / result['seconds']:9.2f}x  {result['lines']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Compare cold CLI runs with queries answered by ``filestat serve``.
+
+Generates a tree, starts a query server on it and reports:
+
+- the wall time of ``python -m filestat --format json TREE`` (a cold
+  process and a full scan every time),
+- the same command with ``--server`` (a cold process, warm tree),
+- the latency of requests over one open connection (p50 and p99), with
+  the tree unchanged and after touching a few files between requests.
+
+Usage::
+
+    python -m benchmarks.bench_serve [--files N] [--repeat N] [--jobs N] [--inotify]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_startup import wall_time_ms
+from benchmarks.treegen import generate_tree
+from filestat.server import IndexCache, QueryServer, ServerClient
+
+
+def percentile(timings: list, q: float) -> float:
+    """Return the nearest-rank percentile of a list of timings."""
+    ordered = sorted(timings)
+    return ordered[max(0, int(q * len(ordered) + 0.5) - 1)]
+
+
+def request_ms(client: ServerClient, root: str, repeat: int, touch: int = 0) -> list:
+    """Time ``repeat`` stats requests, rewriting ``touch`` files before each."""
+    files = [os.path.join(dirpath, name) for dirpath, _dirs, names in os.walk(root) for name in names][:touch]
+    timings = []
+    for i in range(repeat):
+        for path in files:
+            with open(path, "a") as f:
+                f.write(f"edit {i}\n")
+        start = time.perf_counter()
+        client.get_stats(root)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> int:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--inotify", action="store_true", help="Serve with inotify instead of stat passes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        root = os.path.join(workdir, "tree")
+        generate_tree(root, files=args.files, mean_size=2048, seed=1)
+        socket_path = os.path.join(workdir, "fs.sock")
+        server = QueryServer(socket_path, IndexCache(jobs=args.jobs, use_inotify=args.inotify))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            jobs = ["-j", str(args.jobs)]
+            cold_ms = wall_time_ms([root, "--format", "json", *jobs], args.repeat)
+
+            with ServerClient(socket_path) as client:
+                start = time.perf_counter()
+                client.get_stats(root)
+                first_ms = (time.perf_counter() - start) * 1000
+                unchanged = request_ms(client, root, args.repeat * 10)
+                edited = request_ms(client, root, args.repeat * 10, touch=10)
+                memory = client.info()["memory_bytes"]
+
+            client_ms = wall_time_ms([root, "--format", "json", "--server", "--socket", socket_path], args.repeat)
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+    print(f"{'tree:':<30}{args.files:>10} files")
+    print(f"{'cold CLI run:':<30}{cold_ms:10.1f} ms (median of {args.repeat})")
+    print(f"{'CLI --server:':<30}{client_ms:10.1f} ms ({cold_ms / client_ms:.1f}x faster)")
+    print(f"{'first request (scan):':<30}{first_ms:10.1f} ms")
+    for name, timings in (("warm request", unchanged), ("warm request, 10 edits", edited)):
+        print(f"{name + ' p50/p99:':<30}{percentile(timings, 0.5):10.1f} / {percentile(timings, 0.99):.1f} ms")
+    print(f"{'estimated warm memory:':<30}{memory / 1024 / 1024:10.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Measure filestat CLI startup time.
+
+Reports the cumulative import time of ``filestat.cli`` (from
+``python -X importtime``) and the wall time of short CLI invocations.
+With ``--max-import-ms`` it exits non-zero when the import budget is
+exceeded or Rich is imported by a machine-readable run, so it can guard
+against startup regressions in CI.
+
+Usage::
+
+    python -m benchmarks.bench_startup [--repeat N] [--max-import-ms MS]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def import_time_us(module: str) -> int:
+    """Return the cumulative import time of ``module`` in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def imported_modules(args: list) -> set:
+    """Return the top-level packages imported by a CLI run."""
+    code = (
+        "import sys, io, contextlib\n"
+        "from filestat.cli import main\n"
+        f"sys.argv = ['filestat'] + {args!r}\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    main()\n"
+        "print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def interpreter_ms(repeat: int) -> float:
+    """Return the median wall time of a bare ``python -c pass`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def wall_time_ms(args: list, repeat: int) -> float:
+    """Return the median wall time of ``python -m filestat ARGS`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "filestat", *args], capture_output=True, check=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--max-import-ms", type=float, help="Fail if importing filestat.cli takes longer")
+    args = parser.parse_args()
+
+    imports = [import_time_us("filestat.cli") for _ in range(args.repeat)]
+    import_ms = statistics.median(imports) / 1000
+    baseline_ms = interpreter_ms(args.repeat)
+
+    with tempfile.TemporaryDirectory() as root:
+        Path(root, "sample.txt").write_text("line\n" * 100)
+        cases = {
+            "--version": ["--version"],
+            "--format json": [root, "--format", "json"],
+            "--format csv": [root, "--format", "csv"],
+            "table (Rich)": [root],
+        }
+        timings = {name: wall_time_ms(case, args.repeat) for name, case in cases.items()}
+        json_modules = imported_modules([root, "--format", "json"])
+
+    print(f"{'import filestat.cli:':<24}{import_ms:8.1f} ms (median of {args.repeat})")
+    print(f"{'python -c pass:':<24}{baseline_ms:8.1f} ms")
+    for name, ms in timings.items():
+        print(f"{name + ':':<24}{ms:8.1f} ms")
+    print(f"{'rich loaded for json:':<24}{'rich' in json_modules!s:>8}")
+
+    failed = "rich" in json_modules
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f"FAIL: import time {import_ms:.1f} ms exceeds {args.max_import_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Compare DirectoryWalker with the original os.walk + Path.stat traversal.
+
+Usage::
+
+    python -m benchmarks.bench_walker [--files N] [--fanout N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from filestat.walker import DirectoryWalker, file_extension
+
+
+def build_tree(root: str, files: int, fanout: int) -> None:
+    """Create ``files`` empty files spread over nested directories.
+
+    Args:
+        root: Directory to populate
+        files: Number of files to create
+        fanout: Files per directory before starting a new subdirectory
+    """
+    extensions = [".py", ".txt", ".json", ".log", ""]
+    directory = Path(root)
+    for i in range(files):
+        if i % fanout == 0:
+            directory = Path(root, *[f"d{i // fanout % 7}", f"sub{i // fanout}"])
+            directory.mkdir(parents=True, exist_ok=True)
+        Path(directory, f"file{i}{extensions[i % len(extensions)]}").touch()
+
+
+def legacy_walk(root: str) -> list:
+    """Traverse the way analyze_directory originally did."""
+    base = Path(root)
+    records = []
+    for dirpath, _dirs, files in os.walk(base):
+        for file in files:
+            file_path = Path(dirpath) / file
+            try:
+                size = file_path.stat().st_size
+            except OSError:
+                continue
+            records.append((str(file_path.relative_to(base)), file_path.suffix, size))
+    return records
+
+
+def scandir_walk(root: str) -> list:
+    """Traverse with DirectoryWalker."""
+    return [
+        (relpath, file_extension(name), st.st_size)
+        for _path, relpath, name, st in DirectoryWalker(root)
+    ]
+
+
+def best_of(func, root: str, repeat: int) -> float:
+    """Return the fastest of ``repeat`` runs in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(root)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--fanout", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, args.files, args.fanout)
+
+        assert legacy_walk(root) == scandir_walk(root), "walkers disagree"
+
+        legacy = best_of(legacy_walk, root, args.repeat)
+        scandir = best_of(scandir_walk, root, args.repeat)
+
+    print(f"{'files:':<18}{args.files}")
+    print(f"{'os.walk + Path:':<18}{legacy * 1000:8.1f} ms  ({args.files / legacy:,.0f} files/s)")
+    print(f"{'DirectoryWalker:':<18}{scandir * 1000:8.1f} ms  ({args.files / scandir:,.0f} files/s)")
+    print(f"{'speedup:':<18}{legacy / scandir:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
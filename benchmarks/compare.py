@@ -0,0 +1,46 @@
+"""Compare two result files written by ``benchmarks.harness``.
+
+Prints each case's median time in both files and the speedup of the
+second over the first (above 1.0 means the second run was faster).
+
+Usage::
+
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json
+"""
+
+import argparse
+import json
+import sys
+
+
+def main() -> int:
+    """Print a side-by-side comparison of two result files."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    if baseline["meta"]["tree"]["params"] != candidate["meta"]["tree"]["params"]:
+        print("warning: the runs used different tree parameters", file=sys.stderr)
+
+    before = {result["case"]: result for result in baseline["results"]}
+    print(f"baseline  {baseline['meta']['commit']}")
+    print(f"candidate {candidate['meta']['commit']}")
+    print(f"{'case':<26}{'baseline s':>12}{'candidate s':>13}{'speedup':>9}")
+    for result in candidate["results"]:
+        old = before.get(result["case"])
+        if old is None:
+            print(f"{result['case']:<26}{'-':>12}{result['seconds']:>13.3f}{'-':>9}")
+            continue
+        speedup = old["seconds"] / result["seconds"] if result["seconds"] else float("inf")
+        print(f"{result['case']:<26}{old['seconds']:>12.3f}{result['seconds']:>13.3f}{speedup:>8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Time FileAnalyzer and the CLI on a generated tree and save the results.
+
+Builds a synthetic tree with ``benchmarks.treegen`` (excluded from the
+timings), then runs each case in a fresh child process so peak RSS is
+measured per case:
+
+- ``get_file_info`` on one large text file
+- ``analyze_directory`` serially and with a thread pool
+- ``python -m filestat --format json`` end to end, including startup
+
+Reports files/s, MB/s and peak RSS, and writes them with the commit,
+interpreter and tree parameters to a JSON file. Compare two result files
+with ``python -m benchmarks.compare``. Timings are taken with a warm page
+cache, since the tree was just written.
+
+Usage::
+
+    python -m benchmarks.harness [--files N] [--depth N] [--big-file-mb N]
+        [--jobs N] [--repeat N] [--seed N] [--output results.json]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Child program for in-process cases: prints the seconds spent in the call
+# so that interpreter startup and imports are not counted.
+_CASE_CODE = """
+import json, sys, time
+from filestat.analyzer import FileAnalyzer
+analyzer = FileAnalyzer(sys.argv[1], **json.loads(sys.argv[3]))
+start = time.perf_counter()
+getattr(analyzer, sys.argv[2])()
+print(time.perf_counter() - start)
+"""
+
+
+# Child program that calls a benchmarks.treegen function. Generating in a
+# child keeps this process small: on Linux a child's peak RSS starts from
+# the RSS of the parent that forked it.
+_GENERATE_CODE = """
+import json, sys
+from benchmarks import treegen
+print(json.dumps(getattr(treegen, sys.argv[1])(*json.loads(sys.argv[2]), **json.loads(sys.argv[3]))))
+"""
+
+
+def generate(function: str, *args: Any, **kwargs: Any) -> Any:
+    """Call a ``benchmarks.treegen`` function in a child and return its result."""
+    result = subprocess.run(
+        [sys.executable, "-c", _GENERATE_CODE, function, json.dumps(args), json.dumps(kwargs)],
+        stdout=subprocess.PIPE, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def _maxrss_bytes(usage: Any) -> int:
+    """Convert ``ru_maxrss`` to bytes (it is kilobytes on Linux, bytes on macOS)."""
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+def run_child(argv: List[str]) -> Tuple[float, str, Optional[int]]:
+    """Run a child process and measure it.
+
+    Args:
+        argv: Command to run
+
+    Returns:
+        Tuple of wall time in seconds, captured stdout and the child's peak
+        RSS in bytes (None where ``os.wait4`` is unavailable)
+
+    Raises:
+        subprocess.CalledProcessError: If the child exits non-zero
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(argv, stdout=subprocess.PIPE, text=True)
+    if not hasattr(os, "wait4"):
+        stdout, _ = proc.communicate()
+        elapsed = time.perf_counter() - start
+        rss = None
+    else:
+        stdout = proc.stdout.read()
+        proc.stdout.close()
+        _pid, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        rss = _maxrss_bytes(usage)
+
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, argv)
+    return elapsed, stdout, rss
+
+
+def analyzer_case(path: str, method: str, **kwargs: Any) -> List[str]:
+    """Return a command that times one FileAnalyzer method in a child."""
+    return [sys.executable, "-c", _CASE_CODE, path, method, json.dumps(kwargs)]
+
+
+def measure(argv: List[str], repeat: int, in_process: bool) -> Dict[str, Any]:
+    """Run a case ``repeat`` times.
+
+    Args:
+        argv: Command to run
+        repeat: Number of runs
+        in_process: Whether the child reports its own timing on stdout
+
+    Returns:
+        Median and minimum seconds, and the highest peak RSS in bytes
+    """
+    timings = []
+    peaks = []
+    for _ in range(repeat):
+        elapsed, stdout, rss = run_child(argv)
+        timings.append(float(stdout.strip()) if in_process else elapsed)
+        if rss is not None:
+            peaks.append(rss)
+    return {
+        "seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        "peak_rss_bytes": max(peaks) if peaks else None,
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Return the current commit hash, with "-dirty" for local changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def run_benchmarks(
+    root: str,
+    files: int,
+    depth: int,
+    big_file_mb: int,
+    jobs: int,
+    repeat: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """Generate a tree under ``root`` and time every case.
+
+    Args:
+        root: Empty scratch directory
+        files: Number of files in the tree
+        depth: Directory levels in the tree
+        big_file_mb: Size of the file used for get_file_info, in MiB
+        jobs: Worker threads for the parallel case
+        repeat: Runs per case
+        seed: Random seed for the tree
+
+    Returns:
+        Result document with "meta" and "results"
+    """
+    tree = os.path.join(root, "tree")
+    manifest = generate("generate_tree", tree, files=files, depth=depth, seed=seed)
+    big_file = os.path.join(root, "big.txt")
+    big_bytes = generate("generate_text_file", big_file, big_file_mb * 1024 * 1024, seed=seed)
+
+    cases = [
+        ("get_file_info", analyzer_case(big_file, "get_file_info"), True, 1, big_bytes),
+        ("analyze_directory", analyzer_case(tree, "analyze_directory"), True,
+         manifest["files"], manifest["bytes"]),
+        (f"analyze_directory -j {jobs}", analyzer_case(tree, "analyze_directory", jobs=jobs), True,
+         manifest["files"], manifest["bytes"]),
+        ("cli --format json", [sys.executable, "-m", "filestat", tree, "--format", "json"], False,
+         manifest["files"], manifest["bytes"]),
+    ]
+
+    results = []
+    for name, argv, in_process, case_files, case_bytes in cases:
+        result = measure(argv, repeat, in_process)
+        seconds = result["seconds"]
+        result.update({
+            "case": name,
+            "files": case_files,
+            "bytes": case_bytes,
+            "files_per_s": case_files / seconds if seconds else None,
+            "mb_per_s": case_bytes / (1024 * 1024) / seconds if seconds else None,
+        })
+        results.append(result)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+            "tree": manifest,
+            "big_file_bytes": big_bytes,
+        },
+        "results": results,
+    }
+
+
+def print_results(document: Dict[str, Any]) -> None:
+    """Print a results document as a table."""
+    meta = document["meta"]
+    tree = meta["tree"]
+    print(f"commit {meta['commit']}  python {meta['python']}  "
+          f"tree {tree['files']} files / {tree['bytes'] / (1024 * 1024):.1f} MiB")
+    print(f"{'case':<26}{'seconds':>10}{'files/s':>12}{'MB/s':>10}{'peak RSS MB':>13}")
+    for result in document["results"]:
+        rss = result["peak_rss_bytes"]
+        rss_text = f"{rss / (1024 * 1024):.1f}" if rss is not None else "n/a"
+        print(f"{result['case']:<26}{result['seconds']:>10.3f}{result['files_per_s']:>12.0f}"
+              f"{result['mb_per_s']:>10.1f}{rss_text:>13}")
+
+
+def main() -> int:
+    """Run the benchmark suite from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--big-file-mb", type=int, default=64)
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="filestat-bench-") as root:
+        document = run_benchmarks(
+            root, args.files, args.depth, args.big_file_mb, args.jobs, args.repeat, args.seed
+        )
+
+    print_results(document)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
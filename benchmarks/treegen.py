@@ -0,0 +1,207 @@
+"""Deterministic synthetic directory-tree generator for benchmarks.
+
+The same parameters and seed always produce byte-identical trees, so
+results from different commits are comparable.
+
+Usage::
+
+    python -m benchmarks.treegen DIR [--files N] [--depth N] [--fanout N]
+        [--mean-size BYTES] [--binary-ratio R] [--long-line-ratio R] [--seed N]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+from typing import Any, Dict, List
+
+
+TEXT_EXTENSIONS = [".py", ".txt", ".md", ".json", ".log", ".csv"]
+BINARY_EXTENSIONS = [".png", ".gz", ".so", ".bin", ""]
+
+# Leading bytes written to binary files, by extension
+_BINARY_HEADERS = {
+    ".png": b"\x89PNG\r\n\x1a\n",
+    ".gz": b"\x1f\x8b\x08\x00",
+    ".so": b"\x7fELF\x02\x01\x01\x00",
+    ".bin": b"\x00\x00\x00\x00",
+    "": b"\x00data\x00",
+}
+
+# Size of the shared content pools that file contents are sliced from
+_POOL_SIZE = 4 * 1024 * 1024
+
+_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua def class return import self value "
+    "error warning info debug request response user file path size line count"
+).split()
+
+
+def _text_pool(rng: random.Random) -> bytes:
+    """Build a block of text lines of varied length."""
+    lines: List[str] = []
+    size = 0
+    while size < _POOL_SIZE:
+        line = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(0, 16)))
+        lines.append(line)
+        size += len(line) + 1
+    return ("\n".join(lines) + "\n").encode("ascii")
+
+
+def _directories(depth: int, fanout: int) -> List[str]:
+    """Return relative paths of a complete tree of directories."""
+    dirs = [""]
+    level = [""]
+    for d in range(depth):
+        level = [os.path.join(parent, f"dir{d}_{i}") for parent in level for i in range(fanout)]
+        dirs.extend(level)
+    return dirs
+
+
+def generate_tree(
+    root: str,
+    files: int = 1000,
+    depth: int = 3,
+    fanout: int = 4,
+    mean_size: int = 4096,
+    size_sigma: float = 1.5,
+    max_size: int = 64 * 1024 * 1024,
+    binary_ratio: float = 0.1,
+    long_line_ratio: float = 0.01,
+    long_line_length: int = 100_000,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Create a synthetic directory tree.
+
+    File sizes follow a log-normal distribution with the given mean.
+    Text files are sliced from a shared pool of short lines; a fraction of
+    them instead consists of very long lines. Binary files start with a
+    real magic number and continue with random bytes.
+
+    Args:
+        root: Directory to populate (created if missing)
+        files: Number of files to create
+        depth: Directory levels below the root
+        fanout: Subdirectories per directory
+        mean_size: Mean file size in bytes
+        size_sigma: Log-normal shape parameter (larger means a longer tail)
+        max_size: Upper bound on a single file's size
+        binary_ratio: Fraction of files that are binary
+        long_line_ratio: Fraction of text files made of very long lines
+        long_line_length: Length of each line in long-line files
+        seed: Random seed
+
+    Returns:
+        Manifest with the parameters and totals of the generated tree
+    """
+    rng = random.Random(seed)
+    text_pool = _text_pool(rng)
+    binary_pool = rng.randbytes(_POOL_SIZE)
+    long_line = (b"x" * (long_line_length - 1)) + b"\n"
+
+    dirs = _directories(depth, fanout)
+    for directory in dirs:
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+    mu = math.log(max(mean_size, 1)) - size_sigma ** 2 / 2
+    manifest = {"files": 0, "dirs": len(dirs) - 1, "bytes": 0, "text_files": 0,
+                "binary_files": 0, "long_line_files": 0}
+
+    for i in range(files):
+        size = min(int(rng.lognormvariate(mu, size_sigma)), max_size)
+        directory = dirs[rng.randrange(len(dirs))]
+
+        if rng.random() < binary_ratio:
+            ext = rng.choice(BINARY_EXTENSIONS)
+            header = _BINARY_HEADERS[ext]
+            body = _repeat_slice(binary_pool, rng.randrange(_POOL_SIZE), max(size - len(header), 0))
+            content = header + body
+            manifest["binary_files"] += 1
+        elif rng.random() < long_line_ratio:
+            ext = ".log"
+            content = _repeat_slice(long_line, 0, max(size, long_line_length))
+            manifest["text_files"] += 1
+            manifest["long_line_files"] += 1
+        else:
+            ext = rng.choice(TEXT_EXTENSIONS)
+            content = _repeat_slice(text_pool, rng.randrange(_POOL_SIZE), size)
+            manifest["text_files"] += 1
+
+        with open(os.path.join(root, directory, f"file{i:07d}{ext}"), "wb") as f:
+            f.write(content)
+        manifest["files"] += 1
+        manifest["bytes"] += len(content)
+
+    manifest["params"] = {
+        "files": files, "depth": depth, "fanout": fanout, "mean_size": mean_size,
+        "size_sigma": size_sigma, "max_size": max_size, "binary_ratio": binary_ratio,
+        "long_line_ratio": long_line_ratio, "long_line_length": long_line_length, "seed": seed,
+    }
+    return manifest
+
+
+def generate_text_file(path: str, size: int, seed: int = 0) -> int:
+    """Write a single text file of short lines, e.g. for large-file cases.
+
+    Args:
+        path: File to create
+        size: Size in bytes
+        seed: Random seed
+
+    Returns:
+        Number of bytes written
+    """
+    pool = _text_pool(random.Random(seed))
+    with open(path, "wb") as f:
+        written = 0
+        while written < size:
+            chunk = pool[:size - written]
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def _repeat_slice(pool: bytes, start: int, size: int) -> bytes:
+    """Return ``size`` bytes from ``pool`` starting at ``start``, wrapping around."""
+    out = bytearray()
+    while len(out) < size:
+        chunk = pool[start:start + size - len(out)]
+        out += chunk
+        start = 0
+    return bytes(out)
+
+
+def main() -> None:
+    """Generate a tree from the command line and print its manifest."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--mean-size", type=int, default=4096)
+    parser.add_argument("--size-sigma", type=float, default=1.5)
+    parser.add_argument("--binary-ratio", type=float, default=0.1)
+    parser.add_argument("--long-line-ratio", type=float, default=0.01)
+    parser.add_argument("--long-line-length", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    manifest = generate_tree(
+        args.root,
+        files=args.files,
+        depth=args.depth,
+        fanout=args.fanout,
+        mean_size=args.mean_size,
+        size_sigma=args.size_sigma,
+        binary_ratio=args.binary_ratio,
+        long_line_ratio=args.long_line_ratio,
+        long_line_length=args.long_line_length,
+        seed=args.seed,
+    )
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Running totals for directory scans."""
+
+import os
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from filestat.counting import BINARY
+from filestat.histogram import LogHistogram, distribution_stats
+from filestat.rollup import DirectoryRollup
+from filestat.topk import TopK
+
+
+if TYPE_CHECKING:
+    from filestat.metrics import ContentMetrics
+
+
+class DirectoryAggregate:
+    """Accumulates directory statistics one file at a time.
+
+    ``to_stats`` can be called at any point to get a snapshot in the same
+    shape ``FileAnalyzer.analyze_directory`` returns.
+    """
+
+    def __init__(self, top: int = 5, depth: Optional[int] = None):
+        """Initialize empty totals.
+
+        Args:
+            top: Number of files to keep by size and by line count
+            depth: Directory levels to include in a per-directory rollup
+                tree, or None to skip the rollup
+        """
+        self.total_files = 0
+        self.total_dirs = 0
+        self.total_size_bytes = 0
+        self.physical_size_bytes = 0
+        self.total_lines = 0
+        self.text_files = 0
+        self.text_size_bytes = 0
+        self.binary_files = 0
+        self.binary_size_bytes = 0
+        self.file_types: Dict[str, int] = defaultdict(int)
+        self.largest = TopK(top)
+        self.longest = TopK(top)
+        self.size_histograms: Dict[str, LogHistogram] = defaultdict(LogHistogram)
+        self.line_histograms: Dict[str, LogHistogram] = defaultdict(LogHistogram)
+        # False when per-file line counts are not known (not counted or
+        # only estimated), so there is no line distribution
+        self.track_lines = True
+        # True in metrics mode, where add_content is called for every text
+        # file (see FileAnalyzer)
+        self.track_content = False
+        self.total_words = 0
+        self.total_chars = 0
+        self.max_line_length = 0
+        self.max_line_path: Optional[str] = None
+        self.cache: Dict[str, Any] = {}
+        self.profile: Dict[str, Any] = {}
+        self.pruned: Dict[str, int] = {}
+        self.links: Dict[str, int] = {}
+        # Set by scans with limits or stopped early (see FileAnalyzer)
+        self.coverage: Dict[str, Any] = {}
+        self.line_count: Dict[str, Any] = {}
+        self.duplicates: Dict[str, Any] = {}
+        self.depth = depth
+        self.rollup = DirectoryRollup() if depth is not None else None
+
+    def add(self, relpath: str, extension: str, size: int, lines: int, physical: Optional[int] = None) -> None:
+        """Add one file to the totals.
+
+        Args:
+            relpath: Path relative to the scanned directory
+            extension: File extension, or "no_ext"
+            size: Apparent size in bytes
+            lines: Line count, or BINARY for binary files
+            physical: Bytes allocated on disk, or None to use ``size``
+        """
+        self.total_size_bytes += size
+        self.physical_size_bytes += size if physical is None else physical
+        self.file_types[extension] += 1
+        self.size_histograms[extension].add(size)
+        if self.rollup is not None:
+            self.rollup.add(relpath, size, max(lines, 0))
+
+        if lines == BINARY:
+            self.binary_files += 1
+            self.binary_size_bytes += size
+            if size > self.largest.floor:
+                self.largest.push(size, relpath, 0)
+            return
+
+        self.text_files += 1
+        self.text_size_bytes += size
+        self.total_lines += lines
+        if self.track_lines:
+            self.line_histograms[extension].add(lines)
+        # Most files rank below both top-K lists; skip those pushes
+        if size > self.largest.floor:
+            self.largest.push(size, relpath, lines)
+        if lines > self.longest.floor:
+            self.longest.push(lines, relpath, size)
+
+    def add_content(self, relpath: str, metrics: "ContentMetrics") -> None:
+        """Add the content metrics of a text file already passed to ``add``.
+
+        Args:
+            relpath: Path relative to the scanned directory
+            metrics: Words, characters and longest line of the file
+        """
+        self.total_words += metrics.words
+        self.total_chars += metrics.chars
+        if metrics.max_line_length > self.max_line_length:
+            self.max_line_length = metrics.max_line_length
+            self.max_line_path = relpath
+
+    def merge(self, other: "DirectoryAggregate", prefix: str = "") -> None:
+        """Add the totals of another aggregate, e.g. of another scan root.
+
+        Counters, file types, size and line distributions, content
+        metrics, pruning and link counts and the largest/longest lists are
+        combined. The rollup tree, cache statistics, line estimate,
+        duplicates, coverage and profile are per-scan and are not merged.
+
+        Args:
+            other: Aggregate to merge in
+            prefix: Prepended to the relative paths of the merged files
+        """
+        self.total_files += other.total_files
+        self.total_dirs += other.total_dirs
+        self.total_size_bytes += other.total_size_bytes
+        self.physical_size_bytes += other.physical_size_bytes
+        self.total_lines += other.total_lines
+        self.text_files += other.text_files
+        self.text_size_bytes += other.text_size_bytes
+        self.binary_files += other.binary_files
+        self.binary_size_bytes += other.binary_size_bytes
+        for extension, count in other.file_types.items():
+            self.file_types[extension] += count
+        for extension, histogram in other.size_histograms.items():
+            self.size_histograms[extension].merge(histogram)
+        for extension, histogram in other.line_histograms.items():
+            self.line_histograms[extension].merge(histogram)
+        self.track_lines = self.track_lines and other.track_lines
+        self.track_content = self.track_content or other.track_content
+        self.total_words += other.total_words
+        self.total_chars += other.total_chars
+        if other.max_line_length > self.max_line_length:
+            self.max_line_length = other.max_line_length
+            self.max_line_path = prefix + other.max_line_path
+        for key, count in other.pruned.items():
+            self.pruned[key] = self.pruned.get(key, 0) + count
+        for key, count in other.links.items():
+            self.links[key] = self.links.get(key, 0) + count
+        self.largest.merge(other.largest, prefix)
+        self.longest.merge(other.longest, prefix)
+
+    def to_stats(self) -> Dict[str, Any]:
+        """Build a statistics dictionary from the current totals.
+
+        Returns:
+            Dictionary with directory analysis results
+        """
+        stats = {
+            "total_files": self.total_files,
+            "total_dirs": self.total_dirs,
+            "total_size_bytes": self.total_size_bytes,
+            "physical_size_bytes": self.physical_size_bytes,
+            "total_lines": self.total_lines,
+            "text_files": self.text_files,
+            "text_size_bytes": self.text_size_bytes,
+            "binary_files": self.binary_files,
+            "binary_size_bytes": self.binary_size_bytes,
+            "file_types": dict(self.file_types),
+            "largest_files": [
+                _file_entry(relpath, size, lines)
+                for size, relpath, lines in self.largest.items()
+            ],
+            "longest_files": [
+                _file_entry(relpath, size, lines)
+                for lines, relpath, size in self.longest.items()
+            ],
+            "distributions": distribution_stats(
+                self.size_histograms, self.line_histograms if self.track_lines else None
+            ),
+            "is_directory": True,
+            "total_size_kb": round(self.total_size_bytes / 1024, 2),
+            "total_size_mb": round(self.total_size_bytes / (1024 * 1024), 2),
+        }
+        if self.track_content:
+            stats["content_metrics"] = {
+                "lines": self.total_lines,
+                "words": self.total_words,
+                "chars": self.total_chars,
+                "bytes": self.text_size_bytes,
+                "max_line_length": self.max_line_length,
+                "max_line_path": self.max_line_path,
+            }
+        if self.cache:
+            stats["cache"] = dict(self.cache)
+        if self.pruned:
+            stats["pruned"] = dict(self.pruned)
+        if self.links:
+            stats["links"] = dict(self.links)
+        if self.coverage:
+            stats["incomplete"] = self.coverage["stopped_by"] is not None
+            stats["coverage"] = dict(self.coverage)
+        if self.line_count:
+            stats["line_count"] = dict(self.line_count)
+        if self.duplicates:
+            stats["duplicates"] = self.duplicates
+        if self.profile:
+            stats["profile"] = self.profile
+        if self.rollup is not None:
+            stats["directory_tree"] = self.rollup.tree(self.depth, self.largest.k)
+
+        return stats
+
+
+def _file_entry(relpath: str, size: int, lines: int) -> Dict[str, Any]:
+    """Build a file entry for the largest/longest file lists."""
+    return {
+        "name": os.path.basename(relpath),
+        "size_bytes": size,
+        "lines": lines,
+        "path": relpath,
+    }
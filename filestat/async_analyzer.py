@@ -0,0 +1,193 @@
+"""Asyncio API for scanning without blocking the event loop."""
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Union
+from filestat.aggregate import DirectoryAggregate
+from filestat.analyzer import BATCH_SIZE, FileAnalyzer
+
+
+ProgressCallback = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+def _pull(iterator: Iterator[Any], size: int) -> List[Any]:
+    """Advance an iterator by up to ``size`` items."""
+    return list(islice(iterator, size))
+
+
+class AsyncFileAnalyzer:
+    """Scans files and directories for use from asyncio code.
+
+    The scan runs the same code as ``FileAnalyzer``: directory listing and
+    aggregation happen on one dedicated scan thread, and file reads on a
+    pool of ``concurrency`` worker threads. The event loop only waits for
+    one batch of files at a time, so it stays responsive. Between batches
+    it can take progress snapshots, and it can stop the scan when the
+    awaiting task is cancelled or times out. Results have the same shape
+    as ``FileAnalyzer.analyze_directory``.
+
+    Cancellation takes effect at the next batch boundary on the event
+    loop. The scan thread finishes the batch it is working on in the
+    background and then closes the scan, which also closes the cache.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        concurrency: int = 4,
+        batch_size: int = BATCH_SIZE,
+        **options: Any,
+    ):
+        """Initialize the analyzer.
+
+        Args:
+            path: Path to file or directory to analyze
+            concurrency: Number of worker threads reading files (1 reads
+                on the scan thread)
+            batch_size: Files scanned between two checks for progress
+                and cancellation
+            **options: Other FileAnalyzer options (everything except
+                ``jobs``)
+
+        Raises:
+            FileNotFoundError: If the path does not exist
+            ValueError: If concurrency, batch_size or an option is invalid
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be 1 or greater, got {concurrency}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be 1 or greater, got {batch_size}")
+        self.analyzer = FileAnalyzer(path, jobs=concurrency, **options)
+        self.batch_size = batch_size
+
+    @property
+    def path(self):
+        """Path being analyzed."""
+        return self.analyzer.path
+
+    async def iter_progress(self, interval: float = 1.0) -> AsyncIterator[Dict[str, Any]]:
+        """Scan the directory, yielding running statistics.
+
+        Every snapshot has the same shape as ``analyze_directory`` output
+        plus a ``complete`` flag, which is only True for the last one.
+
+        Args:
+            interval: Minimum number of seconds between snapshots
+
+        Yields:
+            Statistics dictionaries
+
+        Raises:
+            NotADirectoryError: If path is not a directory
+        """
+        loop = asyncio.get_running_loop()
+        aggregate = DirectoryAggregate(self.analyzer.top, self.analyzer.depth)
+        # One thread owns the scan generator, so the SQLite cache it opens
+        # is only ever used from that thread
+        driver = ThreadPoolExecutor(max_workers=1, thread_name_prefix="filestat-scan")
+        scan = self.analyzer._scan(aggregate)
+        next_checkpoint = loop.time() + interval
+
+        try:
+            while True:
+                batch = await loop.run_in_executor(driver, _pull, scan, self.batch_size)
+                if len(batch) < self.batch_size:
+                    break
+                if loop.time() >= next_checkpoint:
+                    next_checkpoint = loop.time() + interval
+                    yield {**aggregate.to_stats(), "complete": False}
+        finally:
+            # Runs after any batch still in flight, on the same thread
+            driver.submit(scan.close)
+            driver.shutdown(wait=False)
+
+        yield {**aggregate.to_stats(), "complete": True}
+
+    async def analyze_directory(
+        self,
+        timeout: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None,
+        interval: float = 1.0,
+    ) -> Dict[str, Any]:
+        """Analyze the directory.
+
+        Args:
+            timeout: Seconds after which the scan is stopped and
+                asyncio.TimeoutError is raised, or None to wait indefinitely
+            progress: Called (and awaited, if it returns an awaitable)
+                with a running statistics snapshot at most every
+                ``interval`` seconds
+            interval: Minimum number of seconds between progress calls
+
+        Returns:
+            Dictionary with directory analysis results
+
+        Raises:
+            NotADirectoryError: If path is not a directory
+            asyncio.TimeoutError: If the timeout expires first
+        """
+
+        async def run() -> Dict[str, Any]:
+            async for stats in self.iter_progress(interval):
+                if stats.pop("complete"):
+                    break
+                if progress is not None:
+                    result = progress(stats)
+                    if inspect.isawaitable(result):
+                        await result
+            return stats
+
+        if timeout is None:
+            return await run()
+        return await asyncio.wait_for(run(), timeout)
+
+    async def get_file_info(self) -> Dict[str, Any]:
+        """Get statistics for a single file on a worker thread.
+
+        Returns:
+            Dictionary with file information
+
+        Raises:
+            IsADirectoryError: If path is a directory
+        """
+        return await asyncio.to_thread(self.analyzer.get_file_info)
+
+    async def get_stats(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Get appropriate statistics for the path (file or directory).
+
+        Args:
+            timeout: Seconds after which the scan is stopped and
+                asyncio.TimeoutError is raised, or None to wait indefinitely
+
+        Returns:
+            File or directory statistics
+        """
+        if self.path.is_file():
+            return await asyncio.wait_for(self.get_file_info(), timeout)
+        return await self.analyze_directory(timeout)
+
+
+async def analyze_directory_async(
+    path: str,
+    timeout: Optional[float] = None,
+    progress: Optional[ProgressCallback] = None,
+    interval: float = 1.0,
+    **options: Any,
+) -> Dict[str, Any]:
+    """Analyze a directory without blocking the event loop.
+
+    Args:
+        path: Directory to analyze
+        timeout: Seconds after which the scan is stopped and
+            asyncio.TimeoutError is raised, or None to wait indefinitely
+        progress: Progress callback (see ``AsyncFileAnalyzer.analyze_directory``)
+        interval: Minimum number of seconds between progress calls
+        **options: AsyncFileAnalyzer options, e.g. ``concurrency``
+
+    Returns:
+        Dictionary with directory analysis results
+    """
+    analyzer = AsyncFileAnalyzer(path, **options)
+    return await analyzer.analyze_directory(timeout, progress, interval)
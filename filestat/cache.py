@@ -0,0 +1,175 @@
+"""Persistent line-count cache for incremental scans."""
+
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Number of queued writes before they are flushed to the database
+FLUSH_SIZE = 1000
+
+# Bumped whenever stored values change meaning; older caches are discarded.
+# Version 2: binary files are stored with lines = counting.BINARY.
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    scan INTEGER NOT NULL,
+    PRIMARY KEY (dev, ino)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_path ON files (path);
+"""
+
+
+def _signed(value: int) -> int:
+    """Map an unsigned 64-bit stat field onto SQLite's signed integers."""
+    if value >= 1 << 63:
+        return value - (1 << 64)
+    return value
+
+
+class LineCountCache:
+    """SQLite-backed store of per-file line counts.
+
+    Entries are keyed by ``(st_dev, st_ino)`` and are only reused while
+    the file's size and ``st_mtime_ns`` are unchanged. Every lookup marks
+    the entry as seen by the current scan, so entries for files that have
+    disappeared can be evicted afterwards with ``evict_missing``.
+    """
+
+    def __init__(self, path: str):
+        """Open or create a cache database.
+
+        Args:
+            path: Location of the cache file
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._scan = time.time_ns()
+        self._touched: List[Tuple[int, str, int, int]] = []
+        self._stored: Dict[Tuple[int, int], Tuple[int, int, int, int, int, str, int]] = {}
+        self._conn = sqlite3.connect(path)
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._conn.executescript(
+                f"DROP TABLE IF EXISTS files; PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+        self._conn.executescript(_SCHEMA)
+
+    def lookup(self, path: str, st: os.stat_result) -> Optional[int]:
+        """Return the cached line count for a file if it is unchanged.
+
+        Args:
+            path: Path of the file
+            st: Current stat result of the file
+
+        Returns:
+            Cached line count, or None on a miss
+        """
+        dev, ino = _signed(st.st_dev), _signed(st.st_ino)
+        pending = self._stored.get((dev, ino))
+        if pending is not None:
+            row = pending[2:5]
+        else:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, lines FROM files WHERE dev = ? AND ino = ?",
+                (dev, ino),
+            ).fetchone()
+
+        if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touched.append((self._scan, path, dev, ino))
+        if len(self._touched) >= FLUSH_SIZE:
+            self.flush()
+        return row[2]
+
+    def store(self, path: str, st: os.stat_result, lines: int) -> None:
+        """Record the line count for a file.
+
+        Args:
+            path: Path of the file
+            st: Stat result the count was taken against
+            lines: Number of lines in the file
+        """
+        dev, ino = _signed(st.st_dev), _signed(st.st_ino)
+        self._stored[(dev, ino)] = (dev, ino, st.st_size, st.st_mtime_ns, lines, path, self._scan)
+        if len(self._stored) >= FLUSH_SIZE:
+            self.flush()
+
+    def evict_missing(self, root: str) -> int:
+        """Delete entries below ``root`` that the current scan did not see.
+
+        Only call this after a complete scan of ``root``.
+
+        Args:
+            root: Absolute path of the scanned directory
+
+        Returns:
+            Number of evicted entries
+        """
+        self.flush()
+        prefix = root.rstrip(os.sep) + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        cursor = self._conn.execute(
+            "DELETE FROM files WHERE path >= ? AND path < ? AND scan != ?",
+            (prefix, upper, self._scan),
+        )
+        self.evicted += cursor.rowcount
+        return cursor.rowcount
+
+    def flush(self) -> None:
+        """Write queued updates to the database."""
+        with self._conn:
+            if self._touched:
+                self._conn.executemany(
+                    "UPDATE files SET scan = ?, path = ? WHERE dev = ? AND ino = ?",
+                    self._touched,
+                )
+                self._touched = []
+            if self._stored:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    list(self._stored.values()),
+                )
+                self._stored = {}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss statistics for this session.
+
+        Returns:
+            Dictionary with hits, misses, evicted and hit_rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Flush pending writes and close the database."""
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> "LineCountCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
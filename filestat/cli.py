@@ -1,10 +1,20 @@
-"""Command-line interface for File Statistics Analyzer."""
+"""Command-line interface for File Statistics Analyzer.
 
+Rich (used for table output) and the exporters are imported lazily, so
+``--version`` and the machine-readable formats start quickly.
+"""
+
+import os
 import sys
+import time
 import argparse
 from pathlib import Path
-from filestat.analyzer import FileAnalyzer
-from filestat.formatter import format_output, console
+from typing import Any, Dict, Iterator, List, Optional
+from filestat.analyzer import EXECUTORS, FileAnalyzer
+from filestat.index import FileIndex
+from filestat.metrics import KERNELS
+from filestat.multiroot import MultiRootAnalyzer, read_path_list
+from filestat.sampling import SAMPLE_SIZE
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -22,13 +32,47 @@ Examples:
   filestat path/to/file.txt          Analyze a single file
   filestat path/to/directory         Analyze a directory
   filestat .                          Analyze current directory
+  filestat proj1 proj2 proj3          Analyze several directories in one scan
+  filestat --from-file dirs.txt       Analyze the directories listed in a file
+  filestat -j 8 path/to/directory    Count lines with 8 worker threads
+  filestat --cache ~/.filestat.db .   Reuse line counts of unchanged files
+  filestat --format json . | jq      Print statistics as JSON
+  filestat --format csv . > files.csv Write one CSV row per file
+  filestat --format ndjson . | jq    Stream one JSON line per file
+  filestat --depth 2 .                Show the heaviest subdirectories as a tree
+  filestat --profile .                Show where the scan spends its time
+  filestat --no-lines /data           Sizes and file types only, no file is opened
+  filestat --duplicates ~/Downloads   List duplicate files and reclaimable space
+  filestat --estimate-lines /data     Estimate total lines from a sample per extension
+  filestat --metrics src/             Also count words, characters and the longest line
+  filestat --respect-gitignore --exclude '*.min.js' .
+                                      Skip ignored files and minified JS
+  filestat --time-budget 30 /mnt/share
+                                      Report whatever a 30-second scan covers
+  filestat --watch build/             Keep watching and print changes as they happen
+  filestat --save-index tree.fsidx .  Scan once and save a file index
+  filestat --index tree.fsidx --ext .log --top 10
+                                      Query a saved index without rescanning
+  filestat --snapshot today.fsnap.gz /data
+                                      Save a gzipped per-file snapshot
+  filestat diff yesterday.fsnap.gz today.fsnap.gz
+                                      Show what was added, removed and changed
+  filestat serve &                    Keep scanned trees warm in a background server
+  filestat --server /data             Ask the server; repeated queries only re-stat
         """
     )
 
     parser.add_argument(
         "path",
-        help="Path to file or directory to analyze",
-        nargs="?"
+        help="Paths to files or directories to analyze; several directories are "
+             "scanned together, with a report per root and a combined total",
+        nargs="*"
+    )
+
+    parser.add_argument(
+        "--from-file",
+        metavar="FILE",
+        help="Also analyze the directories listed in FILE, one per line ('-' for stdin)"
     )
 
     parser.add_argument(
@@ -37,6 +81,246 @@ Examples:
         help="Show additional details"
     )
 
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Count lines with N parallel workers (0 = one per CPU, default: 1)"
+    )
+
+    parser.add_argument(
+        "--executor",
+        choices=EXECUTORS,
+        default="thread",
+        help="Worker pool type used with --jobs (default: thread)"
+    )
+
+    parser.add_argument(
+        "--cache",
+        metavar="PATH",
+        help="Line-count cache file; unchanged files are not re-read"
+    )
+
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        metavar="N",
+        help="Number of files to list by size and by line count (default: 5)"
+    )
+
+    parser.add_argument(
+        "--depth",
+        type=int,
+        metavar="N",
+        help="Show a per-directory size tree N levels deep (heaviest --top subdirectories per level)"
+    )
+
+    parser.add_argument(
+        "--large-file-threshold",
+        type=int,
+        default=None,
+        metavar="BYTES",
+        help="Count single files at least this large with parallel reads (default: off)"
+    )
+
+    parser.add_argument(
+        "--format",
+        choices=["table", "json", "csv", "ndjson"],
+        default="table",
+        help="Output format (default: table). json prints the statistics, csv prints "
+             "one row per file, ndjson streams results as they are found"
+    )
+
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=1.0,
+        metavar="SECONDS",
+        help="Seconds between progress lines in ndjson output (default: 1.0)"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report time per phase (listing, stat, read, aggregate, hash, render), "
+             "syscall and byte counters, rates and the slowest files"
+    )
+
+    parser.add_argument(
+        "--duplicates",
+        action="store_true",
+        help="Find files with identical contents (size, then first/last block, "
+             "then full hash) and report the space they waste"
+    )
+
+    lines_group = parser.add_argument_group("line counting")
+    lines_mode = lines_group.add_mutually_exclusive_group()
+    lines_mode.add_argument(
+        "--no-lines",
+        action="store_true",
+        help="Never open files: report sizes and file types only, classifying "
+             "binary files by extension"
+    )
+    lines_mode.add_argument(
+        "--estimate-lines",
+        action="store_true",
+        help="Count lines of a random sample of files per extension and report "
+             "the estimated total with a 95%% confidence interval"
+    )
+    lines_group.add_argument(
+        "--sample-size",
+        type=int,
+        default=SAMPLE_SIZE,
+        metavar="N",
+        help=f"Files counted per extension with --estimate-lines (default: {SAMPLE_SIZE})"
+    )
+    lines_group.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for picking the --estimate-lines sample (default: 0)"
+    )
+    lines_group.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Also count words, characters and the longest line of every text file "
+             "(like wc -lwmcL), in the same read as its lines; bypasses --cache"
+    )
+    lines_group.add_argument(
+        "--metrics-kernel",
+        choices=KERNELS,
+        default="auto",
+        help="Compute --metrics with NumPy or pure Python; both give identical results "
+             "(default: auto, NumPy when installed)"
+    )
+
+    filter_group = parser.add_argument_group("filtering")
+    filter_group.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="Skip files and directories matching GLOB (gitignore syntax, repeatable, "
+             "e.g. --exclude node_modules --exclude '*.pyc'); matching directories are not entered"
+    )
+    filter_group.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="Only count files matching GLOB (repeatable, e.g. --include '*.py')"
+    )
+    filter_group.add_argument(
+        "--respect-gitignore",
+        action="store_true",
+        help="Skip .git and everything excluded by .gitignore files in the scanned tree"
+    )
+
+    traversal_group = parser.add_argument_group("traversal")
+    traversal_group.add_argument(
+        "--follow-symlinks",
+        action="store_true",
+        help="Descend into symlinked directories; every directory is entered once, "
+             "so symlink loops are skipped"
+    )
+    traversal_group.add_argument(
+        "--one-file-system",
+        action="store_true",
+        help="Do not descend into directories on other file systems (mount points)"
+    )
+
+    limits_group = parser.add_argument_group(
+        "limits",
+        "Stop a directory scan early and report the files seen so far, marked incomplete "
+        "with the share of directories listed. Ctrl-C does the same; press it twice to abort. "
+        "Directories are then listed level by level, so partial results cover the whole tree."
+    )
+    limits_group.add_argument(
+        "--max-files",
+        type=int,
+        metavar="N",
+        help="Stop after N files"
+    )
+    limits_group.add_argument(
+        "--max-bytes",
+        type=int,
+        metavar="BYTES",
+        help="Stop once the files counted add up to BYTES"
+    )
+    limits_group.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="SECONDS",
+        help="Stop after SECONDS"
+    )
+
+    watch_group = parser.add_argument_group("watch mode")
+    watch_group.add_argument(
+        "--watch",
+        action="store_true",
+        help="Scan once, then keep watching the directory and report changes as "
+             "deltas (json and ndjson print one JSON line per delta)"
+    )
+    watch_group.add_argument(
+        "--watch-interval",
+        type=float,
+        default=1.0,
+        metavar="SECONDS",
+        help="Seconds between checks in watch mode (default: 1.0)"
+    )
+
+    index_group = parser.add_argument_group("file index")
+    index_group.add_argument(
+        "--save-index",
+        metavar="PATH",
+        help="Save a per-file index of the scanned directory to PATH"
+    )
+    index_group.add_argument(
+        "--index",
+        metavar="PATH",
+        help="Report from a saved index instead of scanning"
+    )
+    index_group.add_argument(
+        "--ext",
+        action="append",
+        metavar="EXT",
+        help="Only include files with this extension (repeatable, e.g. --ext .log)"
+    )
+    index_group.add_argument(
+        "--min-size",
+        type=int,
+        metavar="BYTES",
+        help="Only include files of at least BYTES"
+    )
+    index_group.add_argument(
+        "--min-lines",
+        type=int,
+        metavar="N",
+        help="Only include text files with at least N lines"
+    )
+
+    snapshot_group = parser.add_argument_group("snapshots")
+    snapshot_group.add_argument(
+        "--snapshot",
+        metavar="PATH",
+        help="Write a per-file snapshot sorted by path to PATH (gzipped if PATH ends "
+             "with .gz); compare two snapshots with 'filestat diff OLD NEW'"
+    )
+
+    server_group = parser.add_argument_group("query server")
+    server_group.add_argument(
+        "--server",
+        action="store_true",
+        help="Ask a running 'filestat serve' instead of scanning; trees it has "
+             "seen before are only re-stat'ed"
+    )
+    server_group.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Socket of the server (default: $XDG_RUNTIME_DIR/filestat.sock or "
+             "filestat-UID.sock in the temporary directory)"
+    )
+
     parser.add_argument(
         "--version",
         action="version",
@@ -46,48 +330,460 @@ Examples:
     return parser
 
 
+def create_diff_parser() -> argparse.ArgumentParser:
+    """Create the argument parser of the ``diff`` subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="filestat diff",
+        description="Compare two snapshots written with --snapshot",
+    )
+    parser.add_argument("old", help="Earlier snapshot")
+    parser.add_argument("new", help="Later snapshot")
+    parser.add_argument(
+        "--format",
+        choices=["table", "json", "ndjson"],
+        default="table",
+        help="Output format: Rich tables (default), one JSON document, or one JSON "
+             "line per added, removed or changed file followed by the summary"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="Number of files to list by growth and by shrinkage (default: 10)"
+    )
+    return parser
+
+
+def diff_main(argv: List[str]) -> int:
+    """Entry point of the ``diff`` subcommand.
+
+    Args:
+        argv: Arguments after ``diff``
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    args = create_diff_parser().parse_args(argv)
+    from filestat.snapshot import diff_snapshots, iter_diff_events
+
+    try:
+        old, new = (str(Path(path).expanduser()) for path in (args.old, args.new))
+        if args.format == "ndjson":
+            from filestat.export import write_ndjson
+            write_ndjson(iter_diff_events(old, new, args.top))
+        elif args.format == "json":
+            from filestat.export import write_json
+            write_json(diff_snapshots(old, new, args.top))
+        else:
+            from filestat.formatter import format_diff_output
+            format_diff_output(diff_snapshots(old, new, args.top))
+        return 0
+    except BrokenPipeError:
+        return _broken_pipe()
+    except (OSError, ValueError) as e:
+        _print_error(f"Error: {e}", args.format)
+        return 1
+
+
+def create_serve_parser() -> argparse.ArgumentParser:
+    """Create the argument parser of the ``serve`` subcommand.
+
+    Returns:
+        Configured ArgumentParser instance
+    """
+    parser = argparse.ArgumentParser(
+        prog="filestat serve",
+        description="Answer 'filestat --server' queries from trees kept warm in memory",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Unix socket to listen on (default: $XDG_RUNTIME_DIR/filestat.sock or "
+             "filestat-UID.sock in the temporary directory)"
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=512,
+        metavar="MB",
+        help="Estimated memory of warm trees before the least recently used are "
+             "dropped (default: 512)"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Count lines with N parallel workers (0 = one per CPU, default: 1)"
+    )
+    parser.add_argument(
+        "--inotify",
+        action="store_true",
+        help="Learn about changes from inotify instead of re-stat'ing a tree on "
+             "every query (Linux; uses one watch per directory)"
+    )
+    parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Stop the server listening on the socket and exit"
+    )
+    return parser
+
+
+def serve_main(argv: List[str]) -> int:
+    """Entry point of the ``serve`` subcommand.
+
+    Args:
+        argv: Arguments after ``serve``
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    args = create_serve_parser().parse_args(argv)
+    from filestat.server import ServerClient, serve
+
+    socket_path = str(Path(args.socket).expanduser()) if args.socket else None
+    try:
+        if args.stop:
+            with ServerClient(socket_path) as client:
+                client.shutdown()
+            return 0
+        serve(
+            socket_path,
+            memory_limit=args.memory_limit * 1024 * 1024,
+            jobs=args.jobs,
+            use_inotify=args.inotify,
+        )
+        return 0
+    except (OSError, ValueError) as e:
+        _print_error(f"Error: {e}", "table")
+        return 1
+
+
+def _run_client(paths: List[str], args: argparse.Namespace) -> int:
+    """Get statistics from a running server and print them."""
+    from filestat.server import ServerClient
+
+    if (len(paths) > 1 or args.from_file or args.format not in ("table", "json")
+            or args.watch or args.save_index or args.snapshot or _has_filters(args)
+            or args.estimate_lines or args.duplicates or args.cache or args.profile
+            or args.follow_symlinks or args.one_file_system or _has_limits(args) or args.metrics):
+        raise ValueError("--server takes a single path with table or json output and "
+                         "supports --top, --depth, --no-lines and the filtering options")
+
+    socket_path = str(Path(args.socket).expanduser()) if args.socket else None
+    with ServerClient(socket_path) as client:
+        stats = client.get_stats(
+            str(Path(paths[0]).expanduser().resolve()),
+            top=args.top,
+            depth=args.depth,
+            lines="none" if args.no_lines else "count",
+            exclude=args.exclude,
+            include=args.include,
+            respect_gitignore=args.respect_gitignore,
+        )
+    _print_stats(stats, args.format)
+    return 0
+
+
+def _has_limits(args: argparse.Namespace) -> bool:
+    """Check whether any scan limit option was given."""
+    return args.max_files is not None or args.max_bytes is not None or args.time_budget is not None
+
+
+def _exit_code(analyzer: FileAnalyzer) -> int:
+    """Return 130 after a scan stopped by Ctrl-C, like a shell, else 0."""
+    return 130 if analyzer.stopped_by == "interrupt" else 0
+
+
+def _has_filters(args: argparse.Namespace) -> bool:
+    """Check whether any index filter option was given."""
+    return args.ext is not None or args.min_size is not None or args.min_lines is not None
+
+
+def _selected_rows(index: FileIndex, args: argparse.Namespace) -> Optional[List[int]]:
+    """Return the index rows matching the CLI filters, or None for all rows."""
+    if not _has_filters(args):
+        return None
+    return index.select(
+        extensions=args.ext,
+        min_size=args.min_size,
+        min_lines=args.min_lines,
+    )
+
+
+def _index_stats(index: FileIndex, args: argparse.Namespace) -> Dict[str, Any]:
+    """Compute the statistics view of an index, applying CLI filters."""
+    return index.to_stats(args.top, _selected_rows(index, args), args.depth)
+
+
+def _broken_pipe() -> int:
+    """Handle a reader that went away (e.g. `| head`), silencing the final flush."""
+    try:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _print_error(message: str, output_format: str) -> None:
+    """Print an error, in red for table output and plain on stderr otherwise."""
+    if output_format == "table":
+        from filestat.formatter import console
+        console.print(f"[red]{message}[/red]")
+    else:
+        print(message, file=sys.stderr)
+
+
+def _file_records(info: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Turn single-file statistics into a per-file record for CSV output."""
+    yield {**info, **info.get("content_metrics", {}), "path": info["name"]}
+
+
+def _index_records(index: FileIndex, args: argparse.Namespace) -> Iterator[Dict[str, Any]]:
+    """Yield the records of an index, applying CLI filters."""
+    rows = _selected_rows(index, args)
+    for row in (range(len(index)) if rows is None else rows):
+        yield index.record(row)
+
+
+def _print_stats(stats: Dict[str, Any], output_format: str) -> None:
+    """Print statistics as a Rich table or JSON."""
+    if output_format == "json":
+        from filestat.export import write_json
+        write_json(stats)
+    else:
+        from filestat.formatter import format_output
+        format_output(stats)
+
+
+def _combined(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the combined statistics of a single- or multi-root report."""
+    return stats.get("total", stats)
+
+
+def _print_profile(profile: Dict[str, Any]) -> None:
+    """Print a scan profile to stderr as JSON, next to csv output."""
+    import json
+    print(json.dumps({"profile": profile}), file=sys.stderr)
+
+
+def _run_watch(analyzer: FileAnalyzer, args: argparse.Namespace) -> int:
+    """Watch a directory until interrupted, printing deltas."""
+    from filestat.watch import DirectoryWatcher
+
+    if args.format == "csv":
+        raise ValueError("--watch supports table, json and ndjson output")
+
+    with DirectoryWatcher(analyzer) as watcher:
+        events = watcher.iter_events(args.watch_interval)
+        try:
+            if args.format == "table":
+                from filestat.formatter import format_delta_output, format_output
+                for kind, payload in events:
+                    if kind == "summary":
+                        format_output(payload)
+                    else:
+                        format_delta_output(payload)
+            else:
+                from filestat.export import write_ndjson
+                write_ndjson(events)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
 def main() -> int:
     """Main entry point for the CLI application.
     
     Returns:
         Exit code (0 for success, 1 for error)
     """
+    if sys.argv[1:2] == ["diff"]:
+        return diff_main(sys.argv[2:])
+    if sys.argv[1:2] == ["serve"]:
+        return serve_main(sys.argv[2:])
+
     parser = create_parser()
     args = parser.parse_args()
 
+    if args.index:
+        try:
+            index = FileIndex.load(str(Path(args.index).expanduser()))
+            if args.format == "csv":
+                from filestat.export import write_csv
+                write_csv(_index_records(index, args))
+            else:
+                _print_stats(_index_stats(index, args), args.format)
+            return 0
+        except BrokenPipeError:
+            return _broken_pipe()
+        except (OSError, ValueError) as e:
+            _print_error(f"Error: {e}", args.format)
+            return 1
+
+    try:
+        paths = list(args.path)
+        if args.from_file:
+            paths += read_path_list(args.from_file)
+    except OSError as e:
+        _print_error(f"Error: {e}", args.format)
+        return 1
+
     # Validate path argument
-    if not args.path:
-        console.print("[red]Error: Path argument is required[/red]")
+    if not paths:
+        _print_error("Error: Path argument is required", args.format)
         parser.print_help()
         return 1
 
     try:
-        # Expand user path and normalize
-        path = Path(args.path).expanduser().resolve()
+        if args.server:
+            return _run_client(paths, args)
+
+        if args.metrics and (args.no_lines or args.estimate_lines):
+            raise ValueError("--metrics reads every file and cannot be combined with --no-lines or --estimate-lines")
 
         # Create analyzer and get stats
-        analyzer = FileAnalyzer(str(path))
-        stats = analyzer.get_stats()
+        cache = str(Path(args.cache).expanduser()) if args.cache else None
+        options = dict(
+            jobs=args.jobs,
+            executor=args.executor,
+            cache=cache,
+            top=args.top,
+            large_file_threshold=args.large_file_threshold,
+            depth=args.depth,
+            profile=args.profile,
+            exclude=args.exclude,
+            include=args.include,
+            respect_gitignore=args.respect_gitignore,
+            lines="none" if args.no_lines else "estimate" if args.estimate_lines else "count",
+            sample_size=args.sample_size,
+            seed=args.seed,
+            duplicates=args.duplicates,
+            follow_symlinks=args.follow_symlinks,
+            one_file_system=args.one_file_system,
+            max_files=args.max_files,
+            max_bytes=args.max_bytes,
+            time_budget=args.time_budget,
+            interruptible=True,
+            metrics=args.metrics,
+            metrics_kernel=args.metrics_kernel,
+        )
+        multi = len(paths) > 1 or args.from_file is not None
+        if multi:
+            if args.watch or args.save_index or args.snapshot or _has_filters(args):
+                raise ValueError("--watch, --save-index, --snapshot and index filters take a single path")
+            analyzer = MultiRootAnalyzer(paths, **options)
+            is_dir = True
+        else:
+            # Expand user path and normalize
+            path = Path(paths[0]).expanduser().resolve()
+            analyzer = FileAnalyzer(str(path), **options)
+            is_dir = path.is_dir()
+        for flag, enabled in (
+            ("--estimate-lines", args.estimate_lines),
+            ("--duplicates", args.duplicates),
+            ("--metrics", args.metrics),
+        ):
+            if enabled and (args.watch or args.save_index or _has_filters(args)):
+                raise ValueError(f"{flag} cannot be combined with --watch, --save-index or index filters")
+
+        if args.snapshot and (args.watch or args.save_index or _has_filters(args) or args.format in ("csv", "ndjson")):
+            raise ValueError("--snapshot works with table and json output, without --watch, --save-index or index filters")
+
+        if args.watch:
+            return _run_watch(analyzer, args)
+
+        if args.format == "ndjson":
+            from filestat.export import write_ndjson
+            if is_dir:
+                events = analyzer.iter_events(args.progress_interval)
+            else:
+                events = [("summary", analyzer.get_file_info())]
+            write_ndjson(events)
+            return _exit_code(analyzer)
+
+        if args.format == "csv" and args.duplicates and is_dir:
+            from filestat.export import write_duplicates_csv
+            write_duplicates_csv(_combined(analyzer.get_stats())["duplicates"])
+            if analyzer.profile is not None:
+                _print_profile(analyzer.profile.to_dict())
+            return _exit_code(analyzer)
+
+        if args.format == "csv" and not _has_filters(args) and not args.save_index:
+            from filestat.export import CSV_FIELDS, METRICS_CSV_FIELDS, write_csv
+            fields = CSV_FIELDS + METRICS_CSV_FIELDS if args.metrics else CSV_FIELDS
+            if is_dir:
+                write_csv(analyzer.iter_records(), fields=fields)
+            else:
+                write_csv(_file_records(analyzer.get_file_info()), fields=fields)
+            if analyzer.profile is not None:
+                _print_profile(analyzer.profile.to_dict())
+            return _exit_code(analyzer)
+
+        if args.snapshot and not is_dir:
+            raise NotADirectoryError("--snapshot needs a directory")
+        if args.snapshot:
+            snapshot = str(Path(args.snapshot).expanduser())
+            stats = analyzer.save_snapshot(snapshot, compress=snapshot.endswith(".gz"))
+        elif is_dir and (args.save_index or _has_filters(args)):
+            index = analyzer.build_index()
+            if args.save_index:
+                index.save(str(Path(args.save_index).expanduser()))
+            if args.format == "csv":
+                from filestat.export import write_csv
+                write_csv(_index_records(index, args))
+                if analyzer.profile is not None:
+                    _print_profile(analyzer.profile.to_dict())
+                return 0
+            stats = _index_stats(index, args)
+            if analyzer.profile is not None:
+                stats["profile"] = analyzer.profile.to_dict()
+        else:
+            stats = analyzer.get_stats()
 
         # Format and display output
-        format_output(stats)
+        if analyzer.profile is not None and args.format == "table":
+            # Time the report itself, then show the profile after it
+            _combined(stats).pop("profile", None)
+            start = time.perf_counter()
+            _print_stats(stats, args.format)
+            analyzer.profile.record("render", time.perf_counter() - start)
+            from filestat.formatter import format_profile_output
+            format_profile_output(analyzer.profile.to_dict())
+        else:
+            _print_stats(stats, args.format)
 
-        return 0
+        return _exit_code(analyzer)
 
     except FileNotFoundError as e:
-        console.print(f"[red]Error: {e}[/red]")
+        _print_error(f"Error: {e}", args.format)
         return 1
     except PermissionError as e:
-        console.print(f"[red]Error: {e}[/red]")
+        _print_error(f"Error: {e}", args.format)
         return 1
     except IsADirectoryError as e:
-        console.print(f"[red]Error: {e}[/red]")
+        _print_error(f"Error: {e}", args.format)
         return 1
     except NotADirectoryError as e:
-        console.print(f"[red]Error: {e}[/red]")
+        _print_error(f"Error: {e}", args.format)
+        return 1
+    except ValueError as e:
+        _print_error(f"Error: {e}", args.format)
+        return 1
+    except BrokenPipeError:
+        return _broken_pipe()
+    except (ConnectionError, RuntimeError) as e:
+        # Reaching the query server failed, or it failed to answer
+        _print_error(f"Error: {e}", args.format)
         return 1
     except Exception as e:
-        console.print(f"[red]Unexpected error: {e}[/red]")
+        _print_error(f"Unexpected error: {e}", args.format)
         return 1
 
 
@@ -0,0 +1,204 @@
+"""Duplicate file detection for directory scans."""
+
+import hashlib
+import os
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Bytes hashed from each end of a file in the partial pass
+PARTIAL_BLOCK = 16 * 1024
+
+# Read size of the full pass
+HASH_CHUNK = 1024 * 1024
+
+# Files handed to a worker at a time
+HASH_BATCH = 64
+
+# (path, relpath, st_dev, st_ino)
+_Candidate = Tuple[str, str, int, int]
+
+
+def _digest(data: bytes) -> bytes:
+    """Hash a block of bytes."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def partial_digest(path: str, size: int) -> Optional[bytes]:
+    """Hash the first and last PARTIAL_BLOCK bytes of a file.
+
+    Files of up to two blocks are hashed whole, so their digest is final.
+
+    Args:
+        path: File path
+        size: File size from stat
+
+    Returns:
+        Digest, or None if the file cannot be read
+    """
+    try:
+        with open(path, "rb") as f:
+            if size <= 2 * PARTIAL_BLOCK:
+                return _digest(f.read())
+            head = f.read(PARTIAL_BLOCK)
+            f.seek(-PARTIAL_BLOCK, os.SEEK_END)
+            return _digest(head + f.read(PARTIAL_BLOCK))
+    except OSError:
+        return None
+
+
+def full_digest(path: str) -> Optional[bytes]:
+    """Hash a whole file.
+
+    Args:
+        path: File path
+
+    Returns:
+        Digest, or None if the file cannot be read
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    buffer = bytearray(HASH_CHUNK)
+    view = memoryview(buffer)
+    try:
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                hasher.update(view[:n])
+    except OSError:
+        return None
+    return hasher.digest()
+
+
+def _partial_batch(items: List[Tuple[str, int]]) -> List[Optional[bytes]]:
+    """Partially hash a batch of ``(path, size)`` items in a worker."""
+    return [partial_digest(path, size) for path, size in items]
+
+
+def _full_batch(paths: List[str]) -> List[Optional[bytes]]:
+    """Fully hash a batch of paths in a worker."""
+    return [full_digest(path) for path in paths]
+
+
+def _run_batches(func: Callable[[List[Any]], List[Any]], items: List[Any], jobs: int, executor: str) -> List[Any]:
+    """Apply a batch function to items, in a worker pool when jobs > 1.
+
+    Args:
+        func: Module-level function mapping a list of items to results
+        items: Items to process
+        jobs: Number of workers
+        executor: Worker pool type, "thread" or "process"
+
+    Returns:
+        Results in the same order as ``items``
+    """
+    batches = [items[i:i + HASH_BATCH] for i in range(0, len(items), HASH_BATCH)]
+    if jobs == 1 or len(batches) < 2:
+        return [result for batch in batches for result in func(batch)]
+
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    executor_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with executor_class(max_workers=jobs) as pool:
+        return [result for results in pool.map(func, batches) for result in results]
+
+
+class DuplicateFinder:
+    """Finds files with identical contents among the files of a scan.
+
+    Files are bucketed by size as the walk reports them, which costs no
+    I/O. Only sizes shared by several files are read at all. Those files
+    first get a cheap hash of their first and last blocks, and only files
+    that still collide are hashed in full. Hard links to the same inode
+    are counted once, since removing one frees no space.
+    """
+
+    def __init__(self, min_size: int = 1):
+        """Initialize empty size buckets.
+
+        Args:
+            min_size: Smallest file size considered (empty files are
+                skipped by default, since they waste no space)
+        """
+        self.min_size = min_size
+        self.buckets: Dict[int, List[_Candidate]] = defaultdict(list)
+
+    def add(self, path: str, relpath: str, st: os.stat_result) -> None:
+        """Add one scanned file.
+
+        Args:
+            path: Absolute file path
+            relpath: Path relative to the scanned directory
+            st: File stat result
+        """
+        if st.st_size >= self.min_size:
+            self.buckets[st.st_size].append((path, relpath, st.st_dev, st.st_ino))
+
+    def find(self, jobs: int = 1, executor: str = "thread") -> Dict[str, Any]:
+        """Hash the candidates and group identical files.
+
+        Args:
+            jobs: Number of hashing workers
+            executor: Worker pool type, "thread" or "process"
+
+        Returns:
+            Dictionary with groups (largest waste first, each with
+            size_bytes, files, wasted_bytes and sorted paths), group_count,
+            duplicate_files (files beyond the first of each group),
+            wasted_bytes and hashing counters
+        """
+        candidates: List[Tuple[int, _Candidate]] = []
+        for size, files in self.buckets.items():
+            if len(files) > 1:
+                unique = {(dev, ino): (path, relpath, dev, ino) for path, relpath, dev, ino in files}
+                if len(unique) > 1:
+                    candidates.extend((size, candidate) for candidate in unique.values())
+
+        partial = _run_batches(_partial_batch, [(c[0], size) for size, c in candidates], jobs, executor)
+        groups = _group(zip(((size, digest) for (size, _), digest in zip(candidates, partial)), candidates))
+
+        final: List[List[Tuple[int, _Candidate]]] = []
+        to_hash: List[Tuple[int, _Candidate]] = []
+        for members in groups:
+            if members[0][0] <= 2 * PARTIAL_BLOCK:
+                final.append(members)
+            else:
+                to_hash.extend(members)
+
+        full = _run_batches(_full_batch, [c[0] for _, c in to_hash], jobs, executor)
+        final.extend(_group(zip(((size, digest) for (size, _), digest in zip(to_hash, full)), to_hash)))
+
+        result_groups = []
+        for members in final:
+            size = members[0][0]
+            result_groups.append({
+                "size_bytes": size,
+                "files": len(members),
+                "wasted_bytes": size * (len(members) - 1),
+                "paths": sorted(candidate[1] for _, candidate in members),
+            })
+        result_groups.sort(key=lambda group: (-group["wasted_bytes"], group["paths"][0]))
+
+        return {
+            "groups": result_groups,
+            "group_count": len(result_groups),
+            "duplicate_files": sum(group["files"] - 1 for group in result_groups),
+            "wasted_bytes": sum(group["wasted_bytes"] for group in result_groups),
+            "hashing": {
+                "candidates": len(candidates),
+                "partial_hashed": len(partial),
+                "full_hashed": len(full),
+                "bytes_read": sum(min(size, 2 * PARTIAL_BLOCK) for size, _ in candidates)
+                + sum(size for size, _ in to_hash),
+            },
+        }
+
+
+def _group(keyed: Iterable[Tuple[Tuple[int, Optional[bytes]], Any]]) -> List[List[Any]]:
+    """Group items by key, dropping unreadable files and singletons."""
+    groups: Dict[Tuple[int, bytes], List[Any]] = defaultdict(list)
+    for key, item in keyed:
+        if key[1] is not None:
+            groups[key].append(item)
+    return [members for members in groups.values() if len(members) > 1]
@@ -0,0 +1,84 @@
+"""Machine-readable output for file statistics."""
+
+import csv
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+
+# Columns written by write_csv, in order
+CSV_FIELDS = ["path", "name", "extension", "size_bytes", "lines", "binary"]
+
+# Columns added after CSV_FIELDS in metrics mode
+METRICS_CSV_FIELDS = ["words", "chars", "max_line_length"]
+
+# Columns written by write_duplicates_csv, in order
+DUPLICATE_CSV_FIELDS = ["group", "path", "size_bytes", "wasted_bytes"]
+
+
+def write_ndjson(events: Iterable[Tuple[str, Dict[str, Any]]], stream: Optional[TextIO] = None) -> None:
+    """Write scan events as newline-delimited JSON.
+
+    Each event becomes one line of the form ``{"type": kind, ...payload}``.
+    The stream is flushed after every non-file event so consumers see
+    progress while the scan is still running.
+
+    Args:
+        events: ``(kind, payload)`` tuples, e.g. from ``FileAnalyzer.iter_events``
+        stream: Output stream (defaults to stdout)
+    """
+    stream = stream or sys.stdout
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    write = stream.write
+
+    for kind, payload in events:
+        write(dumps({"type": kind, **payload}))
+        write("\n")
+        if kind != "file":
+            stream.flush()
+
+
+def write_json(stats: Dict[str, Any], stream: Optional[TextIO] = None) -> None:
+    """Write a statistics dictionary as a single JSON document.
+
+    Args:
+        stats: File or directory statistics
+        stream: Output stream (defaults to stdout)
+    """
+    stream = stream or sys.stdout
+    json.dump(stats, stream, indent=2)
+    stream.write("\n")
+
+
+def write_csv(
+    records: Iterable[Dict[str, Any]],
+    stream: Optional[TextIO] = None,
+    fields: Optional[List[str]] = None,
+) -> None:
+    """Write per-file records as CSV with a header row.
+
+    Args:
+        records: Dictionaries with at least the ``fields`` keys, e.g. from
+            ``FileAnalyzer.iter_records``
+        stream: Output stream (defaults to stdout)
+        fields: Columns to write, in order (defaults to CSV_FIELDS)
+    """
+    stream = stream or sys.stdout
+    writer = csv.DictWriter(stream, fieldnames=fields or CSV_FIELDS, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(records)
+
+
+def write_duplicates_csv(duplicates: Dict[str, Any], stream: Optional[TextIO] = None) -> None:
+    """Write duplicate groups as CSV, one row per file.
+
+    Args:
+        duplicates: Dictionary from ``DuplicateFinder.find``
+        stream: Output stream (defaults to stdout)
+    """
+    stream = stream or sys.stdout
+    writer = csv.writer(stream, lineterminator="\n")
+    writer.writerow(DUPLICATE_CSV_FIELDS)
+    for number, group in enumerate(duplicates["groups"], 1):
+        for path in group["paths"]:
+            writer.writerow([number, path, group["size_bytes"], group["wasted_bytes"]])
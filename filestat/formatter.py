@@ -1,13 +1,332 @@
 """Output formatting for file statistics."""
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from rich.console import Console
 from rich.table import Table
+from rich.tree import Tree
 
 
 console = Console()
 
 
+def format_cache_output(cache_info: Dict[str, Any]) -> None:
+    """Format and print line-count cache statistics.
+
+    Args:
+        cache_info: Dictionary with cache hit/miss counters
+    """
+    cache_table = Table(title="Line Count Cache")
+    cache_table.add_column("Metric", style="cyan")
+    cache_table.add_column("Value", style="green")
+
+    cache_table.add_row("Hits", str(cache_info["hits"]))
+    cache_table.add_row("Misses", str(cache_info["misses"]))
+    cache_table.add_row("Evicted", str(cache_info["evicted"]))
+    cache_table.add_row("Hit Rate", f"{cache_info['hit_rate']:.1%}")
+
+    console.print(cache_table)
+
+
+def format_profile_output(profile: Dict[str, Any]) -> None:
+    """Format and print scan profiling results.
+
+    Args:
+        profile: Dictionary from ``ScanProfile.to_dict``
+    """
+    phase_table = Table(title="Profile")
+    phase_table.add_column("Phase", style="cyan")
+    phase_table.add_column("Seconds", style="green", justify="right")
+    phase_table.add_column("Share", style="yellow", justify="right")
+
+    for name, phase in profile["phases"].items():
+        phase_table.add_row(name, f"{phase['seconds']:.4f}", f"{phase['share']:.1%}")
+    phase_table.add_row("wall", f"{profile['wall_seconds']:.4f}", "")
+    console.print(phase_table)
+
+    console.print()
+    counter_table = Table(title="Counters")
+    counter_table.add_column("Metric", style="cyan")
+    counter_table.add_column("Value", style="green", justify="right")
+
+    for name, value in profile["counters"].items():
+        counter_table.add_row(name, str(value))
+    counter_table.add_row("files/s", f"{profile['files_per_s']:,.0f}")
+    counter_table.add_row("MB/s", f"{profile['bytes_per_s'] / (1024 * 1024):,.1f}")
+    console.print(counter_table)
+
+    if profile["slowest_files"]:
+        console.print()
+        slowest_table = Table(title="Slowest Files")
+        slowest_table.add_column("Path", style="yellow")
+        slowest_table.add_column("Seconds", style="green", justify="right")
+        slowest_table.add_column("Size (KB)", style="cyan", justify="right")
+
+        for file_info in profile["slowest_files"]:
+            size_kb = round(file_info["size_bytes"] / 1024, 2)
+            slowest_table.add_row(file_info["path"], f"{file_info['seconds']:.4f}", str(size_kb))
+
+        console.print(slowest_table)
+
+
+def format_duplicates_output(duplicates: Dict[str, Any], limit: int = 10) -> None:
+    """Format and print duplicate file groups.
+
+    Args:
+        duplicates: Dictionary from ``DuplicateFinder.find``
+        limit: Maximum number of groups to list
+    """
+    wasted_kb = round(duplicates["wasted_bytes"] / 1024, 2)
+    table = Table(
+        title=f"Duplicate Files ({duplicates['group_count']} groups, {wasted_kb} KB reclaimable)"
+    )
+    table.add_column("Wasted (KB)", style="red", justify="right")
+    table.add_column("Size (KB)", style="green", justify="right")
+    table.add_column("Copies", style="cyan", justify="right")
+    table.add_column("Paths", style="yellow")
+
+    for group in duplicates["groups"][:limit]:
+        table.add_row(
+            str(round(group["wasted_bytes"] / 1024, 2)),
+            str(round(group["size_bytes"] / 1024, 2)),
+            str(group["files"]),
+            "\n".join(group["paths"]),
+        )
+
+    console.print(table)
+    if duplicates["group_count"] > limit:
+        console.print(f"[dim]... {duplicates['group_count'] - limit} more groups[/dim]")
+
+
+def _bytes_label(size: int) -> str:
+    """Render a byte count with a binary unit."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:g} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def format_distributions_output(distributions: Dict[str, Any], limit: int = 10) -> None:
+    """Format and print size and line distributions.
+
+    Args:
+        distributions: ``distributions`` entry of directory statistics
+        limit: Maximum number of extensions to list
+    """
+    rows = [("File Size", distributions["size_bytes"], _bytes_label)]
+    if "lines" in distributions:
+        rows.append(("Lines per File", distributions["lines"], str))
+
+    summary_table = Table(title="Distributions")
+    summary_table.add_column("Metric", style="cyan")
+    for column in ("Files", "Mean", "p50", "p90", "p99", "Max"):
+        summary_table.add_column(column, style="green", justify="right")
+    for label, summary, render in rows:
+        summary_table.add_row(
+            label,
+            str(summary["count"]),
+            render(round(summary["mean"])),
+            render(summary["p50"]),
+            render(summary["p90"]),
+            render(summary["p99"]),
+            render(summary["max"]),
+        )
+    console.print(summary_table)
+
+    bins = distributions["size_bytes"]["histogram"]
+    if bins:
+        console.print()
+        histogram_table = Table(title="File Size Histogram")
+        histogram_table.add_column("Size", style="cyan")
+        histogram_table.add_column("Files", style="green", justify="right")
+        histogram_table.add_column("", style="magenta")
+        peak = max(b["count"] for b in bins)
+        for b in bins:
+            label = "0 B" if not b["high"] else f"{_bytes_label(b['low'])} - {_bytes_label(b['high'] + 1)}"
+            histogram_table.add_row(label, str(b["count"]), "█" * max(1, round(30 * b["count"] / peak)))
+        console.print(histogram_table)
+
+    extensions = list(distributions["extensions"].items())
+    if extensions:
+        console.print()
+        extension_table = Table(title="Sizes by Extension")
+        extension_table.add_column("Extension", style="cyan")
+        extension_table.add_column("Files", style="green", justify="right")
+        extension_table.add_column("Total", style="green", justify="right")
+        for column in ("p50", "p90", "p99"):
+            extension_table.add_column(column, style="yellow", justify="right")
+        extension_table.add_column("p50 Lines", style="magenta", justify="right")
+        for extension, entry in extensions[:limit]:
+            size = entry["size_bytes"]
+            extension_table.add_row(
+                extension,
+                str(size["count"]),
+                _bytes_label(size["total"]),
+                _bytes_label(size["p50"]),
+                _bytes_label(size["p90"]),
+                _bytes_label(size["p99"]),
+                str(entry["lines"]["p50"]) if "lines" in entry else "-",
+            )
+        console.print(extension_table)
+        if len(extensions) > limit:
+            console.print(f"[dim]... {len(extensions) - limit} more extensions[/dim]")
+
+
+def _tree_label(node: Dict[str, Any]) -> str:
+    """Build the label for one directory node."""
+    size_kb = round(node["size_bytes"] / 1024, 2)
+    return (
+        f"[bold]{node['name']}[/bold]  [green]{size_kb} KB[/green]  "
+        f"[cyan]{node['files']} files[/cyan]  [yellow]{node['lines']} lines[/yellow]"
+    )
+
+
+def _add_tree_nodes(branch: Tree, node: Dict[str, Any]) -> None:
+    """Recursively add child directories to a Rich tree."""
+    for child in node["children"]:
+        _add_tree_nodes(branch.add(_tree_label(child)), child)
+    if node.get("omitted_dirs"):
+        branch.add(f"[dim]... {node['omitted_dirs']} more directories[/dim]")
+
+
+def format_tree_output(tree: Dict[str, Any]) -> None:
+    """Format and print a per-directory rollup tree.
+
+    Args:
+        tree: Root node of the directory tree
+    """
+    console.print("[bold cyan]Directory Tree[/bold cyan]")
+    root = Tree(_tree_label(tree))
+    _add_tree_nodes(root, tree)
+    console.print(root)
+
+
+def format_delta_output(delta: Dict[str, Any], limit: int = 10) -> None:
+    """Format and print one watch-mode delta.
+
+    Args:
+        delta: Delta from ``DirectoryWatcher.poll``
+        limit: Maximum number of changed paths to list
+    """
+    diff = delta["diff"]
+    totals = delta["totals"]
+    console.print(
+        f"[bold]{len(delta['added'])} added, {len(delta['modified'])} modified, "
+        f"{len(delta['removed'])} removed[/bold]  "
+        f"size [green]{diff['total_size_bytes']:+,} B[/green]  "
+        f"lines [yellow]{diff['total_lines']:+,}[/yellow]  "
+        f"[dim]now {totals['total_files']:,} files, "
+        f"{round(totals['total_size_bytes'] / 1024, 2)} KB, {totals['total_lines']:,} lines[/dim]"
+    )
+
+    changed = (
+        [("+", "green", record["path"]) for record in delta["added"]]
+        + [("~", "yellow", record["path"]) for record in delta["modified"]]
+        + [("-", "red", path) for path in delta["removed"]]
+    )
+    for mark, style, path in changed[:limit]:
+        console.print(f"  [{style}]{mark} {path}[/{style}]")
+    if len(changed) > limit:
+        console.print(f"  [dim]... {len(changed) - limit} more[/dim]")
+
+
+def _signed(value: int) -> str:
+    """Render a change with an explicit sign."""
+    return f"{value:+,}"
+
+
+def format_diff_output(diff: Dict[str, Any], limit: int = 10) -> None:
+    """Format and print the comparison of two snapshots.
+
+    Args:
+        diff: Dictionary from ``filestat.snapshot.diff_snapshots``
+        limit: Maximum number of extensions to list
+    """
+    old, new = diff["old"], diff["new"]
+    lines = "lines_delta" in diff
+    console.print(f"\n[bold cyan]Changes from {old['path']} to {new['path']}[/bold cyan]\n")
+
+    summary_table = Table(title="Totals")
+    summary_table.add_column("Metric", style="cyan")
+    summary_table.add_column("Old", style="green", justify="right")
+    summary_table.add_column("New", style="green", justify="right")
+    summary_table.add_column("Change", style="magenta", justify="right")
+    summary_table.add_row("Files", f"{old['files']:,}", f"{new['files']:,}", _signed(diff["files_delta"]))
+    summary_table.add_row(
+        "Size (bytes)", f"{old['size_bytes']:,}", f"{new['size_bytes']:,}", _signed(diff["size_delta"])
+    )
+    if lines:
+        summary_table.add_row(
+            "Lines", f"{old['total_lines']:,}", f"{new['total_lines']:,}", _signed(diff["lines_delta"])
+        )
+    console.print(summary_table)
+
+    console.print()
+    status_table = Table(title="Files")
+    status_table.add_column("Status", style="cyan")
+    status_table.add_column("Files", style="green", justify="right")
+    status_table.add_column("Size Change (bytes)", style="magenta", justify="right")
+    if lines:
+        status_table.add_column("Line Change", style="magenta", justify="right")
+    for status in ("added", "removed", "changed"):
+        totals = diff[status]
+        row = [status.capitalize(), f"{totals['files']:,}", _signed(totals["size_delta"])]
+        if lines:
+            row.append(_signed(totals["lines_delta"]))
+        status_table.add_row(*row)
+    status_table.add_row("Unchanged", f"{diff['unchanged']['files']:,}", "", *([""] if lines else []))
+    console.print(status_table)
+
+    changed = [(ext, entry) for ext, entry in diff["extensions"].items() if entry["files_delta"] or entry["size_delta"]]
+    if changed:
+        console.print()
+        extension_table = Table(title="Changes by Extension")
+        extension_table.add_column("Extension", style="cyan")
+        extension_table.add_column("Files", style="green", justify="right")
+        extension_table.add_column("Size Change (bytes)", style="magenta", justify="right")
+        if lines:
+            extension_table.add_column("Line Change", style="magenta", justify="right")
+        for extension, entry in changed[:limit]:
+            row = [extension, f"{entry['new_files']:,} ({_signed(entry['files_delta'])})", _signed(entry["size_delta"])]
+            if lines:
+                row.append(_signed(entry["lines_delta"]))
+            extension_table.add_row(*row)
+        console.print(extension_table)
+        if len(changed) > limit:
+            console.print(f"[dim]... {len(changed) - limit} more extensions[/dim]")
+
+    for key, title in (("grown", "Largest Growth"), ("shrunk", "Largest Shrinkage")):
+        if not diff[key]:
+            continue
+        console.print()
+        table = Table(title=title)
+        table.add_column("Path", style="yellow")
+        table.add_column("Status", style="cyan")
+        table.add_column("Old Size", style="green", justify="right")
+        table.add_column("New Size", style="green", justify="right")
+        table.add_column("Change", style="magenta", justify="right")
+        for change in diff[key]:
+            table.add_row(
+                change["path"],
+                change["status"],
+                "-" if change["old_size"] is None else f"{change['old_size']:,}",
+                "-" if change["new_size"] is None else f"{change['new_size']:,}",
+                _signed(change["size_delta"]),
+            )
+        console.print(table)
+
+    console.print()
+
+
+def _lines_value(lines: int, line_count: Optional[Dict[str, Any]]) -> str:
+    """Render a line total, marking estimates and skipped counts."""
+    if not line_count:
+        return str(lines)
+    if line_count["mode"] == "none":
+        return "not counted"
+    return f"~{lines:,} (estimated)"
+
+
 def format_file_output(file_info: Dict[str, Any]) -> None:
     """Format and print file statistics.
     
@@ -24,10 +343,34 @@ def format_file_output(file_info: Dict[str, Any]) -> None:
     table.add_row("Size (bytes)", str(file_info["size_bytes"]))
     table.add_row("Size (KB)", str(file_info["size_kb"]))
     table.add_row("File Type", file_info["extension"])
-    table.add_row("Lines", str(file_info["lines"]))
+    table.add_row("Lines", _lines_value(file_info["lines"], file_info.get("line_count")))
+    if "binary" in file_info:
+        table.add_row("Content", "binary" if file_info["binary"] else "text")
+    if "content_metrics" in file_info:
+        metrics = file_info["content_metrics"]
+        table.add_row("Words", str(metrics["words"]))
+        table.add_row("Characters", str(metrics["chars"]))
+        table.add_row("Longest Line (chars)", str(metrics["max_line_length"]))
 
     console.print(table)
 
+    if "profile" in file_info:
+        console.print()
+        format_profile_output(file_info["profile"])
+
+    if "cache" in file_info:
+        console.print()
+        format_cache_output(file_info["cache"])
+
+
+# Why a scan stopped early, as shown above partial results
+_STOP_REASONS = {
+    "max_files": "file limit reached",
+    "max_bytes": "byte limit reached",
+    "time_budget": "time budget used up",
+    "interrupt": "interrupted",
+}
+
 
 def format_directory_output(dir_info: Dict[str, Any]) -> None:
     """Format and print directory statistics.
@@ -36,6 +379,9 @@ def format_directory_output(dir_info: Dict[str, Any]) -> None:
         dir_info: Dictionary containing directory analysis
     """
     console.print(f"\n[bold cyan]Directory Analysis[/bold cyan]\n")
+    if dir_info.get("incomplete"):
+        reason = _STOP_REASONS.get(dir_info["coverage"]["stopped_by"], "stopped")
+        console.print(f"[yellow]Partial results: the scan stopped early ({reason})[/yellow]\n")
 
     # Summary table
     summary_table = Table(title="Summary")
@@ -47,7 +393,48 @@ def format_directory_output(dir_info: Dict[str, Any]) -> None:
     summary_table.add_row("Total Size (bytes)", str(dir_info["total_size_bytes"]))
     summary_table.add_row("Total Size (KB)", str(dir_info["total_size_kb"]))
     summary_table.add_row("Total Size (MB)", str(dir_info["total_size_mb"]))
-    summary_table.add_row("Total Lines of Code", str(dir_info["total_lines"]))
+    if "physical_size_bytes" in dir_info:
+        summary_table.add_row("Size on Disk (bytes)", str(dir_info["physical_size_bytes"]))
+    line_count = dir_info.get("line_count")
+    summary_table.add_row("Total Lines of Code", _lines_value(dir_info["total_lines"], line_count))
+    if line_count and line_count["mode"] == "estimate":
+        summary_table.add_row(
+            f"Lines {line_count['confidence']:.0%} CI",
+            f"{line_count['ci_low']:,} - {line_count['ci_high']:,}",
+        )
+        summary_table.add_row(
+            "Sampled Files",
+            f"{line_count['sampled_files']} ({line_count['sampled_bytes']} bytes)",
+        )
+    if "binary_files" in dir_info:
+        summary_table.add_row("Text Files", str(dir_info["text_files"]))
+        summary_table.add_row("Text Size (bytes)", str(dir_info["text_size_bytes"]))
+        summary_table.add_row("Binary Files", str(dir_info["binary_files"]))
+        summary_table.add_row("Binary Size (bytes)", str(dir_info["binary_size_bytes"]))
+    if "content_metrics" in dir_info:
+        metrics = dir_info["content_metrics"]
+        summary_table.add_row("Words", str(metrics["words"]))
+        summary_table.add_row("Characters", str(metrics["chars"]))
+        longest = str(metrics["max_line_length"])
+        if metrics["max_line_path"]:
+            longest += f" ({metrics['max_line_path']})"
+        summary_table.add_row("Longest Line (chars)", longest)
+    if "pruned" in dir_info:
+        summary_table.add_row("Pruned Directories", str(dir_info["pruned"]["dirs"]))
+        summary_table.add_row("Pruned Files", str(dir_info["pruned"]["files"]))
+    if "links" in dir_info:
+        links = dir_info["links"]
+        summary_table.add_row("Repeated Links Skipped", f"{links['skipped_files']} ({links['skipped_bytes']} bytes)")
+        summary_table.add_row("Repeated Directories Skipped", str(links["repeated_dirs"]))
+        summary_table.add_row("Mount Points Skipped", str(links["mount_points"]))
+    if "coverage" in dir_info:
+        coverage = dir_info["coverage"]
+        summary_table.add_row(
+            "Directories Listed",
+            f"{coverage['dirs_visited']} of {coverage['dirs_visited'] + coverage['dirs_pending']} found "
+            f"({coverage['dirs_fraction']:.0%})",
+        )
+        summary_table.add_row("Scan Time (s)", str(coverage["elapsed_seconds"]))
 
     console.print(summary_table)
 
@@ -76,16 +463,83 @@ def format_directory_output(dir_info: Dict[str, Any]) -> None:
 
         console.print(largest_table)
 
+    if dir_info.get("longest_files"):
+        console.print()
+        longest_table = Table(title="Most Lines")
+        longest_table.add_column("File Name", style="cyan")
+        longest_table.add_column("Lines", style="green")
+        longest_table.add_column("Path", style="yellow")
+
+        for file_info in dir_info["longest_files"]:
+            longest_table.add_row(file_info["name"], str(file_info["lines"]), file_info["path"])
+
+        console.print(longest_table)
+
+    if dir_info.get("distributions") and dir_info["total_files"]:
+        console.print()
+        format_distributions_output(dir_info["distributions"])
+
+    if "directory_tree" in dir_info:
+        console.print()
+        format_tree_output(dir_info["directory_tree"])
+
+    if "duplicates" in dir_info:
+        console.print()
+        format_duplicates_output(dir_info["duplicates"])
+
+    if "cache" in dir_info:
+        console.print()
+        format_cache_output(dir_info["cache"])
+
+    if "profile" in dir_info:
+        console.print()
+        format_profile_output(dir_info["profile"])
+
     console.print()
 
 
+def format_multi_root_output(stats: Dict[str, Any]) -> None:
+    """Format and print a multi-root report.
+
+    Prints one summary row per root, then the combined statistics.
+
+    Args:
+        stats: Dictionary from ``MultiRootAnalyzer.analyze``
+    """
+    console.print("\n[bold cyan]Roots[/bold cyan]\n")
+
+    roots_table = Table(title="Roots")
+    roots_table.add_column("Root", style="yellow")
+    roots_table.add_column("Files", style="green", justify="right")
+    roots_table.add_column("Directories", style="green", justify="right")
+    roots_table.add_column("Size (KB)", style="cyan", justify="right")
+    roots_table.add_column("Lines", style="magenta", justify="right")
+
+    for root in stats["roots"] + [{**stats["total"], "path": "[bold]Total[/bold]"}]:
+        roots_table.add_row(
+            root["path"],
+            str(root["total_files"]),
+            str(root["total_dirs"]),
+            str(root["total_size_kb"]),
+            _lines_value(root["total_lines"], root.get("line_count")),
+        )
+
+    console.print(roots_table)
+    for path, root in stats["collapsed"].items():
+        console.print(f"[dim]{path} is covered by {root}[/dim]")
+
+    format_directory_output(stats["total"])
+
+
 def format_output(stats: Dict[str, Any]) -> None:
     """Format and print statistics based on type.
     
     Args:
-        stats: Statistics dictionary (file or directory)
+        stats: Statistics dictionary (file, directory or multi-root)
     """
-    if stats.get("is_directory"):
+    if "roots" in stats:
+        format_multi_root_output(stats)
+    elif stats.get("is_directory"):
         format_directory_output(stats)
     else:
         format_file_output(stats)
@@ -0,0 +1,199 @@
+"""Mergeable streaming histograms for size and line distributions."""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Sub-buckets per power of two are 2**SUB_BITS; values below 2**(SUB_BITS + 1)
+# get a bucket of their own
+SUB_BITS = 6
+
+# Quantiles reported by to_dict
+QUANTILES = (0.5, 0.9, 0.99)
+
+_EXACT = 1 << (SUB_BITS + 1)
+
+
+def _bucket_bounds(key: int) -> Tuple[int, int]:
+    """Return the lowest and highest value falling into a bucket."""
+    if key < _EXACT:
+        return key, key
+    shift = (key >> SUB_BITS) - 1
+    mantissa = key - (shift << SUB_BITS)
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class LogHistogram:
+    """Log-linear histogram of non-negative integers.
+
+    Values are grouped into buckets whose width grows with the value:
+    small values are counted exactly and every power of two above them is
+    split into 2**SUB_BITS equal buckets. Quantiles are read as bucket
+    midpoints, within 1 / 2**(SUB_BITS + 1) (under 1%) of the exact value;
+    the minimum and maximum are bucket bounds, within 1 / 2**SUB_BITS.
+    Values below 2**(SUB_BITS + 1) are always exact.
+
+    Only the bucket counts and the exact total are stored, which keeps
+    ``add`` cheap enough to run for every file of a scan. Memory depends
+    on the range of values seen, not on their number, and is bounded by
+    about 4,000 buckets for 64-bit values. Histograms of different scans
+    merge by adding bucket counts, with the same result as one histogram
+    fed every value.
+    """
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+
+    def add(self, value: int) -> None:
+        """Count one value.
+
+        Args:
+            value: Non-negative integer, e.g. a size in bytes
+        """
+        if value < _EXACT:
+            key = value
+        else:
+            shift = value.bit_length() - SUB_BITS - 1
+            key = (shift << SUB_BITS) + (value >> shift)
+        counts = self.counts
+        counts[key] = counts.get(key, 0) + 1
+        self.total += value
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Add the counts of another histogram.
+
+        Args:
+            other: Histogram to merge in
+        """
+        counts = self.counts
+        for key, count in other.counts.items():
+            counts[key] = counts.get(key, 0) + count
+        self.total += other.total
+
+    @property
+    def count(self) -> int:
+        """Number of values counted."""
+        return sum(self.counts.values())
+
+    def quantile(self, q: float) -> int:
+        """Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1, e.g. 0.9 for the 90th percentile
+
+        Returns:
+            The middle of the bucket holding the value of that rank (0
+            when empty)
+
+        Raises:
+            ValueError: If q is outside [0, 1]
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be between 0 and 1, got {q}")
+        count = self.count
+        if not count:
+            return 0
+
+        # Nearest rank: the smallest value with at least q of all values
+        # at or below it
+        rank = max(1, math.ceil(q * count))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                break
+        low, high = _bucket_bounds(key)
+        return (low + high) // 2
+
+    def power_of_two_bins(self) -> List[Dict[str, int]]:
+        """Coarsen the buckets into one bin per power of two.
+
+        Returns:
+            Bins in ascending order, each with low, high (inclusive) and
+            count; zeros get a bin of their own
+        """
+        bins: Dict[int, int] = {}
+        for key, count in self.counts.items():
+            exponent = _bucket_bounds(key)[0].bit_length()
+            bins[exponent] = bins.get(exponent, 0) + count
+        return [
+            {
+                "low": 1 << (exponent - 1) if exponent else 0,
+                "high": (1 << exponent) - 1,
+                "count": bins[exponent],
+            }
+            for exponent in sorted(bins)
+        ]
+
+    def to_dict(self, histogram: bool = False) -> Dict[str, Any]:
+        """Summarize the distribution.
+
+        Args:
+            histogram: Also include ``power_of_two_bins``
+
+        Returns:
+            Dictionary with count, total, mean, min and max (lower and
+            upper bound of the lowest and highest bucket) and p50/p90/p99
+        """
+        count = self.count
+        summary: Dict[str, Any] = {
+            "count": count,
+            "total": self.total,
+            "mean": round(self.total / count, 2) if count else 0,
+            "min": _bucket_bounds(min(self.counts))[0] if count else 0,
+            "max": _bucket_bounds(max(self.counts))[1] if count else 0,
+        }
+        for q in QUANTILES:
+            summary[f"p{q * 100:g}"] = self.quantile(q)
+        if histogram:
+            summary["histogram"] = self.power_of_two_bins()
+        return summary
+
+
+def merged(histograms: Iterable[LogHistogram]) -> LogHistogram:
+    """Merge histograms into a new one.
+
+    Args:
+        histograms: Histograms to combine
+
+    Returns:
+        Histogram of all their values
+    """
+    result = LogHistogram()
+    for histogram in histograms:
+        result.merge(histogram)
+    return result
+
+
+def distribution_stats(
+    sizes: Dict[str, LogHistogram],
+    lines: Optional[Dict[str, LogHistogram]] = None,
+) -> Dict[str, Any]:
+    """Build the ``distributions`` entry of the directory statistics.
+
+    Args:
+        sizes: Histogram of file sizes per extension
+        lines: Histogram of text-file line counts per extension, or None
+            when lines were not counted
+
+    Returns:
+        Dictionary with overall ``size_bytes`` (and ``lines``) summaries
+        including power-of-two bins, and the same summaries without bins
+        per extension
+    """
+    result: Dict[str, Any] = {"size_bytes": merged(sizes.values()).to_dict(histogram=True)}
+    if lines is not None:
+        result["lines"] = merged(lines.values()).to_dict(histogram=True)
+
+    extensions = {}
+    for extension in sorted(sizes, key=lambda ext: (-sizes[ext].total, ext)):
+        entry = {"size_bytes": sizes[extension].to_dict()}
+        if lines is not None and extension in lines:
+            entry["lines"] = lines[extension].to_dict()
+        extensions[extension] = entry
+    result["extensions"] = extensions
+    return result
@@ -0,0 +1,279 @@
+"""Include/exclude glob matching and .gitignore support for scans."""
+
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+
+# Excluded whenever .gitignore files are respected, as git itself does
+_GIT_DIR_RULES = [".git"]
+
+
+def translate(pattern: str) -> str:
+    """Translate a gitignore-style glob into a regular expression.
+
+    ``*`` and ``?`` do not match ``/``; ``**/`` matches zero or more
+    directories and a trailing ``/**`` everything below a directory.
+
+    Args:
+        pattern: Glob without a leading ``!`` or trailing ``/``
+
+    Returns:
+        Regular expression source (without anchors)
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+                if i + 2 == n:
+                    out.append(".*")
+                    i += 2
+                    continue
+                if pattern[i + 2] == "/":
+                    out.append("(?:.*/)?")
+                    i += 3
+                    continue
+            while i < n and pattern[i] == "*":
+                i += 1
+            out.append("[^/]*")
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                out.append("\\[")
+            else:
+                body = pattern[i + 1:j].replace("\\", "\\\\")
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_rule(line: str) -> Optional[Tuple[str, bool, bool]]:
+    """Parse one gitignore-style line.
+
+    A pattern containing ``/`` (other than a trailing one) is anchored to
+    the directory it is relative to; otherwise it matches at any depth.
+
+    Args:
+        line: Pattern line
+
+    Returns:
+        ``(regex, negate, dir_only)``, or None for blank lines and comments
+    """
+    if not line.endswith("\\ "):
+        line = line.rstrip()
+    if not line or line.startswith("#"):
+        return None
+
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith(("\\#", "\\!")):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    anchored = "/" in line
+    regex = translate(line.lstrip("/"))
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return regex, negate, dir_only
+
+
+class RuleSet:
+    """Compiled list of gitignore-style rules relative to one directory.
+
+    Without negated rules, all patterns are combined into one regular
+    expression for files and one for directories, so a lookup is a single
+    ``fullmatch`` no matter how many patterns there are. With negations
+    the last matching rule decides, as in git.
+    """
+
+    __slots__ = ("_files", "_dirs", "_ordered")
+
+    def __init__(self, rules: List[Tuple[str, bool, bool]]):
+        """Compile parsed rules.
+
+        Args:
+            rules: ``(regex, negate, dir_only)`` tuples from ``parse_rule``
+        """
+        self._files = self._dirs = None
+        self._ordered = None
+        if any(negate for _, negate, _ in rules):
+            self._ordered = [
+                (re.compile(regex), negate, dir_only)
+                for regex, negate, dir_only in reversed(rules)
+            ]
+            return
+
+        file_rules = [regex for regex, _, dir_only in rules if not dir_only]
+        if file_rules:
+            self._files = re.compile("|".join(f"(?:{regex})" for regex in file_rules))
+        if rules:
+            self._dirs = re.compile("|".join(f"(?:{regex})" for regex, _, _ in rules))
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "RuleSet":
+        """Build a rule set from pattern lines, skipping blanks and comments."""
+        return cls([rule for rule in map(parse_rule, lines) if rule is not None])
+
+    def __bool__(self) -> bool:
+        return bool(self._ordered or self._dirs)
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """Match a path relative to the rule set's directory.
+
+        Args:
+            path: Relative path using ``/`` separators
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if a rule excludes the path, False if a negated rule
+            re-includes it, None if no rule matches
+        """
+        if self._ordered is None:
+            regex = self._dirs if is_dir else self._files
+            return True if regex is not None and regex.fullmatch(path) else None
+
+        for regex, negate, dir_only in self._ordered:
+            if (is_dir or not dir_only) and regex.fullmatch(path):
+                return not negate
+        return None
+
+
+def read_gitignore(directory: str) -> Optional[RuleSet]:
+    """Load the .gitignore file of a directory, if there is one."""
+    try:
+        with open(os.path.join(directory, ".gitignore"), encoding="utf-8", errors="surrogateescape") as f:
+            rules = RuleSet.from_lines(f)
+    except OSError:
+        return None
+    return rules or None
+
+
+class PathFilter:
+    """Decides which files and directories a scan skips.
+
+    Patterns are compiled once. ``--exclude`` patterns and .gitignore files
+    exclude both files and directories; excluded directories are pruned,
+    so nothing below them is listed. ``--include`` patterns only select
+    files, so directories are always descended into.
+    """
+
+    def __init__(
+        self,
+        exclude: Optional[Iterable[str]] = None,
+        include: Optional[Iterable[str]] = None,
+        gitignore: bool = False,
+    ):
+        """Compile the patterns.
+
+        Args:
+            exclude: Glob patterns of files and directories to skip
+            include: Glob patterns of the only files to count
+            gitignore: Also skip what .gitignore files (and ``.git``) exclude
+        """
+        self.exclude = RuleSet.from_lines(exclude or ()) or None
+        self.include = RuleSet.from_lines(include or ()) or None
+        self.gitignore = gitignore
+
+    def __bool__(self) -> bool:
+        return bool(self.exclude or self.include or self.gitignore)
+
+    def root(self, root: str) -> "DirFilter":
+        """Return the matcher for the entries of the scanned directory.
+
+        Args:
+            root: Scanned directory
+
+        Returns:
+            Matcher for the root directory
+        """
+        gitignores: Tuple[Tuple[int, RuleSet], ...] = ()
+        if self.gitignore:
+            gitignores = ((0, RuleSet.from_lines(_GIT_DIR_RULES)),)
+            rules = read_gitignore(root)
+            if rules:
+                gitignores += ((0, rules),)
+        return DirFilter(self, "", gitignores)
+
+
+class DirFilter:
+    """Matcher for the entries of one directory.
+
+    Holds the directory's path relative to the scan root and the
+    .gitignore rule sets that apply to it, deepest last.
+    """
+
+    __slots__ = ("_filter", "_prefix", "_gitignores")
+
+    def __init__(self, path_filter: PathFilter, prefix: str, gitignores: Tuple[Tuple[int, RuleSet], ...]):
+        self._filter = path_filter
+        self._prefix = prefix
+        self._gitignores = gitignores
+
+    def excludes(self, name: str, is_dir: bool) -> bool:
+        """Check whether an entry of this directory is skipped.
+
+        Args:
+            name: Entry name
+            is_dir: Whether the entry is a directory
+
+        Returns:
+            True if the entry should not be scanned
+        """
+        path = self._prefix + name
+        path_filter = self._filter
+        if path_filter.exclude is not None and path_filter.exclude.match(path, is_dir):
+            return True
+
+        # Deeper .gitignore files take precedence
+        for base, rules in reversed(self._gitignores):
+            decision = rules.match(path[base:], is_dir)
+            if decision is not None:
+                if decision:
+                    return True
+                break
+
+        if not is_dir and path_filter.include is not None:
+            return not path_filter.include.match(path, False)
+        return False
+
+    def descend(self, path: str, name: str) -> "DirFilter":
+        """Return the matcher for a subdirectory.
+
+        Args:
+            path: Absolute path of the subdirectory
+            name: Name of the subdirectory
+
+        Returns:
+            Matcher for the subdirectory's entries
+        """
+        prefix = self._prefix + name + "/"
+        gitignores = self._gitignores
+        if self._filter.gitignore:
+            rules = read_gitignore(path)
+            if rules:
+                gitignores += ((len(prefix), rules),)
+        return DirFilter(self._filter, prefix, gitignores)
@@ -0,0 +1,360 @@
+"""Compact columnar index of scanned files."""
+
+import heapq
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+from filestat.aggregate import DirectoryAggregate
+from filestat.counting import BINARY
+
+
+MAGIC = b"FSTATIDX"
+VERSION = 2
+
+# magic, version, big-endian flag, rows, directories, extensions, total files, total dirs
+_HEADER = struct.Struct("<8sHBxQQQQQ")
+_LENGTH = struct.Struct("<Q")
+
+# Array typecodes for each numeric column
+_INDEX_TYPE = "I"
+_VALUE_TYPE = "q"
+
+
+def _encode_strings(strings: List[str]) -> bytes:
+    """Encode strings as one NUL-separated UTF-8 blob."""
+    return "\0".join(strings).encode("utf-8", "surrogateescape")
+
+
+def _decode_strings(blob: bytes, count: int) -> List[str]:
+    """Decode a blob written by ``_encode_strings``."""
+    if not count:
+        return []
+    return blob.decode("utf-8", "surrogateescape").split("\0")
+
+
+class FileIndex:
+    """Per-file data from one scan, stored column by column.
+
+    Directory prefixes and extensions are interned into lookup tables, and
+    numeric columns use ``array`` storage, so a row costs a few dozen bytes
+    plus its file name instead of a dict per file. Rows keep scan order.
+
+    Columns:
+        dir_ids: Index into ``dirs`` of the file's directory prefix
+        names: File names
+        ext_ids: Index into ``extensions``
+        sizes: Apparent sizes in bytes
+        physical: Bytes allocated on disk
+        lines: Line counts (BINARY for binary files)
+        mtimes: Modification times in nanoseconds
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.dirs: List[str] = []
+        self.extensions: List[str] = []
+        self.names: List[str] = []
+        self.dir_ids = array(_INDEX_TYPE)
+        self.ext_ids = array(_INDEX_TYPE)
+        self.sizes = array(_VALUE_TYPE)
+        self.physical = array(_VALUE_TYPE)
+        self.lines = array(_VALUE_TYPE)
+        self.mtimes = array(_VALUE_TYPE)
+        self.total_files = 0
+        self.total_dirs = 0
+        self._dir_map: Dict[str, int] = {}
+        self._ext_map: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _intern(self, value: str, table: List[str], mapping: Dict[str, int]) -> int:
+        """Return the id of ``value`` in a lookup table, adding it if needed."""
+        index = mapping.get(value)
+        if index is None:
+            index = mapping[value] = len(table)
+            table.append(value)
+        return index
+
+    def add(
+        self,
+        relpath: str,
+        extension: str,
+        size: int,
+        lines: int,
+        mtime_ns: int,
+        physical: Optional[int] = None,
+    ) -> None:
+        """Append a row.
+
+        Args:
+            relpath: Path relative to the scanned directory
+            extension: File extension, or "no_ext"
+            size: Apparent size in bytes
+            lines: Line count, or BINARY for binary files
+            mtime_ns: Modification time in nanoseconds
+            physical: Bytes allocated on disk, or None to use ``size``
+        """
+        cut = relpath.rfind(os.sep) + 1
+        self.dir_ids.append(self._intern(relpath[:cut], self.dirs, self._dir_map))
+        self.names.append(relpath[cut:])
+        self.ext_ids.append(self._intern(extension, self.extensions, self._ext_map))
+        self.sizes.append(size)
+        self.physical.append(size if physical is None else physical)
+        self.lines.append(lines)
+        self.mtimes.append(mtime_ns)
+
+    def path(self, row: int) -> str:
+        """Return the relative path of a row."""
+        return self.dirs[self.dir_ids[row]] + self.names[row]
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Return one row as a dictionary.
+
+        Args:
+            row: Row number
+
+        Returns:
+            Dictionary with path, name, extension, size_bytes, lines,
+            binary and mtime_ns
+        """
+        lines = self.lines[row]
+        return {
+            "path": self.path(row),
+            "name": self.names[row],
+            "extension": self.extensions[self.ext_ids[row]],
+            "size_bytes": self.sizes[row],
+            "lines": max(lines, 0),
+            "binary": lines == BINARY,
+            "mtime_ns": self.mtimes[row],
+        }
+
+    def select(
+        self,
+        extensions: Optional[Iterable[str]] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        min_lines: Optional[int] = None,
+        max_lines: Optional[int] = None,
+        modified_after_ns: Optional[int] = None,
+    ) -> List[int]:
+        """Return the rows matching every given filter.
+
+        Args:
+            extensions: Keep only these extensions (e.g. ".log", "no_ext")
+            min_size: Minimum size in bytes
+            max_size: Maximum size in bytes
+            min_lines: Minimum line count (binary files never match)
+            max_lines: Maximum line count (binary files never match)
+            modified_after_ns: Keep files modified after this time
+
+        Returns:
+            Matching row numbers in scan order
+        """
+        rows = range(len(self))
+
+        if extensions is not None:
+            wanted = {self._ext_map[ext] for ext in extensions if ext in self._ext_map}
+            ext_ids = self.ext_ids
+            rows = [row for row in rows if ext_ids[row] in wanted]
+        if min_size is not None:
+            sizes = self.sizes
+            rows = [row for row in rows if sizes[row] >= min_size]
+        if max_size is not None:
+            sizes = self.sizes
+            rows = [row for row in rows if sizes[row] <= max_size]
+        if min_lines is not None:
+            lines = self.lines
+            rows = [row for row in rows if lines[row] >= min_lines and lines[row] != BINARY]
+        if max_lines is not None:
+            lines = self.lines
+            rows = [row for row in rows if 0 <= lines[row] <= max_lines]
+        if modified_after_ns is not None:
+            mtimes = self.mtimes
+            rows = [row for row in rows if mtimes[row] > modified_after_ns]
+
+        return list(rows)
+
+    def top(self, k: int, by: str = "size", rows: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """Return the ``k`` largest rows by size or line count.
+
+        Ties keep scan order.
+
+        Args:
+            k: Number of rows to return
+            by: "size" or "lines"
+            rows: Rows to consider (defaults to all)
+
+        Returns:
+            Records of the top rows, largest first
+
+        Raises:
+            ValueError: If ``by`` is not "size" or "lines"
+        """
+        if by not in ("size", "lines"):
+            raise ValueError(f"Cannot rank by {by!r}; use 'size' or 'lines'")
+
+        column = self.sizes if by == "size" else self.lines
+        candidates = range(len(self)) if rows is None else rows
+        best = heapq.nlargest(k, candidates, key=column.__getitem__)
+        return [self.record(row) for row in best]
+
+    def group_by_extension(self, rows: Optional[Iterable[int]] = None) -> Dict[str, Dict[str, int]]:
+        """Summarize rows per extension.
+
+        Args:
+            rows: Rows to include (defaults to all)
+
+        Returns:
+            Mapping of extension to files, size_bytes and lines
+        """
+        counts = [0] * len(self.extensions)
+        sizes = [0] * len(self.extensions)
+        lines = [0] * len(self.extensions)
+        ext_ids, size_col, line_col = self.ext_ids, self.sizes, self.lines
+
+        for row in (range(len(self)) if rows is None else rows):
+            ext_id = ext_ids[row]
+            counts[ext_id] += 1
+            sizes[ext_id] += size_col[row]
+            if line_col[row] > 0:
+                lines[ext_id] += line_col[row]
+
+        return {
+            ext: {"files": counts[i], "size_bytes": sizes[i], "lines": lines[i]}
+            for i, ext in enumerate(self.extensions)
+            if counts[i]
+        }
+
+    def to_stats(
+        self,
+        top: int = 5,
+        rows: Optional[Iterable[int]] = None,
+        depth: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Compute directory statistics from the index.
+
+        With all rows this equals what ``FileAnalyzer.analyze_directory``
+        returned for the scan that built the index.
+
+        Args:
+            top: Number of files to list by size and by line count
+            rows: Rows to include (defaults to all)
+            depth: Directory levels for a rollup tree, or None to skip it
+
+        Returns:
+            Dictionary with directory analysis results
+        """
+        aggregate = DirectoryAggregate(top, depth)
+        add = aggregate.add
+        extensions, ext_ids, sizes, lines, physical = (
+            self.extensions, self.ext_ids, self.sizes, self.lines, self.physical
+        )
+
+        for row in (range(len(self)) if rows is None else rows):
+            add(self.path(row), extensions[ext_ids[row]], sizes[row], lines[row], physical[row])
+
+        if rows is None:
+            aggregate.total_files = self.total_files
+        else:
+            aggregate.total_files = aggregate.text_files + aggregate.binary_files
+        aggregate.total_dirs = self.total_dirs
+        return aggregate.to_stats()
+
+    def save(self, path: str) -> None:
+        """Write the index to a binary file.
+
+        Args:
+            path: Destination file
+        """
+        header = _HEADER.pack(
+            MAGIC, VERSION, sys.byteorder == "big", len(self),
+            len(self.dirs), len(self.extensions), self.total_files, self.total_dirs,
+        )
+        sections = [
+            _encode_strings(self.dirs),
+            _encode_strings(self.extensions),
+            _encode_strings(self.names),
+            self.dir_ids.tobytes(),
+            self.ext_ids.tobytes(),
+            self.sizes.tobytes(),
+            self.lines.tobytes(),
+            self.mtimes.tobytes(),
+            self.physical.tobytes(),
+        ]
+
+        with open(path, "wb") as f:
+            f.write(header)
+            for section in sections:
+                f.write(_LENGTH.pack(len(section)))
+                f.write(section)
+
+    @classmethod
+    def load(cls, path: str) -> "FileIndex":
+        """Read an index written by ``save``.
+
+        Args:
+            path: Index file
+
+        Returns:
+            The loaded index
+
+        Raises:
+            ValueError: If the file is not a compatible index, or is
+                truncated or corrupt
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+
+        if len(data) < _HEADER.size:
+            raise ValueError(f"Not a filestat index: {path}")
+        magic, version, big_endian, rows, n_dirs, n_exts, total_files, total_dirs = \
+            _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"Not a filestat index: {path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported index version {version}: {path}")
+
+        sections = []
+        offset = _HEADER.size
+        for _ in range(9):
+            if offset + _LENGTH.size > len(data):
+                raise ValueError(f"Truncated filestat index: {path}")
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            if offset + length > len(data):
+                raise ValueError(f"Truncated filestat index: {path}")
+            sections.append(data[offset:offset + length])
+            offset += length
+
+        index = cls()
+        index.dirs = _decode_strings(sections[0], n_dirs)
+        index.extensions = _decode_strings(sections[1], n_exts)
+        index.names = _decode_strings(sections[2], rows)
+        if len(index.dirs) != n_dirs or len(index.extensions) != n_exts or len(index.names) != rows:
+            raise ValueError(f"Corrupt filestat index: {path}")
+        index.total_files = total_files
+        index.total_dirs = total_dirs
+
+        swap = bool(big_endian) != (sys.byteorder == "big")
+        for name, typecode, blob in (
+            ("dir_ids", _INDEX_TYPE, sections[3]),
+            ("ext_ids", _INDEX_TYPE, sections[4]),
+            ("sizes", _VALUE_TYPE, sections[5]),
+            ("lines", _VALUE_TYPE, sections[6]),
+            ("mtimes", _VALUE_TYPE, sections[7]),
+            ("physical", _VALUE_TYPE, sections[8]),
+        ):
+            column = array(typecode)
+            if len(blob) != rows * column.itemsize:
+                raise ValueError(f"Corrupt filestat index: {path}")
+            column.frombytes(blob)
+            if swap:
+                column.byteswap()
+            setattr(index, name, column)
+
+        index._dir_map = {value: i for i, value in enumerate(index.dirs)}
+        index._ext_map = {value: i for i, value in enumerate(index.extensions)}
+        return index
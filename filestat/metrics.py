@@ -0,0 +1,286 @@
+"""Single-pass content metrics: lines, words, bytes, characters and line length.
+
+``wc`` reports these from one read of each file. ``ContentTally`` does the
+same over the buffers ``filestat`` already reads, with one of two kernels
+that give identical results:
+
+- "numpy" classifies every byte of a buffer with vectorized comparisons and
+  counts word starts and line lengths from the resulting masks,
+- "python" uses ``bytes.translate``, ``bytes.count`` and
+  ``bytes.splitlines``, so it needs nothing beyond the standard library.
+
+Definitions follow ``wc`` in the C locale, extended to UTF-8 characters:
+
+- lines follow ``filestat.counting.LineTally`` (universal newlines, and a
+  final line without a line ending counts),
+- words are runs of bytes other than ASCII whitespace (space, ``\\t``,
+  ``\\n``, ``\\v``, ``\\f``, ``\\r``),
+- characters are bytes that do not continue a UTF-8 sequence
+  (``0x80``-``0xBF``), so valid UTF-8 counts one per code point and other
+  data counts per byte,
+- the maximum line length is in characters, excluding line endings, with
+  a tab counted as one character.
+
+NumPy is optional and only imported when the "numpy" kernel is first used.
+"""
+
+from typing import Any, Dict, Union
+from filestat.counting import BINARY, BUFFER_SIZE, LineTally
+from filestat.sniff import SNIFF_SIZE, is_binary_block
+
+
+# Kernels accepted by ContentTally: "auto" picks "numpy" when it is installed
+KERNELS = ("auto", "numpy", "python")
+
+# Bytes that end a line or separate words
+_TERMINATORS = b"\n\r"
+_WHITESPACE = b" \t\n\v\f\r"
+
+# Every byte except UTF-8 continuation bytes; deleting these leaves the
+# continuation bytes of a buffer
+_NOT_CONTINUATION = bytes(range(0x80)) + bytes(range(0xC0, 0x100))
+
+# Maps whitespace to b" " and everything else to b"x", so word starts are
+# occurrences of b" x"
+_WORD_CLASSES = bytes(0x20 if b in _WHITESPACE else 0x78 for b in range(256))
+_SPACE = 0x20
+
+_numpy: Any = None
+
+
+def _import_numpy() -> Any:
+    """Import NumPy once, returning None if it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def numpy_available() -> bool:
+    """Check whether the "numpy" kernel can be used."""
+    return _import_numpy() is not None
+
+
+def resolve_kernel(kernel: str = "auto") -> str:
+    """Turn a kernel choice into the kernel that will run.
+
+    Args:
+        kernel: "auto", "numpy" or "python"
+
+    Returns:
+        "numpy" or "python"
+
+    Raises:
+        ValueError: If the kernel is unknown, or "numpy" is requested but
+            NumPy is not installed
+    """
+    if kernel not in KERNELS:
+        raise ValueError(f"Unknown metrics kernel: {kernel}")
+    if kernel == "python":
+        return kernel
+    if numpy_available():
+        return "numpy"
+    if kernel == "numpy":
+        raise ValueError("The numpy metrics kernel needs NumPy (pip install numpy)")
+    return "python"
+
+
+class ContentMetrics(int):
+    """Line count of a text file that also carries its other metrics.
+
+    Being an int, it stands in for the plain line count anywhere one is
+    expected (totals, caches, snapshots), while scans in metrics mode read
+    ``words``, ``chars``, ``bytes`` and ``max_line_length`` from it.
+    """
+
+    def __new__(cls, lines: int = 0, words: int = 0, chars: int = 0, bytes: int = 0, max_line_length: int = 0):
+        """Create metrics for one file or byte stream."""
+        self = super().__new__(cls, lines)
+        self.words = words
+        self.chars = chars
+        self.bytes = bytes
+        self.max_line_length = max_line_length
+        return self
+
+    def __reduce__(self):
+        """Pickle with every metric, for process pool workers."""
+        return (ContentMetrics, (int(self), self.words, self.chars, self.bytes, self.max_line_length))
+
+    @property
+    def lines(self) -> int:
+        """Number of lines."""
+        return int(self)
+
+    def to_dict(self) -> Dict[str, int]:
+        """Return the metrics as plain data, in ``wc`` order."""
+        return {
+            "lines": int(self),
+            "words": self.words,
+            "chars": self.chars,
+            "bytes": self.bytes,
+            "max_line_length": self.max_line_length,
+        }
+
+
+class ContentTally:
+    """Content metrics for a contiguous run of bytes, fed buffer by buffer.
+
+    Words and lines may span buffers; the state carried between ``feed``
+    calls (whether the last byte was inside a word, and the length of the
+    open line) makes the result independent of how the data is split.
+    """
+
+    __slots__ = ("line_tally", "words", "chars", "bytes", "max_line_length", "kernel", "_in_word", "_open_line")
+
+    def __init__(self, kernel: str = "auto"):
+        """Initialize an empty tally.
+
+        Args:
+            kernel: "auto", "numpy" or "python" (see ``resolve_kernel``)
+
+        Raises:
+            ValueError: If the kernel is unknown or unavailable
+        """
+        self.kernel = resolve_kernel(kernel)
+        self.line_tally = LineTally()
+        self.words = 0
+        self.chars = 0
+        self.bytes = 0
+        self.max_line_length = 0
+        self._in_word = False
+        self._open_line = 0
+
+    def feed(self, data: bytes) -> None:
+        """Add a buffer that follows the bytes seen so far.
+
+        Args:
+            data: bytes or bytearray holding the data
+        """
+        if not data:
+            return
+        self.line_tally.feed(data, len(data))
+        self.bytes += len(data)
+        if self.kernel == "numpy":
+            self._feed_numpy(data)
+        else:
+            self._feed_python(data)
+
+    def _feed_python(self, data: bytes) -> None:
+        """Count words, characters and line lengths with bytes methods."""
+        n = len(data)
+        ascii = data.isascii()
+        continuation = 0 if ascii else len(data.translate(None, _NOT_CONTINUATION))
+        self.chars += n - continuation
+
+        classes = data.translate(_WORD_CLASSES)
+        words = classes.count(b" x")
+        if classes[0] != _SPACE and not self._in_word:
+            words += 1
+        self.words += words
+        self._in_word = classes[-1] != _SPACE
+
+        # splitlines drops the line endings and adds no empty segment
+        # after a final one, so the last segment is open unless the
+        # buffer ends with a line ending
+        segments = data.splitlines()
+        best = self.max_line_length
+        if ascii:
+            first = len(segments[0]) + self._open_line
+            last = len(segments[-1])
+            longest = max(map(len, segments))
+        else:
+            first = _chars(segments[0]) + self._open_line
+            last = _chars(segments[-1])
+            # A segment has at most as many characters as bytes, so only
+            # segments longer in bytes than the best so far can win
+            longest = max((_chars(s) for s in segments if len(s) > best), default=0)
+
+        if data[-1] in _TERMINATORS:
+            self._open_line = 0
+        else:
+            self._open_line = first if len(segments) == 1 else last
+        self.max_line_length = max(best, first, longest)
+
+    def _feed_numpy(self, data: bytes) -> None:
+        """Count words, characters and line lengths from byte masks."""
+        np = _numpy
+        a = np.frombuffer(data, dtype=np.uint8)
+        n = len(a)
+        # Continuation bytes 0x80-0xBF are the signed bytes below -64
+        continuation = a.view(np.int8) < -64
+        continued = int(np.count_nonzero(continuation))
+        self.chars += n - continued
+
+        # Whitespace is the space and 0x09-0x0D; a word starts at a
+        # non-space byte after a space byte
+        space = (a == 0x20) | (np.subtract(a, 0x09, dtype=np.uint8) < 5)
+        words = int(np.count_nonzero(space[:-1] > space[1:]))
+        if not space[0] and not self._in_word:
+            words += 1
+        self.words += words
+        self._in_word = not bool(space[-1])
+
+        # Characters before each line ending; a line between two endings
+        # is one character (the first ending) shorter than the difference
+        ends = np.flatnonzero((a == 0x0A) | (a == 0x0D))
+        total = n - continued
+        if continued and len(ends):
+            ends = ends - np.searchsorted(np.flatnonzero(continuation), ends)
+        best = self.max_line_length
+        if len(ends):
+            best = max(best, int(ends[0]) + self._open_line)
+            if len(ends) > 1:
+                best = max(best, int(np.diff(ends).max()) - 1)
+            tail = total - int(ends[-1]) - 1
+        else:
+            tail = total + self._open_line
+        self._open_line = tail
+        self.max_line_length = max(best, tail)
+
+    def metrics(self) -> ContentMetrics:
+        """Return the metrics of the bytes fed so far."""
+        return ContentMetrics(
+            self.line_tally.lines, self.words, self.chars, self.bytes, self.max_line_length
+        )
+
+
+def _chars(segment: bytes) -> int:
+    """Count the UTF-8 characters of a segment."""
+    return len(segment) - len(segment.translate(None, _NOT_CONTINUATION))
+
+
+def content_metrics(
+    path: str,
+    kernel: str = "auto",
+    buffer_size: int = BUFFER_SIZE,
+    sniff: bool = False,
+) -> Union[ContentMetrics, int]:
+    """Compute lines, words, bytes, characters and line length in one read.
+
+    Args:
+        path: Path to the file
+        kernel: "auto", "numpy" or "python" (see ``resolve_kernel``)
+        buffer_size: Size of each read in bytes
+        sniff: Classify the first read and stop early on binary data
+
+    Returns:
+        ContentMetrics for the file, or BINARY if ``sniff`` is set and the
+        file looks binary
+
+    Raises:
+        OSError: If the file cannot be opened or read
+        ValueError: If the kernel is unknown or unavailable
+    """
+    tally = ContentTally(kernel)
+    with open(path, "rb", buffering=0) as f:
+        data = f.read(buffer_size)
+        if sniff and data and is_binary_block(data[:SNIFF_SIZE]):
+            return BINARY
+        while data:
+            tally.feed(data)
+            data = f.read(buffer_size)
+    return tally.metrics()
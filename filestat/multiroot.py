@@ -0,0 +1,162 @@
+"""Analysis of several directories in one scan."""
+
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from filestat.aggregate import DirectoryAggregate
+from filestat.analyzer import FileAnalyzer, _file_record
+
+
+def read_path_list(path: str) -> List[str]:
+    """Read paths to analyze from a file, one per line.
+
+    Blank lines and lines starting with ``#`` are skipped.
+
+    Args:
+        path: File to read, or "-" for standard input
+
+    Returns:
+        Paths in file order
+    """
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def canonical_roots(paths: Iterable[str]) -> Tuple[List[str], Dict[str, str]]:
+    """Resolve paths and drop the ones another path already covers.
+
+    Paths are expanded and resolved (following symlinks), so different
+    spellings of one directory are recognized. A path equal to or inside
+    another one is collapsed into it, since a scan of the outer directory
+    already counts its files.
+
+    Args:
+        paths: Paths as given by the user
+
+    Returns:
+        ``(roots, collapsed)``: the remaining roots in the order first
+        given, and a mapping from each dropped path to the root covering it
+
+    Raises:
+        FileNotFoundError: If a path does not exist
+    """
+    resolved: Dict[str, str] = {}
+    given: List[Tuple[str, str]] = []
+    for path in paths:
+        real = os.path.realpath(os.path.expanduser(path))
+        if not os.path.exists(real):
+            raise FileNotFoundError(f"Path does not exist: {path}")
+        given.append((path, real))
+        resolved.setdefault(real, path)
+
+    # Shorter paths first, so every ancestor is kept before its descendants
+    kept: List[str] = []
+    for real in sorted(resolved, key=len):
+        if not any(real.startswith(os.path.join(root, "")) for root in kept):
+            kept.append(real)
+    kept_set = set(kept)
+
+    roots = [real for real in resolved if real in kept_set]
+    collapsed = {}
+    for path, real in given:
+        if resolved[real] != path or real not in kept_set:
+            collapsed[path] = next(root for root in kept if real == root or real.startswith(os.path.join(root, "")))
+    return roots, collapsed
+
+
+class MultiRootAnalyzer(FileAnalyzer):
+    """Analyzes several directories through one shared scan.
+
+    All roots go through one chained traversal, so line counting uses a
+    single worker pool and cache however many roots there are. Each root
+    gets its own report, and a combined total is merged from them.
+    Duplicate detection runs across all roots. ``analyze_directory`` and
+    ``build_index``, inherited from FileAnalyzer, only cover the first root.
+    """
+
+    def __init__(self, paths: Iterable[str], **options: Any):
+        """Initialize the analyzer.
+
+        Args:
+            paths: Directories to analyze; nested and repeated paths are
+                collapsed (see ``canonical_roots``)
+            **options: FileAnalyzer options, applied to every root
+
+        Raises:
+            FileNotFoundError: If a path does not exist
+            NotADirectoryError: If a path is not a directory
+            ValueError: If no paths are given or an option is invalid
+        """
+        roots, collapsed = canonical_roots(paths)
+        if not roots:
+            raise ValueError("No paths to analyze")
+        for root in roots:
+            if not os.path.isdir(root):
+                raise NotADirectoryError(f"Not a directory: {root} (multiple paths must be directories)")
+
+        super().__init__(roots[0], **options)
+        self.roots = roots
+        self.collapsed = collapsed
+
+    def _new_aggregates(self) -> Tuple[List[DirectoryAggregate], DirectoryAggregate]:
+        """Create per-root aggregates and the combined total."""
+        return [DirectoryAggregate(self.top, self.depth) for _ in self.roots], DirectoryAggregate(self.top)
+
+    def _report(self, aggregates: List[DirectoryAggregate], total: DirectoryAggregate) -> Dict[str, Any]:
+        """Build the multi-root statistics dictionary."""
+        return {
+            "roots": [
+                {"path": root, **aggregate.to_stats()}
+                for root, aggregate in zip(self.roots, aggregates)
+            ],
+            "total": total.to_stats(),
+            "collapsed": dict(self.collapsed),
+        }
+
+    def analyze(self) -> Dict[str, Any]:
+        """Scan every root.
+
+        Returns:
+            Dictionary with ``roots`` (per-root statistics in the shape of
+            ``analyze_directory`` plus the root ``path``), ``total``
+            (combined statistics, with paths prefixed by their root) and
+            ``collapsed`` (paths dropped as repeated or nested)
+        """
+        aggregates, total = self._new_aggregates()
+        for _ in self._scan_roots(self.roots, aggregates, total):
+            pass
+        return self._report(aggregates, total)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Scan every root (same as ``analyze``)."""
+        return self.analyze()
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Stream one record per file, with absolute paths.
+
+        Yields:
+            Dictionaries with path, name, extension, size_bytes and lines
+        """
+        aggregates, total = self._new_aggregates()
+        for index, relpath, extension, st, lines in self._scan_roots(self.roots, aggregates, total):
+            yield _file_record(os.path.join(self.roots[index], relpath), extension, st.st_size, lines)
+
+    def iter_events(self, interval: float = 1.0) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream per-file records, then the multi-root report.
+
+        Args:
+            interval: Unused; per-root totals are only final once every
+                root has been scanned, so no progress events are sent
+
+        Yields:
+            ``("file", record)`` for every file (with absolute paths) and
+            a final ``("summary", report)``
+        """
+        aggregates, total = self._new_aggregates()
+        for index, relpath, extension, st, lines in self._scan_roots(self.roots, aggregates, total):
+            yield "file", _file_record(os.path.join(self.roots[index], relpath), extension, st.st_size, lines)
+        yield "summary", self._report(aggregates, total)
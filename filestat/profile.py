@@ -0,0 +1,146 @@
+"""Phase timers and counters for profiling scans."""
+
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+from filestat.counting import BINARY
+from filestat.topk import TopK
+
+
+# Phases in report order
+PHASES = ("listing", "stat", "read", "aggregate", "hash", "render")
+
+
+class ScanProfile:
+    """Collects where the time of one scan goes.
+
+    Nothing in the scan calls into a profile unless profiling was requested.
+    Instrumented code paths are chosen once per scan, so an unprofiled scan
+    pays at most a ``None`` check per file.
+
+    Phases:
+        listing: Reading directory entries (``os.scandir``)
+        stat: ``DirEntry.stat`` calls
+        read: Opening files and counting lines; with several workers this
+            is summed over workers and can exceed the wall time
+        aggregate: Updating running totals
+        hash: Hashing duplicate candidates (``--duplicates``)
+        render: Printing the report (recorded by the CLI)
+
+    Counters:
+        dirs_listed: Directories opened with ``os.scandir``
+        stat_calls: File stat calls
+        files_counted: Files whose lines were counted (cache misses)
+        bytes_counted: Size of the text files whose lines were counted
+    """
+
+    def __init__(self, slowest: int = 5):
+        """Initialize empty timers.
+
+        Args:
+            slowest: Number of slowest files to keep
+        """
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.slowest = TopK(slowest)
+        self.scan_seconds = 0.0
+        self.extra_seconds = 0.0
+        self.files = 0
+        self.size_bytes = 0
+        self._started: Optional[float] = None
+
+    def start(self) -> None:
+        """Start the wall clock."""
+        self._started = time.perf_counter()
+
+    def stop(self, files: int, size_bytes: int) -> None:
+        """Stop the wall clock and record what the scan covered.
+
+        Args:
+            files: Number of files scanned
+            size_bytes: Total size of the scanned files
+        """
+        if self._started is not None:
+            self.scan_seconds += time.perf_counter() - self._started
+            self._started = None
+        self.files = files
+        self.size_bytes = size_bytes
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add a phase that ran after the scan, such as rendering.
+
+        The time counts towards the wall time but not towards the scan
+        rates.
+
+        Args:
+            name: Phase name
+            seconds: Time spent
+        """
+        self.seconds[name] += seconds
+        self.extra_seconds += seconds
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """Wrap a function so every call is timed as part of a phase.
+
+        Args:
+            name: Phase name
+            func: Function to wrap
+
+        Returns:
+            Wrapped function with the same signature
+        """
+        clock = time.perf_counter
+        seconds = self.seconds
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds[name] += clock() - start
+
+        return wrapper
+
+    def file_counted(self, relpath: str, size: int, lines: int, seconds: float) -> None:
+        """Record the line count of one file.
+
+        Args:
+            relpath: Path relative to the scanned directory
+            size: Size in bytes
+            lines: Line count, or BINARY for binary files
+            seconds: Time spent counting
+        """
+        self.seconds["read"] += seconds
+        self.counters["files_counted"] += 1
+        if lines != BINARY:
+            self.counters["bytes_counted"] += size
+        self.slowest.push(seconds, relpath, size)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the profile as plain data.
+
+        Returns:
+            Dictionary with wall_seconds, phases (seconds and share of the
+            wall time), counters, slowest_files, and files_per_s and
+            bytes_per_s over the scan itself
+        """
+        wall = self.scan_seconds + self.extra_seconds
+        scan = self.scan_seconds
+        return {
+            "wall_seconds": wall,
+            "phases": {
+                name: {
+                    "seconds": self.seconds[name],
+                    "share": self.seconds[name] / wall if wall else 0.0,
+                }
+                for name in PHASES
+                if name in self.seconds
+            },
+            "counters": dict(self.counters),
+            "slowest_files": [
+                {"path": relpath, "seconds": seconds, "size_bytes": size}
+                for seconds, relpath, size in self.slowest.items()
+            ],
+            "files_per_s": self.files / scan if scan else 0.0,
+            "bytes_per_s": self.size_bytes / scan if scan else 0.0,
+        }
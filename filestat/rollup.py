@@ -0,0 +1,116 @@
+"""Per-directory (du-style) rollups built during a scan."""
+
+import os
+from collections import defaultdict
+from typing import Any, Dict, List
+
+
+class DirectoryRollup:
+    """Collects per-directory totals and rolls them up into subtrees.
+
+    During the scan only the directory that directly contains each file is
+    updated, so the cost per file is one dictionary lookup. ``tree`` then
+    adds every directory's totals into its parent bottom-up, which is
+    linear in the number of directories.
+    """
+
+    def __init__(self):
+        """Initialize empty per-directory totals."""
+        # relative directory path -> [files, size_bytes, lines]
+        self.direct: Dict[str, List[int]] = {}
+
+    def add(self, relpath: str, size: int, lines: int) -> None:
+        """Add one file to the totals of its directory.
+
+        Args:
+            relpath: File path relative to the scanned directory
+            size: Size in bytes
+            lines: Line count (0 for binary files)
+        """
+        cut = relpath.rfind(os.sep)
+        key = relpath[:cut] if cut > 0 else ""
+        totals = self.direct.get(key)
+        if totals is None:
+            totals = self.direct[key] = [0, 0, 0]
+        totals[0] += 1
+        totals[1] += size
+        totals[2] += lines
+
+    def subtree_totals(self) -> Dict[str, List[int]]:
+        """Return cumulative totals for every directory that holds files.
+
+        Returns:
+            Mapping of relative directory path ("" for the root) to
+            ``[files, size_bytes, lines]`` including all subdirectories
+        """
+        sep = os.sep
+        totals = {key: list(values) for key, values in self.direct.items()}
+        totals.setdefault("", [0, 0, 0])
+
+        # Make sure every ancestor exists, then bucket directories by depth
+        by_depth: Dict[int, List[str]] = defaultdict(list)
+        pending = list(totals)
+        while pending:
+            key = pending.pop()
+            depth = key.count(sep) + 1 if key else 0
+            by_depth[depth].append(key)
+            if key:
+                cut = key.rfind(sep)
+                parent = key[:cut] if cut > 0 else ""
+                if parent not in totals:
+                    totals[parent] = [0, 0, 0]
+                    pending.append(parent)
+
+        for depth in sorted(by_depth, reverse=True):
+            if depth == 0:
+                continue
+            for key in by_depth[depth]:
+                cut = key.rfind(sep)
+                parent = totals[key[:cut] if cut > 0 else ""]
+                child = totals[key]
+                parent[0] += child[0]
+                parent[1] += child[1]
+                parent[2] += child[2]
+
+        return totals
+
+    def tree(self, depth: int, limit: int = 0) -> Dict[str, Any]:
+        """Build a nested tree of subtree totals.
+
+        Args:
+            depth: Number of directory levels below the root to include
+            limit: Maximum children per directory, heaviest first
+                (0 for no limit)
+
+        Returns:
+            Root node; each node has path, name, files, size_bytes, lines,
+            children and, when children were cut off, omitted_dirs
+        """
+        sep = os.sep
+        totals = self.subtree_totals()
+        children: Dict[str, List[str]] = defaultdict(list)
+        for key in totals:
+            if key:
+                cut = key.rfind(sep)
+                children[key[:cut] if cut > 0 else ""].append(key)
+
+        def build(key: str, level: int) -> Dict[str, Any]:
+            files, size, lines = totals[key]
+            node = {
+                "path": key or ".",
+                "name": os.path.basename(key) or ".",
+                "files": files,
+                "size_bytes": size,
+                "lines": lines,
+                "children": [],
+            }
+            if level < depth:
+                # Heaviest first; ties by path for stable output
+                kids = sorted(children[key], key=lambda k: (-totals[k][1], k))
+                if limit and len(kids) > limit:
+                    node["omitted_dirs"] = len(kids) - limit
+                    kids = kids[:limit]
+                node["children"] = [build(kid, level + 1) for kid in kids]
+            return node
+
+        return build("", 0)
@@ -0,0 +1,203 @@
+"""Stratified sampling for estimating line counts without reading every file."""
+
+import math
+from typing import Any, Dict, List, Sequence
+from filestat.walker import FileRecord
+
+
+# Default number of files counted per extension
+SAMPLE_SIZE = 100
+
+# Confidence level of the reported interval
+CONFIDENCE = 0.95
+
+
+class _Stratum:
+    """Reservoir and totals for one extension."""
+
+    __slots__ = ("files", "size_bytes", "sample")
+
+    def __init__(self):
+        self.files = 0
+        self.size_bytes = 0
+        self.sample: List[FileRecord] = []
+
+
+class LineSampler:
+    """Estimates total lines from a stratified random sample of files.
+
+    Files are grouped by extension. Each group keeps a uniform reservoir
+    sample of at most ``sample_size`` files while the walk streams past,
+    so memory does not grow with the tree. Once the sampled files are
+    counted, each group's total is estimated with a ratio estimator:
+    lines per byte in the sample times the group's exact byte total.
+    Line counts track file size closely, so this is far tighter than
+    scaling the mean per file. The variance includes the finite
+    population correction, so groups that were sampled completely
+    contribute no uncertainty.
+    """
+
+    def __init__(self, sample_size: int = SAMPLE_SIZE, seed: int = 0):
+        """Initialize an empty sampler.
+
+        Args:
+            sample_size: Files to count per extension
+            seed: Random seed, so repeated scans pick the same files
+
+        Raises:
+            ValueError: If sample_size is less than 2
+        """
+        import random
+
+        if sample_size < 2:
+            raise ValueError(f"sample size must be at least 2, got {sample_size}")
+        self.sample_size = sample_size
+        self.strata: Dict[str, _Stratum] = {}
+        self._rng = random.Random(seed)
+
+    def offer(self, extension: str, record: FileRecord) -> None:
+        """Consider a file for the sample of its extension.
+
+        Args:
+            extension: File extension, or "no_ext"
+            record: File record from DirectoryWalker
+        """
+        stratum = self.strata.get(extension)
+        if stratum is None:
+            stratum = self.strata[extension] = _Stratum()
+        stratum.files += 1
+        stratum.size_bytes += record[3].st_size
+
+        if len(stratum.sample) < self.sample_size:
+            stratum.sample.append(record)
+        else:
+            slot = self._rng.randrange(stratum.files)
+            if slot < self.sample_size:
+                stratum.sample[slot] = record
+
+    def records(self) -> List[FileRecord]:
+        """Return every sampled file, grouped by extension."""
+        return [record for stratum in self.strata.values() for record in stratum.sample]
+
+    def estimate(self, counts: Dict[str, int]) -> Dict[str, Any]:
+        """Estimate total lines from the counts of the sampled files.
+
+        Args:
+            counts: Line count of every sampled file by path (negative
+                values, such as BINARY, count as zero lines)
+
+        Returns:
+            Dictionary with mode, estimate, stderr, ci_low, ci_high,
+            confidence, sampled_files, sampled_bytes, sampled_lines and
+            per-extension strata
+        """
+        total = variance = 0.0
+        counted = 0
+        sampled_files = sampled_bytes = 0
+        strata = {}
+
+        for extension, stratum in self.strata.items():
+            xs = [record[3].st_size for record in stratum.sample]
+            ys = [max(counts[record[0]], 0) for record in stratum.sample]
+            lines, var = _estimate_stratum(stratum.files, stratum.size_bytes, xs, ys)
+
+            total += lines
+            variance += var
+            counted += sum(ys)
+            sampled_files += len(xs)
+            sampled_bytes += sum(xs)
+            strata[extension] = {
+                "files": stratum.files,
+                "sampled": len(xs),
+                "lines": round(lines),
+            }
+
+        return _estimate_result(total, math.sqrt(variance), sampled_files, sampled_bytes, counted, strata)
+
+
+def combine_estimates(estimates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the line estimates of disjoint scans, e.g. of several roots.
+
+    Samples of different scans are independent, so estimates add up and
+    so do their variances.
+
+    Args:
+        estimates: Results of ``LineSampler.estimate``
+
+    Returns:
+        Combined estimate in the same shape
+    """
+    strata: Dict[str, Dict[str, int]] = {}
+    for estimate in estimates:
+        for extension, stratum in estimate["strata"].items():
+            combined = strata.setdefault(extension, dict.fromkeys(stratum, 0))
+            for key, value in stratum.items():
+                combined[key] += value
+
+    return _estimate_result(
+        sum(estimate["estimate"] for estimate in estimates),
+        math.sqrt(sum(estimate["stderr"] ** 2 for estimate in estimates)),
+        sum(estimate["sampled_files"] for estimate in estimates),
+        sum(estimate["sampled_bytes"] for estimate in estimates),
+        sum(estimate["sampled_lines"] for estimate in estimates),
+        strata,
+    )
+
+
+def _estimate_result(
+    total: float,
+    stderr: float,
+    sampled_files: int,
+    sampled_bytes: int,
+    sampled_lines: int,
+    strata: Dict[str, Dict[str, int]],
+) -> Dict[str, Any]:
+    """Build an estimate dictionary with its confidence interval."""
+    from statistics import NormalDist
+
+    margin = NormalDist().inv_cdf(0.5 + CONFIDENCE / 2) * stderr
+    return {
+        "mode": "estimate",
+        "estimate": round(total),
+        "stderr": stderr,
+        # The sampled files alone already have this many lines
+        "ci_low": max(round(total - margin), sampled_lines),
+        "ci_high": round(total + margin),
+        "confidence": CONFIDENCE,
+        "sampled_files": sampled_files,
+        "sampled_bytes": sampled_bytes,
+        "sampled_lines": sampled_lines,
+        "strata": strata,
+    }
+
+
+def _estimate_stratum(files: int, size_bytes: int, xs: Sequence[int], ys: Sequence[int]):
+    """Estimate one stratum's total lines and the variance of the estimate.
+
+    Args:
+        files: Number of files in the stratum
+        size_bytes: Total size of the stratum
+        xs: Sizes of the sampled files
+        ys: Line counts of the sampled files
+
+    Returns:
+        ``(estimated_lines, variance)``
+    """
+    n = len(xs)
+    if n == 0:
+        return 0.0, 0.0
+
+    sum_x = sum(xs)
+    if sum_x:
+        ratio = sum(ys) / sum_x
+        estimate = ratio * size_bytes
+        residuals = [y - ratio * x for x, y in zip(xs, ys)]
+    else:
+        mean = sum(ys) / n
+        estimate = mean * files
+        residuals = [y - mean for y in ys]
+
+    if n >= files or n < 2:
+        return estimate, 0.0
+    s2 = sum(d * d for d in residuals) / (n - 1)
+    return estimate, files * files * (1 - n / files) * s2 / n
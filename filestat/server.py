@@ -0,0 +1,493 @@
+"""Query daemon that keeps scanned trees warm in memory.
+
+``IndexCache`` keeps one ``DirectoryWatcher`` per scanned tree. The
+watcher holds every file's size, mtime and line count, and brings them
+up to date by re-statting the tree: directories whose mtime is unchanged
+are not listed again, and only files whose size or mtime changed are
+read again. A repeated query therefore costs a stat pass instead of a
+full scan. Trees are evicted least recently used first once their
+estimated memory exceeds the cap.
+
+``QueryServer`` answers newline-delimited JSON requests over a Unix
+socket, and ``ServerClient`` sends them.
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Approximate memory held per file and per directory by a warm tree (a
+# watcher's state tuple, dictionary slot and path strings; measured with
+# tracemalloc on generated trees)
+BYTES_PER_FILE = 500
+BYTES_PER_DIR = 1000
+
+# Default cap on the estimated memory of all warm trees
+MEMORY_LIMIT = 512 * 1024 * 1024
+
+# Analyzer options a client may set per query
+QUERY_OPTIONS = ("top", "depth", "lines", "exclude", "include", "respect_gitignore")
+
+# Exceptions re-raised by the client under their own type
+_ERRORS = {
+    error.__name__: error
+    for error in (FileNotFoundError, NotADirectoryError, IsADirectoryError, PermissionError, ValueError)
+}
+
+
+def default_socket_path() -> str:
+    """Return the per-user default socket path.
+
+    Uses ``$XDG_RUNTIME_DIR`` when set, otherwise the temporary directory.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "filestat.sock")
+    user = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return os.path.join(tempfile.gettempdir(), f"filestat-{user}.sock")
+
+
+class _Entry:
+    """One warm tree: its watcher, last statistics, query lock and size."""
+
+    __slots__ = ("watcher", "stats", "lock", "size", "hits")
+
+    def __init__(self):
+        self.watcher = None
+        self.stats = None
+        self.lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+
+
+class IndexCache:
+    """Warm per-tree state with LRU eviction under a memory cap.
+
+    Each (directory, options) pair gets its own entry. The first query
+    scans the tree; later queries revalidate it by stat signature (see
+    the module docstring) and build statistics from memory. Queries for
+    different trees run concurrently, while queries for one tree are
+    serialized. Entries in use are never evicted, so the cap can be
+    exceeded while a tree larger than the cap is being queried.
+    """
+
+    def __init__(self, memory_limit: int = MEMORY_LIMIT, jobs: int = 1, use_inotify: Optional[bool] = False):
+        """Initialize an empty cache.
+
+        Args:
+            memory_limit: Estimated bytes of warm state to keep
+            jobs: Line-counting workers for scans and revalidation
+            use_inotify: Let trees learn about changes from inotify
+                instead of a stat pass per query (None: when available)
+
+        Raises:
+            ValueError: If memory_limit is negative
+        """
+        if memory_limit < 0:
+            raise ValueError(f"memory_limit must be 0 or greater, got {memory_limit}")
+        self.memory_limit = memory_limit
+        self.jobs = jobs
+        self.use_inotify = use_inotify
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_stats(self, path: str, options: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], bool]:
+        """Get statistics for a path, scanning it only if it is not warm.
+
+        Args:
+            path: File or directory
+            options: Analyzer options from QUERY_OPTIONS
+
+        Returns:
+            ``(stats, cached)``, the statistics in the shape of
+            ``FileAnalyzer.get_stats`` and whether the tree was warm.
+            The statistics of an unchanged tree are the same object on
+            every call and must not be modified.
+
+        Raises:
+            FileNotFoundError: If the path does not exist
+            ValueError: If an option is not supported
+        """
+        from filestat.analyzer import FileAnalyzer
+
+        # Unset options share an entry with their defaults
+        options = {key: value for key, value in (options or {}).items() if value is not None}
+        unknown = set(options) - set(QUERY_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unsupported query options: {', '.join(sorted(unknown))}")
+        if options.get("lines", "count") not in ("count", "none"):
+            raise ValueError("Queries count lines or skip them; estimates are not cached")
+
+        real = os.path.realpath(os.path.expanduser(path))
+        if not os.path.isdir(real):
+            # Files are cheap to analyze and not worth keeping warm
+            return FileAnalyzer(real, **options).get_stats(), False
+
+        key = (real, json.dumps(options, sort_keys=True))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            self._entries.move_to_end(key)
+
+        with entry.lock:
+            if entry.watcher is None:
+                cached = False
+                stats = self._scan(entry, real, options)
+            else:
+                cached = True
+                stats = self._revalidate(entry)
+            entry.hits += 1
+            size = len(entry.watcher.files) * BYTES_PER_FILE + len(entry.watcher.dirs) * BYTES_PER_DIR
+
+        with self._lock:
+            if cached:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if self._entries.get(key) is entry:
+                self.memory += size - entry.size
+                entry.size = size
+            self._evict()
+        return stats, cached
+
+    def _scan(self, entry: _Entry, path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Scan a tree into a new watcher."""
+        from filestat.analyzer import FileAnalyzer
+        from filestat.watch import DirectoryWatcher
+
+        watcher = DirectoryWatcher(FileAnalyzer(path, jobs=self.jobs, **options), self.use_inotify)
+        try:
+            stats = watcher.scan()
+        except BaseException:
+            watcher.close()
+            raise
+        entry.watcher, entry.stats = watcher, stats
+        return stats
+
+    def _revalidate(self, entry: _Entry) -> Dict[str, Any]:
+        """Bring a warm tree up to date; rebuild its statistics if it changed."""
+        watcher = entry.watcher
+        changed = False
+        # A stat pass finds every change at once; inotify may deliver
+        # its events in several reads
+        while watcher.poll(0) is not None:
+            changed = True
+            if not watcher.uses_inotify:
+                break
+        if changed:
+            entry.stats = watcher.stats()
+        return entry.stats
+
+    def _evict(self) -> None:
+        """Drop least recently used idle trees until under the cap."""
+        for key in list(self._entries):
+            if self.memory <= self.memory_limit:
+                break
+            entry = self._entries[key]
+            if not entry.lock.acquire(blocking=False):
+                continue
+            try:
+                self._drop(key, entry)
+                self.evictions += 1
+            finally:
+                entry.lock.release()
+
+    def _drop(self, key: Tuple[str, str], entry: _Entry) -> None:
+        """Remove an entry; the caller holds both locks."""
+        del self._entries[key]
+        self.memory -= entry.size
+        if entry.watcher is not None:
+            entry.watcher.close()
+            entry.watcher = entry.stats = None
+
+    def drop(self, path: str) -> int:
+        """Forget every warm state of a directory.
+
+        Args:
+            path: Directory
+
+        Returns:
+            Number of entries dropped
+        """
+        real = os.path.realpath(os.path.expanduser(path))
+        dropped = 0
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == real]:
+                entry = self._entries[key]
+                with entry.lock:
+                    self._drop(key, entry)
+                dropped += 1
+        return dropped
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the cache.
+
+        Returns:
+            Dictionary with memory use and limit, hit, miss and eviction
+            counts, and the warm trees (least recently used first)
+        """
+        with self._lock:
+            return {
+                "memory_bytes": self.memory,
+                "memory_limit": self.memory_limit,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": [
+                    {"path": key[0], "options": json.loads(key[1]), "size_bytes": entry.size, "hits": entry.hits}
+                    for key, entry in self._entries.items()
+                    if entry.watcher is not None
+                ],
+            }
+
+    def close(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                with entry.lock:
+                    self._drop(key, entry)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Answers one connection's requests, one JSON object per line."""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.respond(line)
+            self.wfile.write(json.dumps(response, separators=(",", ":")).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if response.get("shutdown"):
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class QueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server answering queries from an IndexCache.
+
+    Every request is a JSON object on one line with an ``op`` field:
+
+    - ``{"op": "stats", "path": ..., "options": {...}}`` returns the
+      path's statistics, like ``filestat --format json PATH``
+    - ``{"op": "info"}`` describes the cache
+    - ``{"op": "drop", "path": ...}`` forgets a warm tree
+    - ``{"op": "ping"}`` and ``{"op": "shutdown"}``
+
+    Every response is one line: ``{"ok": true, "result": ..., "cached": ...,
+    "seconds": ...}`` or ``{"ok": false, "error": type name, "message": ...}``.
+    A connection can send any number of requests. The socket is only
+    accessible to its owner.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, cache: IndexCache):
+        """Bind the socket.
+
+        Args:
+            path: Socket path
+            cache: Cache answering the queries
+
+        Raises:
+            FileExistsError: If the path exists and is not a socket
+            OSError: If a server is already listening on the path or Unix
+                sockets are not supported
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix sockets are not available on this platform")
+        try:
+            mode: Optional[int] = os.lstat(path).st_mode
+        except FileNotFoundError:
+            mode = None
+        if mode is not None and not stat.S_ISSOCK(mode):
+            raise FileExistsError(f"{path} exists and is not a socket")
+        if mode is not None:
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except OSError:
+                os.unlink(path)  # stale socket of a server that died
+            else:
+                raise OSError(f"A server is already listening on {path}")
+            finally:
+                probe.close()
+
+        self.cache = cache
+        self.socket_path = path
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def respond(self, line: bytes) -> Dict[str, Any]:
+        """Answer one request line."""
+        start = time.perf_counter()
+        try:
+            request = json.loads(line)
+            op = request.get("op") if isinstance(request, dict) else None
+            response: Dict[str, Any] = {"ok": True}
+            if op == "stats":
+                response["result"], response["cached"] = self.cache.get_stats(
+                    request["path"], request.get("options")
+                )
+            elif op == "info":
+                response["result"] = self.cache.info()
+            elif op == "drop":
+                response["result"] = {"dropped": self.cache.drop(request["path"])}
+            elif op == "ping":
+                response["result"] = {"pid": os.getpid()}
+            elif op == "shutdown":
+                response["shutdown"] = True
+            else:
+                raise ValueError(f"Unknown op: {op!r}")
+        except Exception as e:
+            return {"ok": False, "error": type(e).__name__, "message": str(e)}
+        response["seconds"] = round(time.perf_counter() - start, 6)
+        return response
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.cache.close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+def serve(path: Optional[str] = None, **cache_options: Any) -> None:
+    """Run a query server until it is shut down or interrupted.
+
+    Args:
+        path: Socket path (defaults to ``default_socket_path()``)
+        **cache_options: IndexCache options
+    """
+    with QueryServer(path or default_socket_path(), IndexCache(**cache_options)) as server:
+        # SIGTERM shuts down like a shutdown request, so the socket is
+        # removed on the way out; shutdown() waits for serve_forever, so
+        # it cannot run on the thread the handler interrupts
+        on_main_thread = threading.current_thread() is threading.main_thread()
+        if on_main_thread:
+            previous = signal.signal(
+                signal.SIGTERM,
+                lambda signum, frame: threading.Thread(target=server.shutdown, daemon=True).start(),
+            )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if on_main_thread:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL if previous is None else previous)
+
+
+class ServerClient:
+    """Sends requests to a QueryServer over one connection."""
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = None):
+        """Connect to a server.
+
+        Args:
+            path: Socket path (defaults to ``default_socket_path()``)
+            timeout: Seconds to wait for each response, or None
+
+        Raises:
+            ConnectionError: If no server is listening
+        """
+        self.path = path or default_socket_path()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        try:
+            self._socket.connect(self.path)
+        except OSError as e:
+            self._socket.close()
+            raise ConnectionError(
+                f"No filestat server at {self.path} ({e.strerror or e}); start one with 'filestat serve'"
+            ) from e
+        self._reader = self._socket.makefile("rb")
+
+    def __enter__(self) -> "ServerClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._reader.close()
+        self._socket.close()
+
+    def request(self, op: str, **fields: Any) -> Dict[str, Any]:
+        """Send one request and wait for its response.
+
+        Args:
+            op: Request type (see QueryServer)
+            **fields: Request fields
+
+        Returns:
+            The response dictionary
+
+        Raises:
+            ConnectionError: If the server closed the connection
+            FileNotFoundError, NotADirectoryError, IsADirectoryError,
+            PermissionError, ValueError: As raised by the server
+            RuntimeError: For any other server error
+        """
+        self._socket.sendall(json.dumps({"op": op, **fields}).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError(f"The filestat server at {self.path} closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise _ERRORS.get(response["error"], RuntimeError)(response["message"])
+        return response
+
+    def get_stats(self, path: str, **options: Any) -> Dict[str, Any]:
+        """Get statistics for a path from the server.
+
+        Args:
+            path: File or directory, resolved by the client
+            **options: Analyzer options from QUERY_OPTIONS
+
+        Returns:
+            Statistics in the shape of ``FileAnalyzer.get_stats``
+        """
+        return self.request("stats", path=os.path.abspath(os.path.expanduser(path)), options=options)["result"]
+
+    def info(self) -> Dict[str, Any]:
+        """Return the server's cache description."""
+        return self.request("info")["result"]
+
+    def shutdown(self) -> None:
+        """Stop the server."""
+        self.request("shutdown")
+
+
+def query(paths: List[str], socket_path: Optional[str] = None, **options: Any) -> List[Dict[str, Any]]:
+    """Get statistics for several paths over one connection.
+
+    Args:
+        paths: Files or directories
+        socket_path: Socket path (defaults to ``default_socket_path()``)
+        **options: Analyzer options from QUERY_OPTIONS
+
+    Returns:
+        Statistics per path, in order
+    """
+    with ServerClient(socket_path) as client:
+        return [client.get_stats(path, **options) for path in paths]
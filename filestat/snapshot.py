@@ -0,0 +1,398 @@
+"""Per-file snapshots of a scan and streaming diffs between them."""
+
+import heapq
+import io
+import json
+import os
+import re
+import tempfile
+import time
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+from filestat.topk import TopK
+from filestat.walker import file_extension
+
+
+FORMAT = "filestat-snapshot"
+VERSION = 1
+
+# Records kept in memory before a sorted run is spilled to a temporary file
+RUN_SIZE = 200_000
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# (relpath, size_bytes, mtime_ns, lines); lines is BINARY for binary files
+SnapshotRecord = Tuple[str, int, int, int]
+
+_ESCAPES = {"\\": "\\\\", "\t": "\\t", "\n": "\\n"}
+_UNESCAPES = {"\\": "\\", "t": "\t", "n": "\n"}
+_ESCAPED = re.compile(r"\\(.)")
+
+
+def _encode(record: SnapshotRecord) -> str:
+    """Encode a record as one tab-separated line."""
+    path, size, mtime_ns, lines = record
+    if "\\" in path or "\t" in path or "\n" in path:
+        path = "".join(_ESCAPES.get(char, char) for char in path)
+    return f"{path}\t{size}\t{mtime_ns}\t{lines}\n"
+
+
+def _decode(line: str) -> SnapshotRecord:
+    """Decode a line written by ``_encode``."""
+    path, size, mtime_ns, lines = line.rstrip("\n").split("\t")
+    if "\\" in path:
+        path = _ESCAPED.sub(lambda match: _UNESCAPES[match.group(1)], path)
+    return path, int(size), int(mtime_ns), int(lines)
+
+
+def _text(raw: IO[bytes]) -> io.TextIOWrapper:
+    """Wrap a binary stream for reading or writing snapshot lines."""
+    return io.TextIOWrapper(raw, encoding="utf-8", errors="surrogateescape", newline="\n")
+
+
+class SnapshotWriter:
+    """Writes a per-file snapshot sorted by path.
+
+    The first line is a JSON header with the file count and the given
+    metadata. Every other line holds one file's relative path, size,
+    mtime and line count, separated by tabs. Sorting by path lets two
+    snapshots be compared in a single pass (see ``iter_diff_events``).
+
+    Files can be added in any order. Up to ``run_size`` records are kept
+    in memory; beyond that, sorted runs are spilled to temporary files and
+    merged when the snapshot is closed, so memory stays bounded on trees
+    of any size. The snapshot is written to a temporary name and renamed
+    into place, so an interrupted scan never leaves a partial snapshot.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        compress: bool = False,
+        run_size: int = RUN_SIZE,
+    ):
+        """Initialize the writer.
+
+        Args:
+            path: Destination file
+            metadata: Extra header fields (e.g. root and line mode); can
+                be updated until the snapshot is closed
+            compress: Gzip the snapshot
+            run_size: Records sorted in memory per run
+
+        Raises:
+            ValueError: If run_size is not positive
+        """
+        if run_size < 1:
+            raise ValueError(f"run_size must be 1 or greater, got {run_size}")
+        self.path = path
+        self.metadata: Dict[str, Any] = dict(metadata or {})
+        self.compress = compress
+        self.run_size = run_size
+        self.count = 0
+        self._buffer: List[SnapshotRecord] = []
+        self._runs: List[IO[str]] = []
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard_runs()
+
+    def add(self, relpath: str, size: int, mtime_ns: int, lines: int) -> None:
+        """Add one file.
+
+        Args:
+            relpath: Path relative to the scanned directory
+            size: Size in bytes
+            mtime_ns: Modification time in nanoseconds
+            lines: Line count, or BINARY for binary files
+        """
+        self._buffer.append((relpath, size, mtime_ns, lines))
+        self.count += 1
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self) -> None:
+        """Write the buffered records to a sorted temporary run."""
+        self._buffer.sort()
+        run = tempfile.TemporaryFile("w+", encoding="utf-8", errors="surrogateescape", newline="\n")
+        run.writelines(map(_encode, self._buffer))
+        run.seek(0)
+        self._runs.append(run)
+        self._buffer = []
+
+    def _discard_runs(self) -> None:
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._buffer = []
+
+    def close(self) -> None:
+        """Sort, merge and write the snapshot."""
+        self._buffer.sort()
+        sources = [map(_decode, run) for run in self._runs]
+        records = heapq.merge(*sources, self._buffer) if sources else iter(self._buffer)
+        header = {
+            "format": FORMAT,
+            "version": VERSION,
+            "created": time.time(),
+            **self.metadata,
+            "files": self.count,
+        }
+
+        partial = f"{self.path}.partial"
+        try:
+            if self.compress:
+                import gzip
+                raw: IO[bytes] = gzip.open(partial, "wb", compresslevel=6)
+            else:
+                raw = open(partial, "wb")
+            with _text(raw) as out:
+                out.write(json.dumps(header) + "\n")
+                out.writelines(map(_encode, records))
+            os.replace(partial, self.path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.unlink(partial)
+            raise
+        finally:
+            self._discard_runs()
+
+
+class SnapshotReader:
+    """Reads a snapshot written by SnapshotWriter, one record at a time.
+
+    Gzipped snapshots are recognized by their magic bytes. Records are
+    checked to be in path order while reading, since the diff relies on it.
+    """
+
+    def __init__(self, path: str):
+        """Open a snapshot and read its header.
+
+        Args:
+            path: Snapshot file
+
+        Raises:
+            ValueError: If the file is not a compatible snapshot
+        """
+        self.path = path
+        with open(path, "rb") as probe:
+            compressed = probe.read(2) == _GZIP_MAGIC
+        if compressed:
+            import gzip
+            raw: IO[bytes] = gzip.open(path, "rb")
+        else:
+            raw = open(path, "rb")
+        self._stream = _text(raw)
+        try:
+            header = json.loads(self._stream.readline())
+        except (ValueError, OSError, EOFError):
+            header = None
+
+        if not isinstance(header, dict) or header.get("format") != FORMAT:
+            self.close()
+            raise ValueError(f"Not a filestat snapshot: {path}")
+        if header.get("version") != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version {header.get('version')}: {path}")
+        self.header: Dict[str, Any] = header
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        self._stream.close()
+
+    def __iter__(self) -> Iterator[SnapshotRecord]:
+        """Yield records in path order.
+
+        Raises:
+            ValueError: If the records are not sorted by path
+        """
+        previous = None
+        for line in self._stream:
+            record = _decode(line)
+            if previous is not None and record[0] <= previous:
+                raise ValueError(f"Snapshot is not sorted by path: {self.path}")
+            previous = record[0]
+            yield record
+
+
+def _side(reader: SnapshotReader) -> Dict[str, Any]:
+    """Describe one snapshot of a diff; totals are added after the join."""
+    header = reader.header
+    return {
+        "path": reader.path,
+        "root": header.get("root"),
+        "created": header.get("created"),
+        "lines": header.get("lines", "count"),
+    }
+
+
+def _change(status: str, old: Optional[SnapshotRecord], new: Optional[SnapshotRecord], lines: bool) -> Dict[str, Any]:
+    """Build the record of one added, removed or changed file."""
+    path = (new or old)[0]
+    old_size = old[1] if old else None
+    new_size = new[1] if new else None
+    change: Dict[str, Any] = {
+        "status": status,
+        "path": path,
+        "extension": file_extension(os.path.basename(path)) or "no_ext",
+        "old_size": old_size,
+        "new_size": new_size,
+        "size_delta": (new_size or 0) - (old_size or 0),
+    }
+    if lines:
+        old_lines = max(old[3], 0) if old else None
+        new_lines = max(new[3], 0) if new else None
+        change["old_lines"] = old_lines
+        change["new_lines"] = new_lines
+        change["lines_delta"] = (new_lines or 0) - (old_lines or 0)
+    return change
+
+
+def iter_diff_events(old_path: str, new_path: str, top: int = 10) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Compare two snapshots with a streaming merge-join.
+
+    Both snapshots are read once, side by side, in path order; only
+    per-extension totals and the ``top`` largest changes are kept in
+    memory. A file present in both snapshots is changed when its size,
+    mtime or line count differs. Line deltas are only reported when both
+    snapshots counted lines.
+
+    Args:
+        old_path: Earlier snapshot
+        new_path: Later snapshot
+        top: Number of files to list by growth and by shrinkage
+
+    Yields:
+        ``("file", change)`` for every added, removed or changed file, then
+        ``("summary", diff)`` with old and new totals, counts and bytes per
+        status, per-extension deltas (largest size change first) and the
+        files that grew and shrank most
+
+    Raises:
+        ValueError: If a file is not a snapshot or not sorted
+    """
+    with SnapshotReader(old_path) as old_reader, SnapshotReader(new_path) as new_reader:
+        old_side, new_side = _side(old_reader), _side(new_reader)
+        lines = old_side["lines"] == new_side["lines"] == "count"
+        statuses = {status: {"files": 0, "size_delta": 0, "lines_delta": 0} for status in ("added", "removed", "changed")}
+        unchanged = 0
+        # extension -> [old files, new files, old bytes, new bytes, old lines, new lines]
+        extensions: Dict[str, List[int]] = {}
+        grown, shrunk = TopK(top), TopK(top)
+        sep = os.sep
+
+        old_records, new_records = iter(old_reader), iter(new_reader)
+        old = next(old_records, None)
+        new = next(new_records, None)
+        while old is not None or new is not None:
+            if new is None or (old is not None and old[0] < new[0]):
+                status, before, after = "removed", old, None
+                path = old[0]
+                old = next(old_records, None)
+            elif old is None or new[0] < old[0]:
+                status, before, after = "added", None, new
+                path = new[0]
+                new = next(new_records, None)
+            else:
+                status = "changed" if old[1:] != new[1:] else None
+                before, after = old, new
+                path = old[0]
+                old = next(old_records, None)
+                new = next(new_records, None)
+
+            extension = file_extension(path[path.rfind(sep) + 1:]) or "no_ext"
+            totals = extensions.get(extension)
+            if totals is None:
+                totals = extensions[extension] = [0, 0, 0, 0, 0, 0]
+            if before is not None:
+                totals[0] += 1
+                totals[2] += before[1]
+                totals[4] += before[3] if before[3] > 0 else 0
+            if after is not None:
+                totals[1] += 1
+                totals[3] += after[1]
+                totals[5] += after[3] if after[3] > 0 else 0
+            if status is None:
+                unchanged += 1
+                continue
+
+            change = _change(status, before, after, lines)
+            counts = statuses[status]
+            counts["files"] += 1
+            counts["size_delta"] += change["size_delta"]
+            counts["lines_delta"] += change.get("lines_delta", 0)
+            if change["size_delta"] > 0:
+                grown.push(change["size_delta"], change["path"], change)
+            elif change["size_delta"] < 0:
+                shrunk.push(-change["size_delta"], change["path"], change)
+            yield "file", change
+
+    for side, offset in ((old_side, 0), (new_side, 1)):
+        side["files"] = sum(totals[offset] for totals in extensions.values())
+        side["size_bytes"] = sum(totals[offset + 2] for totals in extensions.values())
+        if lines:
+            side["total_lines"] = sum(totals[offset + 4] for totals in extensions.values())
+    if not lines:
+        for counts in statuses.values():
+            del counts["lines_delta"]
+
+    extension_deltas = {}
+    for extension, (old_files, new_files, old_bytes, new_bytes, old_lines, new_lines) in sorted(
+        extensions.items(), key=lambda item: (-abs(item[1][3] - item[1][2]), item[0])
+    ):
+        entry = {
+            "old_files": old_files,
+            "new_files": new_files,
+            "files_delta": new_files - old_files,
+            "old_size_bytes": old_bytes,
+            "new_size_bytes": new_bytes,
+            "size_delta": new_bytes - old_bytes,
+        }
+        if lines:
+            entry["lines_delta"] = new_lines - old_lines
+        extension_deltas[extension] = entry
+
+    summary: Dict[str, Any] = {
+        "old": old_side,
+        "new": new_side,
+        "files_delta": new_side["files"] - old_side["files"],
+        "size_delta": new_side["size_bytes"] - old_side["size_bytes"],
+    }
+    if lines:
+        summary["lines_delta"] = new_side["total_lines"] - old_side["total_lines"]
+    summary.update({
+        **statuses,
+        "unchanged": {"files": unchanged},
+        "extensions": extension_deltas,
+        "grown": [change for _, _, change in grown.items()],
+        "shrunk": [change for _, _, change in shrunk.items()],
+    })
+    yield "summary", summary
+
+
+def diff_snapshots(old_path: str, new_path: str, top: int = 10) -> Dict[str, Any]:
+    """Compare two snapshots.
+
+    Args:
+        old_path: Earlier snapshot
+        new_path: Later snapshot
+        top: Number of files to list by growth and by shrinkage
+
+    Returns:
+        The summary of ``iter_diff_events``
+    """
+    for kind, payload in iter_diff_events(old_path, new_path, top):
+        if kind == "summary":
+            return payload
+    raise AssertionError("iter_diff_events ended without a summary")
@@ -0,0 +1,115 @@
+"""Text/binary classification of file contents."""
+
+import os
+
+
+# Number of leading bytes inspected when classifying a file
+SNIFF_SIZE = 8192
+
+# Maximum share of control characters in a text block
+CONTROL_RATIO = 0.3
+
+# Extensions that are classified as binary without reading the file
+BINARY_EXTENSIONS = frozenset({
+    # Images
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".tif", ".tiff", ".webp", ".psd",
+    # Audio and video
+    ".mp3", ".mp4", ".m4a", ".wav", ".flac", ".ogg", ".avi", ".mov", ".mkv", ".webm",
+    # Archives and compressed data
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar", ".tar", ".jar", ".whl", ".egg",
+    # Compiled code and libraries
+    ".so", ".dylib", ".dll", ".exe", ".o", ".a", ".lib", ".obj", ".pyc", ".pyo", ".class", ".wasm",
+    # Documents, fonts and databases
+    ".pdf", ".doc", ".xls", ".ppt", ".docx", ".xlsx", ".pptx", ".odt",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".db", ".sqlite", ".sqlite3", ".mdb", ".pkl", ".npy", ".npz", ".parquet", ".bin", ".dat",
+})
+
+# Leading bytes of common binary formats
+MAGIC_NUMBERS = (
+    b"\x89PNG\r\n\x1a\n",
+    b"GIF87a",
+    b"GIF89a",
+    b"\xff\xd8\xff",            # JPEG
+    b"PK\x03\x04",              # zip, jar, docx, whl
+    b"\x1f\x8b",                # gzip
+    b"BZh",                     # bzip2
+    b"\xfd7zXZ\x00",            # xz
+    b"7z\xbc\xaf\x27\x1c",      # 7-Zip
+    b"\x28\xb5\x2f\xfd",        # zstd
+    b"Rar!\x1a\x07",
+    b"\x7fELF",
+    b"\xcf\xfa\xed\xfe",        # Mach-O 64-bit
+    b"\xca\xfe\xba\xbe",        # Java class / Mach-O fat binary
+    b"\x00asm",                 # WebAssembly
+    b"SQLite format 3\x00",
+    b"%PDF-",
+    b"OggS",
+    b"fLaC",
+    b"ID3",                     # MP3
+    b"RIFF",                    # WAV, AVI, WebP
+)
+
+# Byte order marks of text encodings whose text contains NUL bytes
+_TEXT_BOMS = (
+    b"\xff\xfe",                # UTF-16 LE (and UTF-32 LE)
+    b"\xfe\xff",                # UTF-16 BE
+    b"\x00\x00\xfe\xff",        # UTF-32 BE
+)
+
+# Control characters that commonly appear in text (\b \t \n \f \r ESC)
+_TEXT_CONTROLS = b"\b\t\n\f\r\x1b"
+_CONTROL_CHARS = bytes(b for b in range(32) if b not in _TEXT_CONTROLS) + b"\x7f"
+
+
+def has_binary_extension(name: str) -> bool:
+    """Check whether a file name has a known binary extension.
+
+    Args:
+        name: File name or path
+
+    Returns:
+        True if the extension is in BINARY_EXTENSIONS
+    """
+    i = name.rfind(".")
+    return i > 0 and name[i:].lower() in BINARY_EXTENSIONS
+
+
+def is_binary_block(block: bytes) -> bool:
+    """Classify the first block of a file as binary or text.
+
+    Args:
+        block: Leading bytes of the file (up to SNIFF_SIZE)
+
+    Returns:
+        True if the block looks like binary data
+    """
+    if not block:
+        return False
+    if block.startswith(_TEXT_BOMS):
+        return False
+    if block.startswith(MAGIC_NUMBERS):
+        return True
+    if b"\x00" in block:
+        return True
+
+    controls = len(block) - len(block.translate(None, _CONTROL_CHARS))
+    return controls > len(block) * CONTROL_RATIO
+
+
+def is_binary_file(path: str) -> bool:
+    """Classify a file by its extension and first block.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        True if the file looks like binary data
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    if has_binary_extension(os.path.basename(path)):
+        return True
+    with open(path, "rb") as f:
+        return is_binary_block(f.read(SNIFF_SIZE))
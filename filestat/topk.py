@@ -0,0 +1,77 @@
+"""Bounded top-K tracking for streaming scans."""
+
+import heapq
+import math
+from typing import Any, List, Tuple
+
+
+class TopK:
+    """Keeps the ``k`` entries with the largest keys seen so far.
+
+    Memory is bounded by ``k`` regardless of how many entries are pushed.
+    Entries are stored as compact ``(key, -seq, relpath, value)`` tuples in
+    a min-heap; ``seq`` is the push order, so among equal keys the entry
+    pushed first wins, matching a stable descending sort.
+    """
+
+    __slots__ = ("k", "floor", "_heap", "_seq")
+
+    def __init__(self, k: int):
+        """Initialize an empty top-K tracker.
+
+        Args:
+            k: Number of entries to keep
+
+        Raises:
+            ValueError: If k is negative
+        """
+        if k < 0:
+            raise ValueError(f"top-K size must be 0 or greater, got {k}")
+        self.k = k
+        # Keys at or below this cannot enter, so callers may skip the push
+        self.floor: float = -math.inf if k else math.inf
+        self._heap: List[Tuple[int, int, str, Any]] = []
+        self._seq = 0
+
+    def push(self, key: int, relpath: str, value: Any = None) -> None:
+        """Offer an entry.
+
+        Args:
+            key: Value to rank by (larger is better)
+            relpath: Relative path of the file
+            value: Extra payload kept alongside the entry
+        """
+        if key <= self.floor:
+            return
+        self._seq += 1
+        heap = self._heap
+        if len(heap) < self.k:
+            heapq.heappush(heap, (key, -self._seq, relpath, value))
+        else:
+            heapq.heapreplace(heap, (key, -self._seq, relpath, value))
+        if len(heap) == self.k:
+            self.floor = heap[0][0]
+
+    def merge(self, other: "TopK", prefix: str = "") -> None:
+        """Offer every entry kept by another tracker.
+
+        Entries of ``other`` rank after this tracker's own entries with
+        equal keys, as if they had been pushed later.
+
+        Args:
+            other: Tracker to merge in
+            prefix: Prepended to the merged entries' relative paths
+        """
+        for key, relpath, value in other.items():
+            self.push(key, prefix + relpath, value)
+
+    def items(self) -> List[Tuple[int, str, Any]]:
+        """Return kept entries, largest key first.
+
+        Returns:
+            List of ``(key, relpath, value)`` tuples
+        """
+        return [(key, relpath, value) for key, _, relpath, value in sorted(self._heap, reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -0,0 +1,269 @@
+"""Directory traversal built on os.scandir."""
+
+import os
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Set, Tuple
+
+
+if TYPE_CHECKING:
+    from filestat.ignore import PathFilter
+    from filestat.profile import ScanProfile
+
+FileRecord = Tuple[str, str, str, os.stat_result]
+
+
+def physical_size(st: os.stat_result) -> int:
+    """Return the bytes a file occupies on disk.
+
+    Uses ``st_blocks`` (512-byte units), which is smaller than the apparent
+    size for sparse or compressed files and larger for small files that
+    fill a whole block. Falls back to ``st_size`` where the platform does
+    not report blocks.
+    """
+    blocks = getattr(st, "st_blocks", None)
+    return st.st_size if blocks is None else blocks * 512
+
+
+def file_extension(name: str) -> str:
+    """Return the extension of a file name, matching ``Path.suffix``.
+
+    Args:
+        name: Base name of the file
+
+    Returns:
+        Extension including the leading dot, or an empty string
+    """
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ""
+
+
+class DirectoryWalker:
+    """Walks a directory tree and yields one record per file.
+
+    Traversal order matches ``os.walk`` (top-down, files of a directory
+    before its subdirectories). With ``breadth_first``, every directory
+    of one level is listed before any directory of the next, so a walk
+    stopped early has seen the top of every subtree rather than all of
+    the first few. Symlinked directories are counted but not
+    descended into unless ``follow_symlinks`` is set, and unreadable
+    directories are skipped.
+
+    Every physical file is yielded once. Files with several hard links are
+    tracked by ``(st_dev, st_ino)``, and links to a file that was already
+    yielded are counted in ``linked_files`` and ``linked_bytes`` instead
+    of ``files``. When following symlinks, every file and directory is
+    tracked this way, since symlinks can reach them by several paths. A
+    directory reached a second time, for example through a symlink loop,
+    is counted in ``repeated_dirs`` and not entered again. With
+    ``one_file_system``, directories on another device than the root are
+    counted in ``mount_points`` and not entered.
+
+    Each record is a ``(path, relpath, name, stat_result)`` tuple. The stat
+    result comes from ``DirEntry.stat()``, so every file costs a single
+    stat call and no ``Path`` objects are created.
+
+    With a path filter, excluded directories are pruned before they are
+    listed and excluded files are skipped before they are stat'ed; neither
+    is counted in ``files`` or ``dirs`` but in ``pruned_dirs`` and
+    ``pruned_files``.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        profile: Optional["ScanProfile"] = None,
+        path_filter: Optional["PathFilter"] = None,
+        follow_symlinks: bool = False,
+        one_file_system: bool = False,
+        inodes: Optional[Set[Tuple[int, int]]] = None,
+        breadth_first: bool = False,
+    ):
+        """Initialize the walker.
+
+        Args:
+            root: Directory to walk
+            profile: Records listing and stat time when given
+            path_filter: Include/exclude rules to apply while walking
+            follow_symlinks: Descend into symlinked directories
+            one_file_system: Do not descend into directories on other
+                devices (mount points)
+            inodes: ``(st_dev, st_ino)`` pairs already seen; pass the same
+                set to several walkers to count shared files once
+            breadth_first: List directories level by level instead of
+                descending into each subdirectory first
+        """
+        self.root = root
+        self.profile = profile
+        self.path_filter = path_filter if path_filter else None
+        self.follow_symlinks = follow_symlinks
+        self.one_file_system = one_file_system
+        self.inodes = inodes if inodes is not None else set()
+        self.breadth_first = breadth_first
+        self.files = 0
+        self.dirs = 0
+        self.errors = 0
+        self.pruned_dirs = 0
+        self.pruned_files = 0
+        self.linked_files = 0
+        self.linked_bytes = 0
+        self.repeated_dirs = 0
+        self.mount_points = 0
+        self.dirs_visited = 0
+        # 1 while a directory is being listed; it counts as pending until
+        # its listing is exhausted
+        self._listing = 0
+        self._root_dev: Optional[int] = None
+        self._pending: deque = deque()
+
+    @property
+    def dirs_pending(self) -> int:
+        """Number of directories found but not yet listed in full."""
+        return len(self._pending) + self._listing
+
+    def __iter__(self) -> Iterator[FileRecord]:
+        """Yield file records for every file below the root."""
+        if self.follow_symlinks or self.one_file_system:
+            try:
+                st = os.stat(self.root)
+            except OSError:
+                pass
+            else:
+                self._root_dev = st.st_dev
+                if self.follow_symlinks:
+                    self.inodes.add((st.st_dev, st.st_ino))
+        if self.profile is not None:
+            return self._iter_profiled()
+        return self._iter()
+
+    def _enter_dir(self, entry: os.DirEntry) -> bool:
+        """Decide whether to descend into a directory entry."""
+        if entry.is_symlink() and not self.follow_symlinks:
+            return False
+        if not (self.follow_symlinks or self.one_file_system):
+            return True
+
+        try:
+            st = entry.stat()
+        except OSError:
+            self.errors += 1
+            return False
+        if self.one_file_system and st.st_dev != self._root_dev:
+            self.mount_points += 1
+            return False
+        if self.follow_symlinks:
+            key = (st.st_dev, st.st_ino)
+            if key in self.inodes:
+                self.repeated_dirs += 1
+                return False
+            self.inodes.add(key)
+        return True
+
+    def _iter(self, stat: Callable[[os.DirEntry], os.stat_result] = os.DirEntry.stat) -> Iterator[FileRecord]:
+        """Walk the tree, calling ``stat`` on every file entry."""
+        sep = os.sep
+        inodes = self.inodes
+        track_all = self.follow_symlinks
+        pending = self._pending
+        pending.append((self.root, "", self.path_filter.root(self.root) if self.path_filter else None))
+        pop = pending.popleft if self.breadth_first else pending.pop
+        # Breadth-first, subdirectories are queued as soon as they are found
+        subdirs: list = []
+        add_subdir = pending.append if self.breadth_first else subdirs.append
+
+        while pending:
+            dir_path, prefix, dir_filter = pop()
+            self._listing = 1
+            try:
+                scanner = os.scandir(dir_path)
+            except OSError:
+                self._listing = 0
+                self.dirs_visited += 1
+                continue
+
+            with scanner:
+                for entry in scanner:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if dir_filter is not None and dir_filter.excludes(entry.name, is_dir):
+                        if is_dir:
+                            self.pruned_dirs += 1
+                        else:
+                            self.pruned_files += 1
+                        continue
+
+                    if is_dir:
+                        self.dirs += 1
+                        if self._enter_dir(entry):
+                            name = entry.name
+                            child_filter = dir_filter.descend(entry.path, name) if dir_filter else None
+                            add_subdir((entry.path, prefix + name + sep, child_filter))
+                        continue
+
+                    try:
+                        st = stat(entry)
+                    except OSError:
+                        self.files += 1
+                        self.errors += 1
+                        continue
+
+                    if st.st_nlink > 1 or track_all:
+                        key = (st.st_dev, st.st_ino)
+                        if key in inodes:
+                            self.linked_files += 1
+                            self.linked_bytes += st.st_size
+                            continue
+                        inodes.add(key)
+
+                    self.files += 1
+                    name = entry.name
+                    yield entry.path, prefix + name, name, st
+
+            self._listing = 0
+            self.dirs_visited += 1
+            if subdirs:
+                subdirs.reverse()
+                pending.extend(subdirs)
+                subdirs.clear()
+
+    def _iter_profiled(self) -> Iterator[FileRecord]:
+        """Walk the tree like ``_iter``, timing listing and stat calls.
+
+        Time is only counted while the walker runs, not while the caller
+        processes a yielded record. Listing time is the walker's own time
+        minus the time spent in stat calls.
+        """
+        clock = time.perf_counter
+        profile = self.profile
+        counters = profile.counters
+        walking = stat_time = 0.0
+
+        def timed_stat(entry: os.DirEntry) -> os.stat_result:
+            nonlocal stat_time
+            counters["stat_calls"] += 1
+            start = clock()
+            try:
+                return entry.stat()
+            finally:
+                stat_time += clock() - start
+
+        listed = self.dirs_visited + self._listing
+        records = self._iter(timed_stat)
+        try:
+            while True:
+                start = clock()
+                record = next(records, None)
+                walking += clock() - start
+                if record is None:
+                    return
+                yield record
+        finally:
+            records.close()
+            counters["dirs_listed"] += self.dirs_visited + self._listing - listed
+            profile.seconds["stat"] += stat_time
+            profile.seconds["listing"] += walking - stat_time
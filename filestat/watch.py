@@ -0,0 +1,590 @@
+"""Watch a directory and re-scan only what changed."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Set, Tuple
+from filestat.aggregate import DirectoryAggregate
+from filestat.analyzer import _file_record
+from filestat.counting import BINARY
+from filestat.ignore import DirFilter
+from filestat.topk import TopK
+from filestat.walker import FileRecord, file_extension, physical_size
+
+if TYPE_CHECKING:
+    from filestat.analyzer import FileAnalyzer
+
+
+# inotify event bits (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+# Events that add, remove or rename directory entries
+_ENTRY_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+
+# struct inotify_event without the trailing name
+_EVENT = struct.Struct("iIII")
+
+# Directories modified this recently are listed again on the next pass,
+# since a change in the same timestamp tick would not move their mtime
+RACY_NS = 1_000_000_000
+
+# Totals kept for every scan, in output order
+TOTAL_KEYS = (
+    "total_files", "total_dirs", "total_size_bytes", "physical_size_bytes", "total_lines",
+    "text_files", "text_size_bytes", "binary_files", "binary_size_bytes",
+)
+
+
+class Inotify:
+    """Minimal inotify binding through ctypes (Linux only)."""
+
+    def __init__(self):
+        """Create a non-blocking inotify instance.
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.fd = fd
+
+    def add_watch(self, path: str) -> int:
+        """Watch a directory and return the watch descriptor.
+
+        Raises:
+            OSError: If the watch cannot be added (e.g. the watch limit)
+        """
+        wd = self._add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        """Stop watching a watch descriptor (errors are ignored)."""
+        self._rm_watch(self.fd, wd)
+
+    def read(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """Wait up to ``timeout`` seconds and return all queued events.
+
+        Returns:
+            ``(wd, mask, name)`` tuples
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        """Close the inotify descriptor."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _DirState:
+    """What the last scan saw in one directory."""
+
+    __slots__ = ("mtime_ns", "files", "subdirs", "links", "errors", "filter")
+
+    def __init__(self, mtime_ns: int, dir_filter: Optional[DirFilter]):
+        self.mtime_ns = mtime_ns
+        self.filter = dir_filter
+        self.files: Set[str] = set()
+        self.subdirs: Set[str] = set()
+        self.links: Set[str] = set()
+        # Entries that could not be stat'ed (e.g. dangling symlinks)
+        self.errors: Set[str] = set()
+
+
+class DirectoryWatcher:
+    """Keeps a directory's per-file state in memory and updates it in place.
+
+    After an initial full scan, each pass only re-stats and re-counts what
+    changed:
+
+    - With inotify (Linux), only the files and directories named in
+      events are looked at.
+    - Otherwise every known directory is stat'ed. Directories whose mtime
+      is unchanged are not listed again, but their files are still stat'ed,
+      because editing a file in place does not change its directory's mtime.
+
+    In both cases only new or modified files are read again. Totals are
+    maintained incrementally and each pass reports a delta. The analyzer's
+    include/exclude rules apply; .gitignore files are read when a
+    directory is first scanned. Unlike a full scan, hard links to one file
+    are each counted, since the watcher keys its state by path.
+    """
+
+    def __init__(self, analyzer: "FileAnalyzer", use_inotify: Optional[bool] = None):
+        """Initialize the watcher.
+
+        Args:
+            analyzer: Analyzer for the directory; its jobs, executor,
+                cache, top, depth and line mode ("count" or "none")
+                settings are used
+            use_inotify: Force inotify on or off (default: use it when
+                available)
+
+        Raises:
+            NotADirectoryError: If the analyzer's path is not a directory
+            ValueError: If the analyzer estimates line counts, follows
+                symlinks, stops at mount points, has scan limits or
+                computes content metrics
+            OSError: If inotify was requested but is not available
+        """
+        if not analyzer.path.is_dir():
+            raise NotADirectoryError("Watch mode needs a directory")
+        if analyzer.lines == "estimate":
+            raise ValueError("Watch mode cannot estimate line counts")
+        if analyzer.follow_symlinks or analyzer.one_file_system:
+            raise ValueError("Watch mode cannot follow symlinks or stop at mount points")
+        if analyzer.limited:
+            raise ValueError("Watch mode needs a complete scan, without file, byte or time limits")
+        if analyzer.metrics:
+            raise ValueError("Watch mode counts lines only, without content metrics")
+
+        self.analyzer = analyzer
+        self.root = os.path.abspath(analyzer.path)
+        # relpath -> (size, mtime_ns, lines, extension, physical size)
+        self.files: Dict[str, Tuple[int, int, int, str, int]] = {}
+        self.dirs: Dict[str, _DirState] = {}
+        self.totals: Dict[str, int] = dict.fromkeys(TOTAL_KEYS, 0)
+        self.file_types: Dict[str, int] = {}
+        # Files that could not be stat'ed; like a full scan, they count
+        # toward total_files but nothing else
+        self.errors = 0
+
+        self._inotify: Optional[Inotify] = None
+        self._wd_dirs: Dict[int, str] = {}
+        self._dir_wds: Dict[str, int] = {}
+        if use_inotify or use_inotify is None:
+            try:
+                self._inotify = Inotify()
+            except OSError:
+                if use_inotify:
+                    raise
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Whether changes are detected with inotify rather than polling."""
+        return self._inotify is not None
+
+    def __enter__(self) -> "DirectoryWatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the inotify descriptor, if any."""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _abspath(self, rel: str) -> str:
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def _join(self, rel: str, name: str) -> str:
+        return rel + os.sep + name if rel else name
+
+    def _watch(self, rel: str) -> None:
+        """Add an inotify watch, falling back to polling if that fails."""
+        if self._inotify is None:
+            return
+        try:
+            wd = self._inotify.add_watch(self._abspath(rel))
+        except OSError:
+            # e.g. fs.inotify.max_user_watches reached
+            self.close()
+            self._wd_dirs.clear()
+            self._dir_wds.clear()
+            return
+        self._wd_dirs[wd] = rel
+        self._dir_wds[rel] = wd
+
+    def _unwatch(self, rel: str) -> None:
+        wd = self._dir_wds.pop(rel, None)
+        if wd is not None:
+            self._wd_dirs.pop(wd, None)
+            if self._inotify is not None:
+                self._inotify.rm_watch(wd)
+
+    def _apply(self, entry: Tuple[int, int, int, str, int], sign: int) -> None:
+        """Add (sign 1) or remove (sign -1) a file from the totals."""
+        size, _mtime, lines, extension, physical = entry
+        totals = self.totals
+        totals["total_files"] += sign
+        totals["total_size_bytes"] += sign * size
+        totals["physical_size_bytes"] += sign * physical
+        if lines == BINARY:
+            totals["binary_files"] += sign
+            totals["binary_size_bytes"] += sign * size
+        else:
+            totals["text_files"] += sign
+            totals["text_size_bytes"] += sign * size
+            totals["total_lines"] += sign * lines
+
+        count = self.file_types.get(extension, 0) + sign
+        if count:
+            self.file_types[extension] = count
+        else:
+            self.file_types.pop(extension, None)
+
+    def _set_errors(self, state: _DirState, errors: Set[str]) -> None:
+        """Replace a directory's files that could not be stat'ed."""
+        change = len(errors) - len(state.errors)
+        self.totals["total_files"] += change
+        self.errors += change
+        state.errors = errors
+
+    def _remove_file(self, rel: str, changes: Dict[str, Any]) -> None:
+        entry = self.files.pop(rel, None)
+        if entry is not None:
+            self._apply(entry, -1)
+            changes["removed"].append(rel)
+
+    def _list_dir(
+        self, rel: str, dir_filter: Optional[DirFilter]
+    ) -> Optional[Tuple[int, Dict[str, os.stat_result], Set[str], Set[str], Set[str]]]:
+        """List one directory, leaving out excluded entries.
+
+        Returns:
+            ``(mtime_ns, files, subdirs, links, errors)`` or None if it
+            cannot be read; ``files`` maps names to stat results and
+            ``errors`` holds the files that could not be stat'ed
+        """
+        path = self._abspath(rel)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            scanner = os.scandir(path)
+        except OSError:
+            return None
+
+        files: Dict[str, os.stat_result] = {}
+        subdirs: Set[str] = set()
+        links: Set[str] = set()
+        errors: Set[str] = set()
+        with scanner:
+            for entry in scanner:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if dir_filter is not None and dir_filter.excludes(entry.name, is_dir):
+                    continue
+                if is_dir:
+                    (links if entry.is_symlink() else subdirs).add(entry.name)
+                    continue
+                try:
+                    files[entry.name] = entry.stat()
+                except OSError:
+                    errors.add(entry.name)
+
+        if time.time_ns() - mtime_ns < RACY_NS:
+            mtime_ns = -1
+        return mtime_ns, files, subdirs, links, errors
+
+    def _add_tree(self, rel: str, dir_filter: Optional[DirFilter], changes: Dict[str, Any]) -> None:
+        """Scan a directory that is not known yet, with all subdirectories."""
+        stack = [(rel, dir_filter)]
+        while stack:
+            current, dir_filter = stack.pop()
+            self._watch(current)
+            listing = self._list_dir(current, dir_filter)
+            if listing is None:
+                self._unwatch(current)
+                continue
+
+            mtime_ns, files, subdirs, links, errors = listing
+            state = self.dirs[current] = _DirState(mtime_ns, dir_filter)
+            state.subdirs, state.links = subdirs, links
+            self.totals["total_dirs"] += len(subdirs) + len(links)
+            self._set_errors(state, errors)
+            if current:
+                changes["dirs_added"] += 1
+            for name, st in files.items():
+                state.files.add(name)
+                self._queue(current, name, st, changes)
+            for name in sorted(subdirs, reverse=True):
+                stack.append((self._join(current, name), self._child_filter(state, current, name)))
+
+    def _child_filter(self, state: _DirState, rel: str, name: str) -> Optional[DirFilter]:
+        """Return the matcher for a subdirectory of a known directory."""
+        if state.filter is None:
+            return None
+        return state.filter.descend(self._abspath(self._join(rel, name)), name)
+
+    def _drop_tree(self, rel: str, changes: Dict[str, Any]) -> None:
+        """Forget a directory and everything below it."""
+        prefix = rel + os.sep
+        for key in [key for key in self.dirs if not rel or key == rel or key.startswith(prefix)]:
+            state = self.dirs.pop(key)
+            self._unwatch(key)
+            self.totals["total_dirs"] -= len(state.subdirs) + len(state.links)
+            self._set_errors(state, set())
+            changes["dirs_removed"] += 1
+            for name in state.files:
+                self._remove_file(self._join(key, name), changes)
+
+    def _queue(self, rel_dir: str, name: str, st: os.stat_result, changes: Dict[str, Any]) -> None:
+        """Queue a file for counting if it is new or changed."""
+        rel = self._join(rel_dir, name)
+        entry = self.files.get(rel)
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return
+        record = (self._abspath(rel), rel, name, st)
+        changes["count"].append(record)
+
+    def _refresh_dir(self, rel: str, changes: Dict[str, Any]) -> None:
+        """List a known directory again and reconcile its entries."""
+        state = self.dirs.get(rel)
+        if state is None:
+            return
+        listing = self._list_dir(rel, state.filter)
+        if listing is None:
+            self._drop_tree(rel, changes)
+            return
+
+        mtime_ns, files, subdirs, links, errors = listing
+        state.mtime_ns = mtime_ns
+
+        for name in state.files - files.keys():
+            self._remove_file(self._join(rel, name), changes)
+        for name, st in files.items():
+            self._queue(rel, name, st, changes)
+        state.files = set(files)
+        self._set_errors(state, errors)
+
+        for name in state.subdirs - subdirs:
+            self._drop_tree(self._join(rel, name), changes)
+        self.totals["total_dirs"] += len(subdirs) + len(links) - len(state.subdirs) - len(state.links)
+        added = subdirs - state.subdirs
+        state.subdirs, state.links = subdirs, links
+        for name in sorted(added):
+            self._add_tree(self._join(rel, name), self._child_filter(state, rel, name), changes)
+
+    def _refresh_file(self, rel_dir: str, name: str, changes: Dict[str, Any]) -> None:
+        """Stat one file again and queue it if it changed."""
+        state = self.dirs.get(rel_dir)
+        if state is None or (state.filter is not None and state.filter.excludes(name, False)):
+            return
+        try:
+            st = os.stat(self._abspath(self._join(rel_dir, name)))
+        except OSError:
+            st = None
+        if st is None or stat.S_ISDIR(st.st_mode):
+            # Gone or replaced by a directory: reconcile the whole directory
+            self._refresh_dir(rel_dir, changes)
+            return
+        if name in state.errors:
+            self._set_errors(state, state.errors - {name})
+        state.files.add(name)
+        self._queue(rel_dir, name, st, changes)
+
+    def _poll_pass(self, changes: Dict[str, Any]) -> None:
+        """Check every known directory and file without inotify."""
+        for rel in list(self.dirs):
+            state = self.dirs.get(rel)
+            if state is None:
+                continue
+            try:
+                mtime_ns = os.stat(self._abspath(rel)).st_mtime_ns
+            except OSError:
+                if not rel:
+                    self._drop_tree(rel, changes)
+                continue
+            if mtime_ns != state.mtime_ns:
+                self._refresh_dir(rel, changes)
+            else:
+                for name in list(state.files):
+                    self._refresh_file(rel, name, changes)
+
+    def _event_pass(self, events: List[Tuple[int, int, str]], changes: Dict[str, Any]) -> None:
+        """Apply a batch of inotify events."""
+        dirty_dirs: Set[str] = set()
+        dirty_files: Set[Tuple[str, str]] = set()
+
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                self._poll_pass(changes)
+                return
+            rel = self._wd_dirs.get(wd)
+            if rel is None:
+                continue
+            if mask & IN_IGNORED:
+                self._wd_dirs.pop(wd, None)
+                self._dir_wds.pop(rel, None)
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if rel:
+                    dirty_dirs.add(os.path.dirname(rel))
+                else:
+                    dirty_dirs.add(rel)
+            elif mask & (IN_ISDIR | _ENTRY_EVENTS):
+                dirty_dirs.add(rel)
+            else:
+                dirty_files.add((rel, name))
+
+        # Parents first, so directories that disappeared are dropped once
+        for rel in sorted(dirty_dirs, key=lambda key: key.count(os.sep) if key else -1):
+            self._refresh_dir(rel, changes)
+        for rel, name in sorted(dirty_files):
+            if rel not in dirty_dirs:
+                self._refresh_file(rel, name, changes)
+
+    def _finish(self, changes: Dict[str, Any]) -> None:
+        """Count queued files and fold them into the state."""
+        records: List[FileRecord] = changes.pop("count")
+        for record, lines in self.analyzer.line_counts(records):
+            _path, rel, name, st = record
+            old = self.files.get(rel)
+            if old is not None:
+                self._apply(old, -1)
+            entry = (st.st_size, st.st_mtime_ns, lines, file_extension(name) or "no_ext", physical_size(st))
+            self.files[rel] = entry
+            self._apply(entry, 1)
+            changes["added" if old is None else "modified"].append(
+                _file_record(rel, entry[3], entry[0], lines)
+            )
+
+    def _new_changes(self) -> Dict[str, Any]:
+        return {"count": [], "added": [], "modified": [], "removed": [],
+                "dirs_added": 0, "dirs_removed": 0}
+
+    # -- public API ------------------------------------------------------
+
+    def scan(self) -> Dict[str, Any]:
+        """Run the initial full scan.
+
+        Returns:
+            Directory statistics in the shape of ``analyze_directory``
+        """
+        changes = self._new_changes()
+        path_filter = self.analyzer.path_filter
+        self._add_tree("", path_filter.root(self.root) if path_filter else None, changes)
+        self._finish(changes)
+        return self.stats()
+
+    def poll(self, timeout: float = 0.0) -> Optional[Dict[str, Any]]:
+        """Look for changes once.
+
+        With inotify this waits up to ``timeout`` seconds for events;
+        when polling it sleeps for ``timeout`` and then checks everything.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            A delta, or None if nothing changed. A delta has added and
+            modified (per-file records), removed (paths), dirs_added,
+            dirs_removed, totals (new totals) and diff (change of every
+            total during the pass)
+        """
+        before = dict(self.totals)
+        changes = self._new_changes()
+
+        if self._inotify is not None:
+            events = self._inotify.read(timeout)
+            if not events:
+                return None
+            self._event_pass(events, changes)
+        else:
+            if timeout:
+                time.sleep(timeout)
+            self._poll_pass(changes)
+
+        self._finish(changes)
+        if not (changes["added"] or changes["modified"] or changes["removed"]
+                or changes["dirs_added"] or changes["dirs_removed"] or self.totals != before):
+            return None
+
+        changes["totals"] = dict(self.totals)
+        changes["diff"] = {key: self.totals[key] - before[key] for key in TOTAL_KEYS}
+        return changes
+
+    def stats(self) -> Dict[str, Any]:
+        """Build full statistics from the current state.
+
+        This walks the in-memory state, not the file system. Files that
+        tie in the largest/longest lists may be ordered differently from
+        a fresh scan, since files found later are appended to the state.
+
+        Returns:
+            Directory statistics in the shape of ``analyze_directory``
+        """
+        aggregate = DirectoryAggregate(self.analyzer.top, self.analyzer.depth)
+        if self.analyzer.lines != "count":
+            aggregate.longest = TopK(0)
+            aggregate.track_lines = False
+        add = aggregate.add
+        for rel, (size, _mtime, lines, extension, physical) in self.files.items():
+            add(rel, extension, size, lines, physical)
+        aggregate.total_files = self.totals["total_files"]
+        aggregate.total_dirs = self.totals["total_dirs"]
+        if self.analyzer.lines != "count":
+            aggregate.line_count = {"mode": "none"}
+        return aggregate.to_stats()
+
+    def iter_events(self, interval: float = 1.0) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Scan once, then stream deltas until the caller stops iterating.
+
+        Args:
+            interval: Seconds between polling passes, or the longest wait
+                for inotify events
+
+        Yields:
+            ``("summary", stats)`` first, then ``("delta", delta)`` for
+            every pass that found changes
+        """
+        yield "summary", self.scan()
+        while True:
+            delta = self.poll(interval)
+            if delta is not None:
+                yield "delta", delta
+
@@ -1,6 +1,7 @@
 """Tests for the analyzer module."""
 
 import pytest
+import signal
 import tempfile
 import os
 from pathlib import Path
@@ -34,6 +35,17 @@ def temp_directory():
         yield tmpdir
 
 
+@pytest.fixture
+def wide_tree(tmp_path):
+    """Create 4 directories with 2 levels of 5 files each."""
+    for top in "abcd":
+        Path(tmp_path, top, "deep").mkdir(parents=True)
+        for i in range(5):
+            Path(tmp_path, top, f"{i}.txt").write_text("x\n" * (i + 1))
+            Path(tmp_path, top, "deep", f"{i}.log").write_text("y\n")
+    return tmp_path
+
+
 class TestFileAnalyzer:
     """Test suite for FileAnalyzer class."""
 
@@ -161,3 +173,660 @@ class TestFileAnalyzer:
 
         # Should complete without error
         assert stats["total_files"] > 0
+
+
+class TestParallelAnalysis:
+    """Test suite for parallel line counting."""
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_parallel_matches_serial(self, temp_directory, executor):
+        """Test that a parallel scan produces the same stats as a serial one."""
+        for i in range(600):
+            Path(temp_directory, f"gen{i}.txt").write_text("x\n" * (i % 7))
+
+        serial = FileAnalyzer(temp_directory).analyze_directory()
+        parallel = FileAnalyzer(temp_directory, jobs=4, executor=executor).analyze_directory()
+
+        assert parallel == serial
+
+    def test_jobs_zero_uses_cpu_count(self, temp_directory):
+        """Test that jobs=0 selects one worker per CPU."""
+        analyzer = FileAnalyzer(temp_directory, jobs=0)
+        assert analyzer.jobs == (os.cpu_count() or 1)
+
+    def test_invalid_jobs_raises_error(self, temp_directory):
+        """Test that negative jobs raises ValueError."""
+        with pytest.raises(ValueError):
+            FileAnalyzer(temp_directory, jobs=-1)
+
+    def test_invalid_executor_raises_error(self, temp_directory):
+        """Test that an unknown executor raises ValueError."""
+        with pytest.raises(ValueError):
+            FileAnalyzer(temp_directory, executor="fiber")
+
+
+class TestTopFiles:
+    """Test suite for largest and longest file lists."""
+
+    def test_top_is_configurable(self, temp_directory):
+        """Test that top controls the number of listed files."""
+        for i in range(10):
+            Path(temp_directory, f"gen{i}.txt").write_text("x\n" * i)
+
+        stats = FileAnalyzer(temp_directory, top=3).analyze_directory()
+
+        assert len(stats["largest_files"]) == 3
+        assert len(stats["longest_files"]) == 3
+
+    def test_longest_files_ranked_by_lines(self, temp_directory):
+        """Test that longest_files is ordered by line count."""
+        Path(temp_directory, "many.txt").write_text("\n" * 50)
+        Path(temp_directory, "wide.txt").write_text("x" * 500 + "\n")
+
+        stats = FileAnalyzer(temp_directory).analyze_directory()
+
+        assert stats["longest_files"][0]["name"] == "many.txt"
+        assert stats["longest_files"][0]["lines"] == 50
+        assert stats["largest_files"][0]["name"] == "wide.txt"
+        assert stats["largest_files"][0]["path"] == "wide.txt"
+
+    def test_negative_top_raises_error(self, temp_directory):
+        """Test that a negative top raises ValueError."""
+        with pytest.raises(ValueError):
+            FileAnalyzer(temp_directory, top=-1)
+
+
+class TestStreaming:
+    """Test suite for the streaming analysis API."""
+
+    def test_iter_records_yields_every_file(self, temp_directory):
+        """Test that iter_records yields one record per file."""
+        records = list(FileAnalyzer(temp_directory).iter_records())
+        paths = {record["path"] for record in records}
+
+        assert len(records) == 4
+        assert os.path.join("subdir", "file4.txt") in paths
+        assert sum(record["lines"] for record in records) == 6
+
+    def test_iter_progress_final_snapshot_matches(self, temp_directory):
+        """Test that the last progress snapshot equals analyze_directory."""
+        snapshots = list(FileAnalyzer(temp_directory).iter_progress(interval=0))
+        final = snapshots[-1]
+
+        assert final.pop("complete") is True
+        assert all(not snapshot["complete"] for snapshot in snapshots[:-1])
+        assert final == FileAnalyzer(temp_directory).analyze_directory()
+
+    def test_iter_progress_totals_grow(self, temp_directory):
+        """Test that running totals never decrease."""
+        snapshots = list(FileAnalyzer(temp_directory).iter_progress(interval=0))
+        files = [snapshot["total_files"] for snapshot in snapshots]
+
+        assert len(snapshots) > 1
+        assert files == sorted(files)
+
+    def test_iter_events_kinds(self, temp_directory):
+        """Test the event stream ends with a summary."""
+        events = list(FileAnalyzer(temp_directory).iter_events(interval=3600))
+        kinds = [kind for kind, _ in events]
+
+        assert kinds.count("file") == 4
+        assert kinds[-1] == "summary"
+
+    def test_iter_records_with_file_raises_error(self, temp_file):
+        """Test that streaming a file path raises NotADirectoryError."""
+        with pytest.raises(NotADirectoryError):
+            list(FileAnalyzer(temp_file).iter_records())
+
+
+class TestLargeFiles:
+    """Test suite for the large-file counting path."""
+
+    def test_threshold_uses_large_file_path(self, temp_file, monkeypatch):
+        """Test that files above the threshold use count_lines_large."""
+        calls = []
+
+        def fake_large(path, workers):
+            calls.append(path)
+            return 3
+
+        monkeypatch.setattr("filestat.analyzer.count_lines_large", fake_large)
+        info = FileAnalyzer(temp_file, large_file_threshold=1).get_file_info()
+
+        assert calls
+        assert info["lines"] == 3
+
+    def test_large_file_path_off_by_default(self, temp_file, monkeypatch):
+        """Test that without a threshold every file uses buffered reads."""
+        calls = []
+        monkeypatch.setattr("filestat.analyzer.count_lines_large", lambda path, workers: calls.append(path))
+        info = FileAnalyzer(temp_file).get_file_info()
+
+        assert not calls
+        assert info["lines"] == 3
+
+    def test_large_file_path_matches(self, temp_file):
+        """Test that both counting paths agree."""
+        small = FileAnalyzer(temp_file).get_file_info()
+        large = FileAnalyzer(temp_file, large_file_threshold=0).get_file_info()
+
+        assert small["lines"] == large["lines"] == 3
+
+
+class TestBinaryDetection:
+    """Test suite for binary file classification."""
+
+    def test_binary_files_reported_separately(self, temp_directory):
+        """Test that binary files are counted apart from text files."""
+        Path(temp_directory, "image.png").write_bytes(b"\x89PNG\r\n\x1a\n" + b"\n" * 100)
+        Path(temp_directory, "blob").write_bytes(b"\x00\n" * 50)
+
+        stats = FileAnalyzer(temp_directory).analyze_directory()
+
+        assert stats["binary_files"] == 2
+        assert stats["binary_size_bytes"] == 108 + 100
+        assert stats["text_files"] == 4
+        assert stats["text_files"] + stats["binary_files"] == stats["total_files"]
+        assert stats["text_size_bytes"] + stats["binary_size_bytes"] == stats["total_size_bytes"]
+        assert stats["total_lines"] == 6
+
+    @pytest.mark.parametrize("metrics", [False, True])
+    def test_dot_file_classified_by_name(self, temp_directory, metrics):
+        """Test that a file named like an extension is classified the same way on every path."""
+        path = Path(temp_directory, ".so")
+        path.write_text("not\na library\n")
+
+        info = FileAnalyzer(str(path), metrics=metrics).get_file_info()
+        stats = FileAnalyzer(temp_directory, metrics=metrics).analyze_directory()
+
+        assert info["lines"] == 2
+        assert stats["binary_files"] == 0
+
+    def test_binary_extension_not_opened(self, temp_directory, monkeypatch):
+        """Test that known binary extensions skip reading entirely."""
+        Path(temp_directory, "lib.so").write_bytes(b"\x7fELF")
+        opened = []
+        monkeypatch.setattr(
+            "filestat.analyzer.count_lines",
+            lambda path, sniff=False: opened.append(path) or 1,
+        )
+
+        FileAnalyzer(temp_directory).analyze_directory()
+
+        assert not any(path.endswith("lib.so") for path in opened)
+
+    def test_binary_file_info(self, temp_directory):
+        """Test get_file_info marks binary files."""
+        path = Path(temp_directory, "data.bin")
+        path.write_bytes(b"\x00\x01\n\x02")
+
+        info = FileAnalyzer(str(path)).get_file_info()
+
+        assert info["binary"] is True
+        assert info["lines"] == 0
+
+
+class TestDirectoryTree:
+    """Test suite for per-directory rollups."""
+
+    def test_no_tree_by_default(self, temp_directory):
+        """Test that the rollup is opt-in."""
+        assert "directory_tree" not in FileAnalyzer(temp_directory).analyze_directory()
+
+    def test_tree_totals_match(self, temp_directory):
+        """Test that the root of the tree matches the whole-tree totals."""
+        stats = FileAnalyzer(temp_directory, depth=1).analyze_directory()
+        tree = stats["directory_tree"]
+
+        assert tree["files"] == stats["total_files"]
+        assert tree["size_bytes"] == stats["total_size_bytes"]
+        assert tree["lines"] == stats["total_lines"]
+        assert [child["name"] for child in tree["children"]] == ["subdir"]
+        assert tree["children"][0]["files"] == 1
+
+    def test_negative_depth_raises_error(self, temp_directory):
+        """Test that a negative depth raises ValueError."""
+        with pytest.raises(ValueError):
+            FileAnalyzer(temp_directory, depth=-1)
+
+
+class TestProfiling:
+    """Test suite for scan profiling."""
+
+    def test_no_profile_by_default(self, temp_directory):
+        """Test that profiling is opt-in."""
+        analyzer = FileAnalyzer(temp_directory)
+
+        assert "profile" not in analyzer.analyze_directory()
+        assert analyzer.profile is None
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_directory_profile(self, temp_directory, jobs):
+        """Test phases, counters and rates of a directory scan."""
+        analyzer = FileAnalyzer(temp_directory, jobs=jobs, profile=True)
+        stats = analyzer.analyze_directory()
+        profile = stats["profile"]
+
+        assert set(profile["phases"]) == {"listing", "stat", "read", "aggregate"}
+        assert profile["counters"]["stat_calls"] == 4
+        assert profile["counters"]["files_counted"] == 4
+        assert profile["counters"]["bytes_counted"] == stats["total_size_bytes"]
+        assert len(profile["slowest_files"]) == 4
+        assert profile["files_per_s"] > 0
+        assert analyzer.profile.to_dict()["counters"] == profile["counters"]
+
+    def test_profile_matches_unprofiled_stats(self, temp_directory):
+        """Test that profiling does not change the results."""
+        plain = FileAnalyzer(temp_directory).analyze_directory()
+        profiled = FileAnalyzer(temp_directory, profile=True).analyze_directory()
+        profiled.pop("profile")
+
+        assert profiled == plain
+
+    def test_file_profile(self, temp_file):
+        """Test that single files report stat and read time."""
+        info = FileAnalyzer(temp_file, profile=True).get_file_info()
+
+        assert set(info["profile"]["phases"]) == {"stat", "read"}
+        assert info["profile"]["counters"]["files_counted"] == 1
+
+
+class TestFiltering:
+    """Test suite for include/exclude filtering."""
+
+    def test_no_pruned_counts_by_default(self, temp_directory):
+        """Test that unfiltered scans do not report pruning."""
+        assert "pruned" not in FileAnalyzer(temp_directory).analyze_directory()
+
+    def test_exclude_directory(self, temp_directory):
+        """Test that excluded directories are left out and counted."""
+        stats = FileAnalyzer(temp_directory, exclude=["subdir"]).analyze_directory()
+
+        assert stats["total_files"] == 3
+        assert stats["total_dirs"] == 0
+        assert stats["pruned"] == {"dirs": 1, "files": 0}
+
+    def test_respect_gitignore(self, temp_directory):
+        """Test that .gitignore files are honored when requested."""
+        Path(temp_directory, ".gitignore").write_text("*.json\n")
+        Path(temp_directory, ".git").mkdir()
+        Path(temp_directory, ".git", "HEAD").write_text("ref\n")
+
+        stats = FileAnalyzer(temp_directory, respect_gitignore=True).analyze_directory()
+
+        assert ".json" not in stats["file_types"]
+        assert stats["total_files"] == 4
+        assert stats["pruned"] == {"dirs": 1, "files": 1}
+
+
+class TestLineModes:
+    """Test suite for metadata-only and estimated line counting."""
+
+    def test_no_lines_never_opens_files(self, temp_directory, monkeypatch):
+        """Test that --no-lines reports sizes without reading any file."""
+        import filestat.analyzer as analyzer_module
+
+        def fail(path):
+            raise AssertionError(f"opened {path}")
+
+        monkeypatch.setattr(analyzer_module, "_safe_count_lines", fail)
+        Path(temp_directory, "image.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+
+        stats = FileAnalyzer(temp_directory, lines="none").analyze_directory()
+
+        assert stats["total_files"] == 5
+        assert stats["total_lines"] == 0
+        assert stats["binary_files"] == 1
+        assert stats["longest_files"] == []
+        assert stats["line_count"] == {"mode": "none"}
+
+    def test_no_lines_has_no_line_distribution(self, temp_directory):
+        """Test that only size distributions are reported without line counts."""
+        distributions = FileAnalyzer(temp_directory, lines="none").analyze_directory()["distributions"]
+
+        assert distributions["size_bytes"]["count"] == 4
+        assert "lines" not in distributions
+        assert all("lines" not in entry for entry in distributions["extensions"].values())
+
+    def test_no_lines_file_info(self, temp_file):
+        """Test that a single file is not counted in --no-lines mode."""
+        info = FileAnalyzer(temp_file, lines="none").get_file_info()
+
+        assert info["lines"] == 0
+        assert info["line_count"] == {"mode": "none"}
+
+    def test_no_lines_file_info_skips_cache(self, temp_file, tmp_path):
+        """Test that --no-lines mode does not look files up in the cache."""
+        cache = str(tmp_path / "cache.db")
+        FileAnalyzer(temp_file, cache=cache).get_file_info()
+
+        info = FileAnalyzer(temp_file, cache=cache, lines="none").get_file_info()
+
+        assert info["lines"] == 0
+        assert (info["cache"]["hits"], info["cache"]["misses"]) == (0, 0)
+
+    def test_estimate_is_exact_when_every_file_is_sampled(self, temp_directory):
+        """Test that strata smaller than the sample size are counted exactly."""
+        exact = FileAnalyzer(temp_directory).analyze_directory()
+        stats = FileAnalyzer(temp_directory, lines="estimate").analyze_directory()
+
+        assert stats["total_lines"] == exact["total_lines"]
+        assert stats["line_count"]["ci_low"] == stats["line_count"]["ci_high"] == exact["total_lines"]
+        assert stats["line_count"]["sampled_files"] == 4
+
+    def test_estimate_is_reproducible(self, tmp_path):
+        """Test that a sampled estimate is reproducible and exact for proportional files."""
+        for i in range(200):
+            (tmp_path / f"f{i}.txt").write_text("x\n" * (i % 17 + 1))
+        exact = FileAnalyzer(str(tmp_path)).analyze_directory()["total_lines"]
+
+        first = FileAnalyzer(str(tmp_path), lines="estimate", sample_size=40, seed=1).analyze_directory()
+        again = FileAnalyzer(str(tmp_path), lines="estimate", sample_size=40, seed=1).analyze_directory()
+
+        assert first["line_count"] == again["line_count"]
+        assert first["line_count"]["sampled_files"] == 40
+        assert first["line_count"]["strata"][".txt"]["files"] == 200
+        # Every file's lines are proportional to its size
+        assert first["total_lines"] == exact
+
+    def test_invalid_line_mode(self, temp_directory):
+        """Test that unknown line modes and tiny samples are rejected."""
+        with pytest.raises(ValueError):
+            FileAnalyzer(temp_directory, lines="some")
+        with pytest.raises(ValueError):
+            FileAnalyzer(temp_directory, lines="estimate", sample_size=1)
+
+
+class TestDuplicates:
+    """Test suite for duplicate detection during scans."""
+
+    def test_no_duplicates_key_by_default(self, temp_directory):
+        """Test that duplicates are only reported when requested."""
+        assert "duplicates" not in FileAnalyzer(temp_directory).analyze_directory()
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_duplicates_reported(self, temp_directory, jobs):
+        """Test that identical files are grouped with their wasted bytes."""
+        Path(temp_directory, "copy.txt").write_text("hello\nworld\n")
+
+        duplicates = FileAnalyzer(temp_directory, jobs=jobs, duplicates=True).analyze_directory()["duplicates"]
+
+        assert duplicates["group_count"] == 1
+        assert duplicates["wasted_bytes"] == 12
+        assert duplicates["groups"][0]["paths"] == ["copy.txt", "file1.txt"]
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="hard links not supported")
+class TestLinks:
+    """Test suite for hard link, symlink and physical size handling."""
+
+    def test_hard_link_counted_once(self, temp_directory):
+        """Test that a hard-linked file is read and counted once."""
+        os.link(Path(temp_directory, "file1.txt"), Path(temp_directory, "subdir", "same.txt"))
+
+        stats = FileAnalyzer(temp_directory).analyze_directory()
+
+        assert stats["total_files"] == 4
+        assert stats["total_lines"] == 6
+        assert stats["links"] == {
+            "skipped_files": 1, "skipped_bytes": 12, "repeated_dirs": 0, "mount_points": 0,
+        }
+
+    def test_no_links_key_by_default(self, temp_directory):
+        """Test that link counts are only reported when something was skipped."""
+        assert "links" not in FileAnalyzer(temp_directory).analyze_directory()
+
+    def test_physical_size_reported(self, temp_directory):
+        """Test that the allocated size is reported next to the apparent size."""
+        stats = FileAnalyzer(temp_directory).analyze_directory()
+        expected = sum(
+            os.stat(Path(root, name)).st_blocks * 512
+            for root, _dirs, files in os.walk(temp_directory)
+            for name in files
+        )
+
+        assert stats["physical_size_bytes"] == expected
+
+    def test_sparse_file_physical_size(self, tmp_path):
+        """Test that a sparse file's physical size is below its apparent size."""
+        with open(tmp_path / "sparse.bin", "wb") as f:
+            f.seek(10 * 1024 * 1024)
+            f.write(b"\0")
+
+        stats = FileAnalyzer(str(tmp_path), lines="none").analyze_directory()
+
+        assert stats["total_size_bytes"] == 10 * 1024 * 1024 + 1
+        assert stats["physical_size_bytes"] < stats["total_size_bytes"]
+
+    def test_follow_symlinks_with_loop(self, temp_directory):
+        """Test that following symlinks counts linked files and stops at loops."""
+        with tempfile.TemporaryDirectory() as outside:
+            Path(outside, "extra.md").write_text("a\nb\n")
+            os.symlink(outside, Path(temp_directory, "linked"))
+            os.symlink(temp_directory, Path(temp_directory, "subdir", "loop"))
+
+            plain = FileAnalyzer(temp_directory).analyze_directory()
+            followed = FileAnalyzer(temp_directory, follow_symlinks=True).analyze_directory()
+
+        assert plain["total_files"] == 4
+        assert followed["total_files"] == 5
+        assert followed["total_lines"] == plain["total_lines"] + 2
+        assert followed["links"]["repeated_dirs"] == 1
+
+
+class TestDistributions:
+    """Test suite for size and line distributions."""
+
+    def test_distributions_reported(self, temp_directory):
+        """Test overall and per-extension quantiles of a small tree."""
+        stats = FileAnalyzer(temp_directory).analyze_directory()
+        distributions = stats["distributions"]
+
+        assert distributions["size_bytes"]["count"] == stats["total_files"]
+        assert distributions["size_bytes"]["total"] == stats["total_size_bytes"]
+        assert distributions["size_bytes"]["p50"] == 12
+        assert distributions["size_bytes"]["max"] == 21
+        assert distributions["lines"]["total"] == stats["total_lines"]
+        assert distributions["lines"]["p99"] == 2
+        assert list(distributions["extensions"]) == [".txt", ".py", ".json"]
+        assert distributions["extensions"][".txt"]["size_bytes"]["total"] == 24
+
+    def test_binary_files_have_no_lines(self, temp_directory):
+        """Test that binary files count towards sizes but not lines."""
+        Path(temp_directory, "blob.bin").write_bytes(b"\x00" * 300)
+
+        distributions = FileAnalyzer(temp_directory).analyze_directory()["distributions"]
+
+        assert distributions["size_bytes"]["count"] == 5
+        assert distributions["lines"]["count"] == 4
+        assert "lines" not in distributions["extensions"][".bin"]
+
+
+class TestLimits:
+    """Test suite for scan limits and early stops."""
+
+    @pytest.mark.parametrize("jobs", [1, 3])
+    def test_max_files(self, wide_tree, jobs):
+        """Test that the scan stops at the limit with consistent totals."""
+        stats = FileAnalyzer(str(wide_tree), jobs=jobs, max_files=12).analyze_directory()
+
+        assert stats["total_files"] == 12
+        assert sum(stats["file_types"].values()) == 12
+        assert stats["incomplete"] is True
+        coverage = stats["coverage"]
+        assert coverage["stopped_by"] == "max_files"
+        assert 0 < coverage["dirs_fraction"] < 1
+        assert coverage["dirs_visited"] + coverage["dirs_pending"] == stats["total_dirs"] + 1
+
+    @pytest.mark.parametrize("subdirs", [0, 10])
+    @pytest.mark.parametrize("max_files", [10, 50, 150, 500])
+    def test_partial_listing_is_not_covered(self, tmp_path, subdirs, max_files):
+        """Test that the directory being listed at a stop is not counted as covered."""
+        for i in range(100):
+            Path(tmp_path, f"{i}.txt").write_text("x\n")
+        for d in range(subdirs):
+            Path(tmp_path, f"sub{d}").mkdir()
+            for i in range(100):
+                Path(tmp_path, f"sub{d}", f"{i}.txt").write_text("x\n")
+
+        stats = FileAnalyzer(str(tmp_path), max_files=max_files).analyze_directory()
+
+        if stats["incomplete"]:
+            assert stats["coverage"]["dirs_fraction"] < 1.0
+            assert stats["coverage"]["dirs_pending"] >= 1
+        else:
+            assert stats["coverage"]["dirs_fraction"] == 1.0
+
+    def test_breadth_first_is_representative(self, wide_tree):
+        """Test that a stopped scan has seen every top-level directory first."""
+        stats = FileAnalyzer(str(wide_tree), max_files=20).analyze_directory()
+
+        assert stats["file_types"] == {".txt": 20}
+
+    def test_max_bytes(self, wide_tree):
+        """Test that the scan stops once the byte limit is reached."""
+        stats = FileAnalyzer(str(wide_tree), max_bytes=10).analyze_directory()
+
+        assert stats["coverage"]["stopped_by"] == "max_bytes"
+        assert 10 <= stats["total_size_bytes"] < 20
+
+    def test_limit_not_reached(self, wide_tree):
+        """Test that a scan within its limits is complete and says so."""
+        stats = FileAnalyzer(str(wide_tree), max_files=1000, time_budget=60).analyze_directory()
+
+        assert stats["total_files"] == 40
+        assert stats["incomplete"] is False
+        assert stats["coverage"]["dirs_fraction"] == 1.0
+        assert "coverage" not in FileAnalyzer(str(wide_tree)).analyze_directory()
+
+    def test_stop(self, wide_tree):
+        """Test that stop() ends a running scan with partial results."""
+        analyzer = FileAnalyzer(str(wide_tree))
+        events = analyzer.iter_events()
+        for i, (kind, payload) in enumerate(events):
+            if i == 4:
+                analyzer.stop()
+            if kind == "summary":
+                break
+
+        assert analyzer.stopped_by == "stop"
+        assert payload["total_files"] == 5
+        assert payload["incomplete"] is True
+
+    def test_sigint_stops_interruptible_scan(self, wide_tree):
+        """Test that Ctrl-C stops an interruptible scan and restores the handler."""
+        previous = signal.getsignal(signal.SIGINT)
+        analyzer = FileAnalyzer(str(wide_tree), interruptible=True)
+        records = []
+        for record in analyzer.iter_records():
+            records.append(record)
+            if len(records) == 3:
+                os.kill(os.getpid(), signal.SIGINT)
+
+        assert len(records) == 3
+        assert analyzer.stopped_by == "interrupt"
+        assert signal.getsignal(signal.SIGINT) is previous
+
+    def test_multi_root_takes_turns(self, wide_tree):
+        """Test that limited multi-root scans share the budget between roots."""
+        from filestat.multiroot import MultiRootAnalyzer
+
+        report = MultiRootAnalyzer([str(wide_tree / "a"), str(wide_tree / "b")], max_files=6).analyze()
+
+        assert [root["total_files"] for root in report["roots"]] == [3, 3]
+        assert report["total"]["incomplete"] is True
+        # Neither root was listed to the end
+        assert report["total"]["coverage"]["dirs_visited"] == 0
+
+    def test_complete_scans_only(self, wide_tree, tmp_path):
+        """Test that indexes and snapshots refuse limits."""
+        analyzer = FileAnalyzer(str(wide_tree), max_files=5)
+        with pytest.raises(ValueError):
+            analyzer.build_index()
+        with pytest.raises(ValueError):
+            analyzer.save_snapshot(str(tmp_path / "s.fsnap"))
+
+    @pytest.mark.parametrize("option", ["max_files", "max_bytes", "time_budget"])
+    def test_rejects_non_positive_limits(self, wide_tree, option):
+        """Test that limits must be greater than 0."""
+        with pytest.raises(ValueError, match=option):
+            FileAnalyzer(str(wide_tree), **{option: 0})
+
+
+class TestContentMetrics:
+    """Test suite for metrics mode."""
+
+    @pytest.mark.parametrize("jobs,executor", [(1, "thread"), (3, "thread"), (2, "process")])
+    def test_directory_totals(self, temp_directory, jobs, executor):
+        """Test that totals match a line-only scan and sum the per-file metrics."""
+        analyzer = FileAnalyzer(temp_directory, jobs=jobs, executor=executor, metrics=True, metrics_kernel="python")
+        records = list(analyzer.iter_records())
+        stats = analyzer.analyze_directory()
+
+        assert stats["total_lines"] == FileAnalyzer(temp_directory).analyze_directory()["total_lines"]
+        assert stats["content_metrics"] == {
+            "lines": 6,
+            "words": 9,
+            "chars": 62,
+            "bytes": 62,
+            "max_line_length": 16,
+            "max_line_path": "file3.json",
+        }
+        assert sum(record["words"] for record in records) == 9
+
+    def test_aggregates_hold_plain_line_counts(self, temp_directory):
+        """Test that ranked files and the rollup carry plain ints, not ContentMetrics."""
+        stats = FileAnalyzer(temp_directory, metrics=True, depth=1).analyze_directory()
+
+        entries = stats["largest_files"] + stats["longest_files"]
+        assert entries and all(type(entry["lines"]) is int for entry in entries)
+        assert type(stats["directory_tree"]["lines"]) is int
+
+    def test_file_info(self, tmp_path):
+        """Test metrics of a single file, counting UTF-8 characters."""
+        path = tmp_path / "notes.txt"
+        path.write_bytes("déjà vu\nsecond line here\n".encode("utf-8"))
+
+        info = FileAnalyzer(str(path), metrics=True, large_file_threshold=0).get_file_info()
+
+        assert info["lines"] == 2
+        assert info["content_metrics"] == {
+            "lines": 2, "words": 5, "chars": 25, "bytes": 27, "max_line_length": 16,
+        }
+
+    def test_binary_files_excluded(self, tmp_path):
+        """Test that binary files add nothing to the content metrics."""
+        Path(tmp_path, "a.txt").write_text("one two\n")
+        Path(tmp_path, "b.bin").write_bytes(b"\x00 x y z\n" * 10)
+
+        stats = FileAnalyzer(str(tmp_path), metrics=True).analyze_directory()
+
+        assert stats["binary_files"] == 1
+        assert stats["content_metrics"]["words"] == 2
+
+    def test_multi_root_paths(self, wide_tree):
+        """Test that the longest line is reported with its root."""
+        from filestat.multiroot import MultiRootAnalyzer
+
+        Path(wide_tree, "b", "wide.txt").write_text("x" * 50 + "\n")
+        report = MultiRootAnalyzer([str(wide_tree / "a"), str(wide_tree / "b")], metrics=True).analyze()
+
+        total = report["total"]["content_metrics"]
+        assert total["max_line_length"] == 50
+        assert total["max_line_path"] == os.path.join(str(wide_tree / "b"), "wide.txt")
+        assert total["words"] == sum(root["content_metrics"]["words"] for root in report["roots"])
+
+    def test_bypasses_cache(self, temp_directory, tmp_path):
+        """Test that metrics mode neither reads nor writes the line-count cache."""
+        cache = str(tmp_path / "cache.db")
+        stats = FileAnalyzer(temp_directory, cache=cache, metrics=True).analyze_directory()
+
+        assert "cache" not in stats
+        assert not os.path.exists(cache)
+
+    def test_needs_line_counts(self, temp_directory):
+        """Test that metrics mode requires counting every file."""
+        with pytest.raises(ValueError, match="lines"):
+            FileAnalyzer(temp_directory, lines="none", metrics=True)
+        with pytest.raises(ValueError, match="kernel"):
+            FileAnalyzer(temp_directory, metrics=True, metrics_kernel="simd")
@@ -0,0 +1,133 @@
+"""Tests for the async_analyzer module."""
+
+import asyncio
+import time
+import pytest
+from filestat.analyzer import FileAnalyzer
+from filestat.async_analyzer import AsyncFileAnalyzer, analyze_directory_async
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a directory with a few dozen files."""
+    for i in range(40):
+        sub = tmp_path / f"d{i % 4}"
+        sub.mkdir(exist_ok=True)
+        (sub / f"f{i}.txt").write_text("x\n" * (i + 1))
+    return tmp_path
+
+
+@pytest.fixture
+def slow_reads(monkeypatch):
+    """Make every line count take 20 ms and record which files were read."""
+    import filestat.analyzer as analyzer_module
+
+    read = []
+    count = analyzer_module._safe_count_lines
+
+    def slow(path):
+        time.sleep(0.02)
+        read.append(path)
+        return count(path)
+
+    monkeypatch.setattr(analyzer_module, "_safe_count_lines", slow)
+    return read
+
+
+class TestAsyncFileAnalyzer:
+    """Test suite for AsyncFileAnalyzer."""
+
+    @pytest.mark.parametrize("concurrency", [1, 4])
+    def test_same_stats_as_sync(self, tree, concurrency):
+        """Test that the async scan returns exactly the sync statistics."""
+        analyzer = AsyncFileAnalyzer(str(tree), concurrency=concurrency, batch_size=7, depth=1)
+
+        stats = asyncio.run(analyzer.analyze_directory())
+
+        assert stats == FileAnalyzer(str(tree), depth=1).analyze_directory()
+
+    def test_progress_snapshots(self, tree):
+        """Test that progress callbacks see growing partial totals."""
+        seen = []
+
+        async def progress(stats):
+            seen.append(stats["total_files"])
+
+        stats = asyncio.run(analyze_directory_async(
+            str(tree), progress=progress, interval=0, batch_size=10, concurrency=1,
+        ))
+
+        assert seen == [10, 20, 30, 40]
+        assert stats["total_files"] == 40
+
+    def test_iter_progress_marks_last_snapshot(self, tree):
+        """Test that only the final snapshot is complete."""
+
+        async def collect():
+            return [stats["complete"] async for stats in AsyncFileAnalyzer(
+                str(tree), batch_size=16).iter_progress(0)]
+
+        assert asyncio.run(collect()) == [False, False, True]
+
+    def test_event_loop_stays_responsive(self, tree, slow_reads):
+        """Test that other tasks keep running while files are read."""
+
+        async def main():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            await AsyncFileAnalyzer(str(tree), concurrency=2, batch_size=4).analyze_directory()
+            task.cancel()
+            return ticks
+
+        # 40 files at 20 ms on 2 workers take about 0.4 s
+        assert asyncio.run(main()) >= 10
+
+    def test_timeout_stops_scan(self, tree, slow_reads):
+        """Test that a timeout cancels the scan part-way through."""
+        analyzer = AsyncFileAnalyzer(str(tree), concurrency=1, batch_size=2)
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(analyzer.analyze_directory(timeout=0.1))
+        read = len(slow_reads)
+        time.sleep(0.2)
+
+        assert read < 40
+        # At most the batch in flight finishes after cancellation
+        assert len(slow_reads) <= read + 2
+
+    def test_not_a_directory(self, tree):
+        """Test that scanning a file raises NotADirectoryError."""
+        path = next(tree.glob("*/*.txt"))
+        with pytest.raises(NotADirectoryError):
+            asyncio.run(AsyncFileAnalyzer(str(path)).analyze_directory())
+
+    def test_get_stats_for_file(self, tree):
+        """Test that files are analyzed off the event loop."""
+        path = next(tree.glob("d0/f0.txt"))
+        stats = asyncio.run(AsyncFileAnalyzer(str(path)).get_stats())
+
+        assert stats["lines"] == 1
+
+    def test_invalid_concurrency(self, tree):
+        """Test that a concurrency below 1 is rejected."""
+        with pytest.raises(ValueError):
+            AsyncFileAnalyzer(str(tree), concurrency=0)
+
+    def test_cache_is_used_from_one_thread(self, tree, tmp_path_factory):
+        """Test that the SQLite cache works when the scan runs off the loop."""
+        cache = str(tmp_path_factory.mktemp("cache") / "cache.db")
+
+        async def scan():
+            return await AsyncFileAnalyzer(str(tree), concurrency=3, batch_size=5, cache=cache).analyze_directory()
+
+        asyncio.run(scan())
+        stats = asyncio.run(scan())
+
+        assert stats["cache"]["hits"] == 40
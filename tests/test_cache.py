@@ -0,0 +1,120 @@
+"""Tests for the cache module."""
+
+import os
+import pytest
+from pathlib import Path
+from filestat.analyzer import FileAnalyzer
+from filestat.cache import LineCountCache
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a directory to scan and a separate cache location."""
+    root = tmp_path / "tree"
+    root.mkdir()
+    Path(root, "a.txt").write_text("1\n2\n3\n")
+    Path(root, "b.py").write_text("x = 1\n")
+    Path(root, "sub").mkdir()
+    Path(root, "sub", "c.md").write_text("# title\n\ntext\n")
+    return root, str(tmp_path / "cache.db")
+
+
+class TestLineCountCache:
+    """Test suite for LineCountCache."""
+
+    def test_lookup_miss_then_hit(self, tmp_path):
+        """Test that stored counts are returned for unchanged files."""
+        path = tmp_path / "f.txt"
+        path.write_text("a\nb\n")
+        st = os.stat(path)
+
+        with LineCountCache(str(tmp_path / "cache.db")) as cache:
+            assert cache.lookup(str(path), st) is None
+            cache.store(str(path), st, 2)
+            assert cache.lookup(str(path), st) == 2
+            assert cache.stats()["hits"] == 1
+            assert cache.stats()["misses"] == 1
+
+    def test_changed_signature_is_a_miss(self, tmp_path):
+        """Test that a size or mtime change invalidates the entry."""
+        path = tmp_path / "f.txt"
+        path.write_text("a\n")
+        db = str(tmp_path / "cache.db")
+
+        with LineCountCache(db) as cache:
+            cache.store(str(path), os.stat(path), 1)
+
+        path.write_text("a\nb\nc\n")
+        with LineCountCache(db) as cache:
+            assert cache.lookup(str(path), os.stat(path)) is None
+
+
+class TestAnalyzerCache:
+    """Test suite for cache use by FileAnalyzer."""
+
+    def test_second_scan_hits_cache(self, tree):
+        """Test that a repeated scan reads nothing and gives the same totals."""
+        root, db = tree
+        first = FileAnalyzer(str(root), cache=db).analyze_directory()
+        second = FileAnalyzer(str(root), cache=db).analyze_directory()
+
+        assert first["cache"]["misses"] == 3
+        assert second["cache"]["hits"] == 3
+        assert second["cache"]["misses"] == 0
+        assert second["total_lines"] == first["total_lines"] == 7
+
+    def test_cached_counts_are_not_reread(self, tree, monkeypatch):
+        """Test that cache hits skip counting entirely."""
+        root, db = tree
+        FileAnalyzer(str(root), cache=db).analyze_directory()
+
+        monkeypatch.setattr("filestat.analyzer.count_lines", lambda path: pytest.fail(path))
+        stats = FileAnalyzer(str(root), cache=db).analyze_directory()
+
+        assert stats["total_lines"] == 7
+
+    def test_modified_file_is_recounted(self, tree):
+        """Test that only changed files miss."""
+        root, db = tree
+        FileAnalyzer(str(root), cache=db).analyze_directory()
+        Path(root, "a.txt").write_text("1\n2\n3\n4\n5\n")
+
+        stats = FileAnalyzer(str(root), cache=db).analyze_directory()
+
+        assert stats["cache"]["hits"] == 2
+        assert stats["cache"]["misses"] == 1
+        assert stats["total_lines"] == 9
+
+    def test_deleted_files_are_evicted(self, tree):
+        """Test that entries for deleted files are removed."""
+        root, db = tree
+        FileAnalyzer(str(root), cache=db).analyze_directory()
+        Path(root, "sub", "c.md").unlink()
+
+        stats = FileAnalyzer(str(root), cache=db).analyze_directory()
+
+        assert stats["cache"]["evicted"] == 1
+
+    def test_parallel_scan_uses_cache(self, tree):
+        """Test the cache with a worker pool."""
+        root, db = tree
+        FileAnalyzer(str(root), cache=db).analyze_directory()
+        stats = FileAnalyzer(str(root), jobs=2, cache=db).analyze_directory()
+
+        assert stats["cache"]["hits"] == 3
+        assert stats["total_lines"] == 7
+
+    def test_file_info_uses_cache(self, tree):
+        """Test caching for a single file."""
+        root, db = tree
+        path = str(Path(root, "a.txt"))
+        FileAnalyzer(path, cache=db).get_file_info()
+        info = FileAnalyzer(path, cache=db).get_file_info()
+
+        assert info["lines"] == 3
+        assert info["cache"]["hits"] == 1
+
+    def test_no_cache_key_without_cache(self, tree):
+        """Test that stats omit cache info when caching is off."""
+        root, _ = tree
+        assert "cache" not in FileAnalyzer(str(root)).analyze_directory()
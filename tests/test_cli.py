@@ -1,7 +1,9 @@
 """Tests for the CLI module."""
 
+import os
 import pytest
 from filestat.cli import create_parser, main
+from filestat.index import FileIndex
 import tempfile
 from pathlib import Path
 
@@ -29,7 +31,14 @@ class TestCLI:
         """Test that parser accepts path argument."""
         parser = create_parser()
         args = parser.parse_args(["/some/path"])
-        assert args.path == "/some/path"
+        assert args.path == ["/some/path"]
+
+    def test_parser_accepts_several_paths(self):
+        """Test that parser accepts several paths and --from-file."""
+        parser = create_parser()
+        args = parser.parse_args(["/a", "/b", "--from-file", "dirs.txt"])
+        assert args.path == ["/a", "/b"]
+        assert args.from_file == "dirs.txt"
 
     def test_parser_accepts_verbose_flag(self):
         """Test that parser accepts verbose flag."""
@@ -43,11 +52,43 @@ class TestCLI:
         args = parser.parse_args(["/some/path", "--verbose"])
         assert args.verbose is True
 
+    def test_parser_accepts_jobs(self):
+        """Test that parser accepts --jobs and --executor."""
+        parser = create_parser()
+        args = parser.parse_args(["/some/path", "-j", "4", "--executor", "process"])
+        assert args.jobs == 4
+        assert args.executor == "process"
+
+    def test_parser_jobs_defaults_to_serial(self):
+        """Test that jobs defaults to 1."""
+        parser = create_parser()
+        args = parser.parse_args(["/some/path"])
+        assert args.jobs == 1
+        assert args.executor == "thread"
+
+    def test_parser_accepts_cache(self):
+        """Test that parser accepts --cache."""
+        parser = create_parser()
+        args = parser.parse_args(["/some/path", "--cache", "stats.db"])
+        assert args.cache == "stats.db"
+
+    def test_parser_accepts_format(self):
+        """Test that parser accepts --format ndjson."""
+        parser = create_parser()
+        args = parser.parse_args(["/some/path", "--format", "ndjson"])
+        assert args.format == "ndjson"
+
+    def test_parser_format_defaults_to_table(self):
+        """Test that the default format is table."""
+        parser = create_parser()
+        args = parser.parse_args(["/some/path"])
+        assert args.format == "table"
+
     def test_parser_path_is_optional(self):
         """Test that path argument is optional for parser (but required by main)."""
         parser = create_parser()
         args = parser.parse_args([])
-        assert args.path is None
+        assert args.path == []
 
     def test_main_with_no_arguments(self):
         """Test main returns error code when no path provided."""
@@ -102,3 +143,617 @@ class TestCLI:
             assert exit_code == 0
         finally:
             sys.argv = original_argv
+
+    def test_main_ndjson_output(self, tmp_path, capsys):
+        """Test that ndjson mode prints one JSON line per file plus a summary."""
+        import sys
+        import json
+
+        (tmp_path / "a.txt").write_text("1\n2\n")
+        (tmp_path / "b.txt").write_text("1\n")
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--format", "ndjson"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert exit_code == 0
+        assert [line["type"] for line in lines].count("file") == 2
+        assert lines[-1]["type"] == "summary"
+        assert lines[-1]["total_lines"] == 3
+
+    def test_main_save_and_query_index(self, tmp_path):
+        """Test saving an index and reporting from it without a path."""
+        import sys
+
+        (tmp_path / "tree").mkdir()
+        (tmp_path / "tree" / "a.log").write_text("x\n")
+        index_path = str(tmp_path / "tree.fsidx")
+
+        original_argv = sys.argv
+        try:
+            sys.argv = ["filestat", str(tmp_path / "tree"), "--save-index", index_path]
+            assert main() == 0
+            assert Path(index_path).exists()
+
+            sys.argv = ["filestat", "--index", index_path, "--ext", ".log"]
+            assert main() == 0
+        finally:
+            sys.argv = original_argv
+
+    def test_main_index_broken_pipe(self, tmp_path, monkeypatch, capsys):
+        """Test that a reader closing the pipe early is not reported as an error."""
+        import sys
+        import filestat.cli
+
+        index_path = str(tmp_path / "tree.fsidx")
+        FileIndex().save(index_path)
+
+        def broken_pipe(*args):
+            raise BrokenPipeError
+
+        monkeypatch.setattr(filestat.cli, "_print_stats", broken_pipe)
+        monkeypatch.setattr(os, "dup2", lambda *args: None)
+        original_argv = sys.argv
+        sys.argv = ["filestat", "--index", index_path, "--format", "json"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert exit_code == 0
+        assert "Error" not in capsys.readouterr().err
+
+    def test_main_with_missing_index(self, tmp_path):
+        """Test main returns error code for a missing index file."""
+        import sys
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", "--index", str(tmp_path / "missing.fsidx")]
+
+        try:
+            assert main() == 1
+        finally:
+            sys.argv = original_argv
+
+    def test_main_json_output(self, tmp_path, capsys):
+        """Test that json mode prints the statistics as one document."""
+        import sys
+        import json
+
+        (tmp_path / "a.txt").write_text("1\n2\n")
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--format", "json"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        stats = json.loads(capsys.readouterr().out)
+        assert exit_code == 0
+        assert stats["total_files"] == 1
+        assert stats["total_lines"] == 2
+
+    def test_main_csv_output(self, tmp_path, capsys):
+        """Test that csv mode prints a header and one row per file."""
+        import sys
+        import csv
+
+        (tmp_path / "a.txt").write_text("1\n2\n")
+        (tmp_path / "b.bin").write_bytes(b"\x00\x01")
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--format", "csv"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        rows = {row["name"]: row for row in csv.DictReader(capsys.readouterr().out.splitlines())}
+        assert exit_code == 0
+        assert rows["a.txt"]["lines"] == "2"
+        assert rows["b.bin"]["binary"] == "True"
+
+    def test_main_profile_json(self, tmp_path, capsys):
+        """Test that --profile adds a profile to the JSON statistics."""
+        import sys
+        import json
+
+        (tmp_path / "a.txt").write_text("1\n2\n")
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--format", "json", "--profile"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        stats = json.loads(capsys.readouterr().out)
+        assert exit_code == 0
+        assert stats["profile"]["counters"]["files_counted"] == 1
+
+    def test_main_profile_table_times_render(self, tmp_path, capsys):
+        """Test that --profile prints a profile table including render time."""
+        import sys
+
+        (tmp_path / "a.txt").write_text("1\n2\n")
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--profile"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        out = capsys.readouterr().out
+        assert exit_code == 0
+        assert "Profile" in out
+        assert "render" in out
+
+    def test_parser_accepts_filters(self):
+        """Test that parser accepts repeated --exclude/--include and --respect-gitignore."""
+        parser = create_parser()
+        args = parser.parse_args([
+            "/some/path", "--exclude", ".git", "--exclude", "*.pyc",
+            "--include", "*.py", "--respect-gitignore",
+        ])
+        assert args.exclude == [".git", "*.pyc"]
+        assert args.include == ["*.py"]
+        assert args.respect_gitignore is True
+
+    def test_parser_accepts_watch(self):
+        """Test that parser accepts --watch and --watch-interval."""
+        parser = create_parser()
+        args = parser.parse_args(["/some/path", "--watch", "--watch-interval", "0.5"])
+        assert args.watch is True
+        assert args.watch_interval == 0.5
+
+    def test_main_watch_rejects_csv(self, tmp_path, capsys):
+        """Test that watch mode refuses csv output."""
+        import sys
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--watch", "--format", "csv"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert exit_code == 1
+        assert "--watch" in capsys.readouterr().err
+
+    def test_parser_line_modes_are_exclusive(self):
+        """Test that --no-lines and --estimate-lines cannot be combined."""
+        parser = create_parser()
+        args = parser.parse_args(["/some/path", "--estimate-lines", "--sample-size", "50"])
+        assert args.estimate_lines is True
+        assert args.sample_size == 50
+
+        with pytest.raises(SystemExit):
+            parser.parse_args(["/some/path", "--no-lines", "--estimate-lines"])
+
+    def test_main_estimate_lines_json(self, tmp_path, capsys):
+        """Test that --estimate-lines reports the estimate and its interval."""
+        import sys
+        import json
+
+        (tmp_path / "a.txt").write_text("1\n2\n")
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--format", "json", "--estimate-lines"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        stats = json.loads(capsys.readouterr().out)
+        assert exit_code == 0
+        assert stats["total_lines"] == 2
+        assert stats["line_count"]["mode"] == "estimate"
+        assert stats["line_count"]["ci_low"] == stats["line_count"]["ci_high"] == 2
+
+    def test_main_estimate_lines_rejects_watch(self, tmp_path, capsys):
+        """Test that watch mode refuses to estimate line counts."""
+        import sys
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--watch", "--estimate-lines", "--format", "json"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert exit_code == 1
+        assert "estimate" in capsys.readouterr().err
+
+    def test_main_duplicates_csv(self, tmp_path, capsys):
+        """Test that --duplicates with csv output lists duplicate files."""
+        import sys
+
+        (tmp_path / "a.txt").write_text("same\n")
+        (tmp_path / "b.txt").write_text("same\n")
+        (tmp_path / "c.txt").write_text("other\n")
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--duplicates", "--format", "csv"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert exit_code == 0
+        assert capsys.readouterr().out.splitlines() == [
+            "group,path,size_bytes,wasted_bytes",
+            "1,a.txt,5,5",
+            "1,b.txt,5,5",
+        ]
+
+    @pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+    def test_main_follow_symlinks(self, tmp_path, capsys):
+        """Test that --follow-symlinks counts files behind directory symlinks."""
+        import sys
+        import json
+
+        (tmp_path / "real").mkdir()
+        (tmp_path / "real" / "x.txt").write_text("1\n")
+        (tmp_path / "scan").mkdir()
+        os.symlink(tmp_path / "real", tmp_path / "scan" / "link")
+        os.symlink(tmp_path / "scan", tmp_path / "scan" / "loop")
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path / "scan"), "--follow-symlinks", "--one-file-system", "--format", "json"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        stats = json.loads(capsys.readouterr().out)
+        assert exit_code == 0
+        assert stats["total_files"] == 1
+        assert stats["links"]["repeated_dirs"] == 1
+
+    def test_main_snapshot_and_diff(self, tmp_path, capsys):
+        """Test writing two snapshots and diffing them as JSON and tables."""
+        import sys
+        import json
+
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "a.log").write_text("1\n")
+        original_argv = sys.argv
+
+        try:
+            sys.argv = ["filestat", str(tmp_path / "data"), "--snapshot", str(tmp_path / "1.fsnap"), "--format", "json"]
+            assert main() == 0
+            assert json.loads(capsys.readouterr().out)["total_files"] == 1
+
+            (tmp_path / "data" / "a.log").write_text("1\n2\n3\n")
+            (tmp_path / "data" / "b.log").write_text("new\n")
+            sys.argv = ["filestat", str(tmp_path / "data"), "--snapshot", str(tmp_path / "2.fsnap.gz")]
+            assert main() == 0
+            capsys.readouterr()
+
+            sys.argv = ["filestat", "diff", str(tmp_path / "1.fsnap"), str(tmp_path / "2.fsnap.gz"), "--format", "json"]
+            assert main() == 0
+            diff = json.loads(capsys.readouterr().out)
+
+            sys.argv = ["filestat", "diff", str(tmp_path / "1.fsnap"), str(tmp_path / "2.fsnap.gz")]
+            assert main() == 0
+            table = capsys.readouterr().out
+        finally:
+            sys.argv = original_argv
+
+        assert diff["added"]["files"] == 1
+        assert diff["changed"]["files"] == 1
+        assert diff["lines_delta"] == 3
+        assert diff["extensions"][".log"]["size_delta"] == 8
+        assert "Largest Growth" in table
+        assert "b.log" in table
+
+    def test_main_max_files(self, tmp_path, capsys):
+        """Test that --max-files prints partial statistics marked incomplete."""
+        import sys
+        import json
+
+        for i in range(5):
+            (tmp_path / f"{i}.txt").write_text("x\n")
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--max-files", "2", "--format", "json"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        stats = json.loads(capsys.readouterr().out)
+        assert exit_code == 0
+        assert stats["total_files"] == 2
+        assert stats["incomplete"] is True
+        assert stats["coverage"]["stopped_by"] == "max_files"
+
+    def test_main_metrics(self, tmp_path, capsys):
+        """Test that --metrics adds content metrics to JSON and CSV output."""
+        import sys
+        import json
+
+        (tmp_path / "a.txt").write_text("one two\nthree\n")
+        original_argv = sys.argv
+
+        try:
+            sys.argv = ["filestat", str(tmp_path), "--metrics", "--metrics-kernel", "python", "--format", "json"]
+            assert main() == 0
+            stats = json.loads(capsys.readouterr().out)
+            sys.argv = ["filestat", str(tmp_path), "--metrics", "--format", "csv"]
+            assert main() == 0
+            rows = capsys.readouterr().out.splitlines()
+            sys.argv = ["filestat", str(tmp_path), "--metrics", "--no-lines"]
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert stats["content_metrics"]["words"] == 3
+        assert stats["content_metrics"]["max_line_length"] == 7
+        assert rows == [
+            "path,name,extension,size_bytes,lines,binary,words,chars,max_line_length",
+            "a.txt,a.txt,.txt,14,2,False,3,14,7",
+        ]
+        assert exit_code == 1
+        assert "--no-lines" in capsys.readouterr().out
+
+    def test_main_limits_reject_snapshot(self, tmp_path, capsys):
+        """Test that limits cannot be combined with snapshots."""
+        import sys
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--time-budget", "5", "--snapshot", str(tmp_path / "s.fsnap"),
+                    "--format", "json"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert exit_code == 1
+        assert "complete scan" in capsys.readouterr().err
+        assert not (tmp_path / "s.fsnap").exists()
+
+    def test_main_server_client(self, tmp_path, capsys):
+        """Test asking a running server, then stopping it with serve --stop."""
+        import sys
+        import json
+        import threading
+        from filestat.server import IndexCache, QueryServer
+
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "a.py").write_text("1\n2\n")
+        socket_path = str(tmp_path / "fs.sock")
+        server = QueryServer(socket_path, IndexCache())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        original_argv = sys.argv
+
+        try:
+            sys.argv = ["filestat", str(tmp_path / "data"), "--server", "--socket", socket_path, "--format", "json"]
+            assert main() == 0
+            stats = json.loads(capsys.readouterr().out)
+
+            sys.argv = ["filestat", str(tmp_path / "data"), "--server", "--socket", socket_path, "--format", "csv"]
+            assert main() == 1
+            rejected = capsys.readouterr().err
+
+            sys.argv = ["filestat", "serve", "--stop", "--socket", socket_path]
+            assert main() == 0
+            thread.join(5)
+        finally:
+            sys.argv = original_argv
+            server.server_close()
+
+        assert stats["total_lines"] == 2
+        assert "--server takes a single path" in rejected
+        assert not thread.is_alive()
+
+    def test_main_server_not_running(self, tmp_path, capsys):
+        """Test that client mode without a server fails with a hint."""
+        import sys
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--server", "--socket", str(tmp_path / "none.sock"), "--format", "json"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert exit_code == 1
+        assert "filestat serve" in capsys.readouterr().err
+
+    def test_main_diff_rejects_non_snapshot(self, tmp_path, capsys):
+        """Test that diffing files that are not snapshots fails cleanly."""
+        import sys
+
+        (tmp_path / "a.txt").write_text("hello\n")
+        original_argv = sys.argv
+        sys.argv = ["filestat", "diff", str(tmp_path / "a.txt"), str(tmp_path / "a.txt"), "--format", "json"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert exit_code == 1
+        assert "Not a filestat snapshot" in capsys.readouterr().err
+
+    def test_main_diff_broken_pipe(self, tmp_path, monkeypatch, capsys):
+        """Test that diff output cut short by the reader exits quietly."""
+        import sys
+        import filestat.export
+        from filestat.analyzer import FileAnalyzer
+
+        (tmp_path / "tree").mkdir()
+        (tmp_path / "tree" / "a.txt").write_text("hello\n")
+        snapshot = str(tmp_path / "a.fsnap")
+        FileAnalyzer(str(tmp_path / "tree")).save_snapshot(snapshot)
+
+        def broken_pipe(*args):
+            raise BrokenPipeError
+
+        monkeypatch.setattr(filestat.export, "write_ndjson", broken_pipe)
+        monkeypatch.setattr(os, "dup2", lambda *args: None)
+        original_argv = sys.argv
+        sys.argv = ["filestat", "diff", snapshot, snapshot, "--format", "ndjson"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert exit_code == 0
+        assert "Error" not in capsys.readouterr().err
+
+    def test_main_snapshot_rejects_csv(self, tmp_path, capsys):
+        """Test that --snapshot refuses per-file output formats."""
+        import sys
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), "--snapshot", str(tmp_path / "s.fsnap"), "--format", "csv"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert exit_code == 1
+        assert not (tmp_path / "s.fsnap").exists()
+
+    def test_main_multiple_roots_json(self, tmp_path, capsys):
+        """Test that several paths give per-root reports and a combined total."""
+        import sys
+        import json
+
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "x.txt").write_text("1\n2\n")
+        (tmp_path / "a" / "nested").mkdir()
+        (tmp_path / "b").mkdir()
+        (tmp_path / "b" / "y.txt").write_text("1\n")
+        (tmp_path / "dirs.txt").write_text(f"# roots\n{tmp_path / 'b'}\n\n")
+
+        original_argv = sys.argv
+        sys.argv = [
+            "filestat", str(tmp_path / "a"), str(tmp_path / "a" / "nested"),
+            "--from-file", str(tmp_path / "dirs.txt"), "--format", "json",
+        ]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        stats = json.loads(capsys.readouterr().out)
+        assert exit_code == 0
+        assert [root["total_lines"] for root in stats["roots"]] == [2, 1]
+        assert stats["total"]["total_lines"] == 3
+        assert stats["total"]["total_files"] == 2
+        assert list(stats["collapsed"]) == [str(tmp_path / "a" / "nested")]
+
+    def test_main_multiple_roots_table(self, tmp_path, capsys):
+        """Test that the table output lists every root."""
+        import sys
+
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path / "a"), str(tmp_path / "b")]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        out = capsys.readouterr().out
+        assert exit_code == 0
+        assert "Roots" in out
+
+    def test_main_multiple_roots_reject_watch(self, tmp_path, capsys):
+        """Test that watch mode needs a single path."""
+        import sys
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", str(tmp_path), str(tmp_path), "--watch", "--format", "json"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        assert exit_code == 1
+        assert "single path" in capsys.readouterr().err
+
+    def test_machine_format_errors_go_to_stderr(self, capsys):
+        """Test that errors in machine formats are written to stderr."""
+        import sys
+
+        original_argv = sys.argv
+        sys.argv = ["filestat", "/nonexistent/path/xyz", "--format", "json"]
+
+        try:
+            exit_code = main()
+        finally:
+            sys.argv = original_argv
+
+        captured = capsys.readouterr()
+        assert exit_code == 1
+        assert captured.out == ""
+        assert "does not exist" in captured.err
+
+
+class TestStartup:
+    """Guards against eager imports that slow down CLI startup."""
+
+    def run_python(self, code):
+        """Run code in a fresh interpreter and return its stdout."""
+        import subprocess
+        import sys
+
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=str(Path(__file__).resolve().parent.parent),
+        )
+        return result.stdout.strip()
+
+    def test_importing_cli_does_not_import_rich(self):
+        """Test that importing the CLI leaves Rich and other heavy modules unloaded."""
+        loaded = self.run_python(
+            "import sys, filestat.cli; "
+            "print(sorted(m for m in ('rich', 'sqlite3', 'concurrent.futures') if m in sys.modules))"
+        )
+        assert loaded == "[]"
+
+    @pytest.mark.parametrize("output_format", ["json", "csv", "ndjson"])
+    def test_machine_formats_do_not_import_rich(self, temp_file, output_format):
+        """Test that machine-readable output never loads Rich."""
+        loaded = self.run_python(
+            "import sys, io, contextlib; from filestat.cli import main; "
+            f"sys.argv = ['filestat', {temp_file!r}, '--format', {output_format!r}]; "
+            "out = io.StringIO(); "
+            "contextlib.redirect_stdout(out).__enter__(); main(); "
+            "sys.__stdout__.write(str('rich' in sys.modules))"
+        )
+        assert loaded == "False"
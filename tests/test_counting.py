@@ -0,0 +1,132 @@
+"""Tests for the counting module."""
+
+import io
+import os
+import pytest
+from filestat.counting import (
+    BINARY,
+    LineTally,
+    count_lines,
+    count_lines_in_stream,
+    count_lines_large,
+    count_lines_pread,
+)
+
+
+def text_mode_count(data: bytes) -> int:
+    """Count lines the way the analyzer used to (decoded text mode)."""
+    stream = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="ignore")
+    return sum(1 for _ in stream)
+
+
+SAMPLES = [
+    b"",
+    b"\n",
+    b"one line",
+    b"line 1\nline 2\nline 3\n",
+    b"no trailing newline\nlast",
+    b"windows\r\nline endings\r\n",
+    b"old mac\rline endings\r",
+    b"mixed\r\n\r\n\n\r\rend",
+    b"\xff\xfe invalid utf-8 \xe2\r\nstill counted\n",
+    b"\x00\x01\x02\x03",
+]
+
+
+class TestCountLines:
+    """Test suite for the byte-level line counter."""
+
+    @pytest.mark.parametrize("data", SAMPLES)
+    def test_matches_text_mode(self, data):
+        """Test counts match decoded text-mode iteration."""
+        assert count_lines_in_stream(io.BytesIO(data)) == text_mode_count(data)
+
+    @pytest.mark.parametrize("data,expected,decoded", [
+        (b"\xff", 1, 0),
+        (b"a\r\xff\nb", 3, 2),
+    ])
+    def test_invalid_utf8_is_not_dropped(self, data, expected, decoded):
+        """Test that undecodable bytes count, unlike text mode with errors="ignore"."""
+        assert text_mode_count(data) == decoded
+        assert count_lines_in_stream(io.BytesIO(data)) == expected
+
+    @pytest.mark.parametrize("buffer_size", [1, 2, 3, 7, 64])
+    def test_small_buffers(self, buffer_size):
+        """Test chunk boundaries, including a \\r\\n split across reads."""
+        data = b"a\r\nb\rc\nd\r\n\r\ne"
+        expected = text_mode_count(data)
+        assert count_lines_in_stream(io.BytesIO(data), buffer_size) == expected
+
+    def test_count_lines_file(self, tmp_path):
+        """Test counting lines of a file on disk."""
+        path = tmp_path / "sample.txt"
+        path.write_bytes(b"alpha\nbeta\ngamma")
+
+        assert count_lines(str(path)) == 3
+
+    def test_count_lines_missing_file(self, tmp_path):
+        """Test that a missing file raises OSError."""
+        with pytest.raises(OSError):
+            count_lines(str(tmp_path / "missing.txt"))
+
+    def test_sniff_stops_on_binary(self, tmp_path):
+        """Test that sniffing returns BINARY for binary content."""
+        path = tmp_path / "blob"
+        path.write_bytes(b"\x7fELF" + b"\n" * 100)
+
+        assert count_lines(str(path), sniff=True) == BINARY
+        assert count_lines(str(path)) == 100
+
+    def test_sniff_counts_text(self, tmp_path):
+        """Test that sniffing does not change counts for text."""
+        path = tmp_path / "notes.txt"
+        path.write_bytes(b"a\nb\nc")
+
+        assert count_lines(str(path), sniff=True) == 3
+
+
+class TestLineTally:
+    """Test suite for mergeable line tallies."""
+
+    @pytest.mark.parametrize("data", SAMPLES)
+    def test_split_and_merge(self, data):
+        """Test that merging tallies of every split point gives the same count."""
+        expected = text_mode_count(data)
+        for split in range(len(data) + 1):
+            left, right = LineTally(), LineTally()
+            left.feed(data[:split], split)
+            right.feed(data[split:], len(data) - split)
+            left.merge(right)
+
+            assert left.lines == expected
+
+
+class TestLargeFileCounting:
+    """Test suite for the os.pread counting path."""
+
+    @pytest.fixture
+    def big_file(self, tmp_path):
+        """Create a file with mixed line endings spanning several buffers."""
+        data = (b"alpha\r\n" + b"beta\n" + b"gamma\r" + b"x" * 97) * 5000 + b"tail"
+        path = tmp_path / "big.log"
+        path.write_bytes(data)
+        return str(path), text_mode_count(data)
+
+    @pytest.mark.skipif(not hasattr(os, "pread"), reason="os.pread not available")
+    @pytest.mark.parametrize("workers", [1, 3, 8])
+    def test_pread_matches(self, big_file, workers):
+        """Test parallel ranged reads with ranges splitting \\r\\n pairs."""
+        path, expected = big_file
+        assert count_lines_pread(path, workers=workers, buffer_size=1000) == expected
+
+    def test_large_matches(self, big_file):
+        """Test the combined large-file entry point."""
+        path, expected = big_file
+        assert count_lines_large(path) == expected
+
+    def test_empty_file(self, tmp_path):
+        """Test that an empty file counts as 0 lines."""
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+
+        assert count_lines_large(str(path)) == 0
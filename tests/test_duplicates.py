@@ -0,0 +1,93 @@
+"""Tests for the duplicates module."""
+
+import os
+import pytest
+from pathlib import Path
+from filestat.duplicates import PARTIAL_BLOCK, DuplicateFinder, full_digest, partial_digest
+
+
+def _finder(root):
+    """Build a finder from every file below root."""
+    finder = DuplicateFinder()
+    for dirpath, _dirs, names in os.walk(root):
+        for name in sorted(names):
+            path = os.path.join(dirpath, name)
+            finder.add(path, os.path.relpath(path, root), os.stat(path))
+    return finder
+
+
+class TestDigests:
+    """Test suite for partial and full hashing."""
+
+    def test_small_file_partial_digest_is_full(self, tmp_path):
+        """Test that files of up to two blocks are hashed whole."""
+        path = tmp_path / "a"
+        path.write_bytes(b"x" * 100)
+        assert partial_digest(str(path), 100) == full_digest(str(path))
+
+    def test_partial_digest_ignores_middle(self, tmp_path):
+        """Test that only the first and last blocks are hashed."""
+        size = 4 * PARTIAL_BLOCK
+        a, b = tmp_path / "a", tmp_path / "b"
+        a.write_bytes(b"a" * size)
+        b.write_bytes(b"a" * PARTIAL_BLOCK + b"b" * 2 * PARTIAL_BLOCK + b"a" * PARTIAL_BLOCK)
+
+        assert partial_digest(str(a), size) == partial_digest(str(b), size)
+        assert full_digest(str(a)) != full_digest(str(b))
+
+    def test_unreadable_file(self, tmp_path):
+        """Test that missing files hash to None."""
+        assert partial_digest(str(tmp_path / "missing"), 10) is None
+        assert full_digest(str(tmp_path / "missing")) is None
+
+
+class TestDuplicateFinder:
+    """Test suite for DuplicateFinder."""
+
+    def test_groups_identical_files(self, tmp_path):
+        """Test that identical files form one group and unique sizes are not read."""
+        Path(tmp_path, "a.txt").write_text("same\n")
+        Path(tmp_path, "sub").mkdir()
+        Path(tmp_path, "sub", "b.txt").write_text("same\n")
+        Path(tmp_path, "c.txt").write_text("diff\n")
+        Path(tmp_path, "unique.txt").write_text("only one of this size\n")
+
+        result = _finder(tmp_path).find()
+
+        assert result["groups"] == [{
+            "size_bytes": 5, "files": 2, "wasted_bytes": 5,
+            "paths": ["a.txt", os.path.join("sub", "b.txt")],
+        }]
+        assert result["duplicate_files"] == 1
+        assert result["hashing"]["candidates"] == 3
+        assert result["hashing"]["full_hashed"] == 0
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_large_files_need_full_hash(self, tmp_path, executor, monkeypatch):
+        """Test that same-size files with equal ends are told apart by a full hash."""
+        import filestat.duplicates
+
+        # One file per batch, so the worker pool is used
+        monkeypatch.setattr(filestat.duplicates, "HASH_BATCH", 1)
+        size = 4 * PARTIAL_BLOCK
+        Path(tmp_path, "a").write_bytes(b"a" * size)
+        Path(tmp_path, "b").write_bytes(b"a" * size)
+        Path(tmp_path, "c").write_bytes(b"a" * PARTIAL_BLOCK + b"c" * 2 * PARTIAL_BLOCK + b"a" * PARTIAL_BLOCK)
+
+        result = _finder(tmp_path).find(jobs=2, executor=executor)
+
+        assert [group["paths"] for group in result["groups"]] == [["a", "b"]]
+        assert result["wasted_bytes"] == size
+        assert result["hashing"]["full_hashed"] == 3
+
+    def test_hard_links_and_empty_files_are_not_duplicates(self, tmp_path):
+        """Test that hard links and empty files waste no space."""
+        Path(tmp_path, "a").write_text("data\n")
+        os.link(tmp_path / "a", tmp_path / "b")
+        Path(tmp_path, "e1").touch()
+        Path(tmp_path, "e2").touch()
+
+        result = _finder(tmp_path).find()
+
+        assert result["groups"] == []
+        assert result["hashing"]["candidates"] == 0
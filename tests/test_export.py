@@ -0,0 +1,75 @@
+"""Tests for the export module."""
+
+import json
+from io import StringIO
+from filestat.export import (
+    CSV_FIELDS, DUPLICATE_CSV_FIELDS, write_csv, write_duplicates_csv, write_json, write_ndjson,
+)
+
+
+class TestNdjson:
+    """Test suite for NDJSON output."""
+
+    def test_one_line_per_event(self):
+        """Test that every event is written as one JSON object per line."""
+        stream = StringIO()
+        events = [
+            ("file", {"path": "a.txt", "lines": 3}),
+            ("progress", {"total_files": 1}),
+            ("summary", {"total_files": 1}),
+        ]
+
+        write_ndjson(events, stream)
+        lines = stream.getvalue().splitlines()
+
+        assert len(lines) == 3
+        assert json.loads(lines[0]) == {"type": "file", "path": "a.txt", "lines": 3}
+        assert json.loads(lines[2])["type"] == "summary"
+
+    def test_empty_stream(self):
+        """Test that no events produce no output."""
+        stream = StringIO()
+        write_ndjson([], stream)
+
+        assert stream.getvalue() == ""
+
+
+class TestJsonAndCsv:
+    """Test suite for JSON and CSV output."""
+
+    def test_write_json(self):
+        """Test that statistics are written as one JSON document."""
+        stream = StringIO()
+        write_json({"total_files": 2, "file_types": {".py": 2}}, stream)
+
+        assert json.loads(stream.getvalue()) == {"total_files": 2, "file_types": {".py": 2}}
+
+    def test_write_csv(self):
+        """Test that records are written with a fixed header."""
+        stream = StringIO()
+        records = [
+            {"path": "a.py", "name": "a.py", "extension": ".py", "size_bytes": 10,
+             "lines": 1, "binary": False, "mtime_ns": 5},
+        ]
+
+        write_csv(records, stream)
+
+        assert stream.getvalue().splitlines() == [
+            ",".join(CSV_FIELDS),
+            "a.py,a.py,.py,10,1,False",
+        ]
+
+    def test_write_duplicates_csv(self):
+        """Test that duplicate groups are written one row per file."""
+        stream = StringIO()
+        duplicates = {"groups": [
+            {"size_bytes": 4, "files": 2, "wasted_bytes": 4, "paths": ["a", "b"]},
+        ]}
+
+        write_duplicates_csv(duplicates, stream)
+
+        assert stream.getvalue().splitlines() == [
+            ",".join(DUPLICATE_CSV_FIELDS),
+            "1,a,4,4",
+            "1,b,4,4",
+        ]
@@ -123,3 +123,168 @@ class TestFormatter:
             success = False
         
         assert success is True
+
+    def test_format_output_with_cache_stats(self, sample_directory_stats):
+        """Test format_directory_output with line-count cache statistics."""
+        sample_directory_stats["cache"] = {
+            "path": "cache.db", "hits": 8, "misses": 2, "evicted": 1, "hit_rate": 0.8
+        }
+
+        try:
+            format_output(sample_directory_stats)
+            success = True
+        except Exception:
+            success = False
+
+        assert success is True
+
+    def test_format_output_with_directory_tree(self, sample_directory_stats):
+        """Test format_directory_output with a rollup tree."""
+        sample_directory_stats["directory_tree"] = {
+            "path": ".", "name": ".", "files": 10, "size_bytes": 10240, "lines": 500,
+            "omitted_dirs": 1,
+            "children": [
+                {"path": "src", "name": "src", "files": 6, "size_bytes": 8000,
+                 "lines": 400, "children": []},
+            ],
+        }
+
+        try:
+            format_output(sample_directory_stats)
+            success = True
+        except Exception:
+            success = False
+
+        assert success is True
+
+    def test_format_output_with_profile(self, sample_directory_stats):
+        """Test format_directory_output with profiling results."""
+        sample_directory_stats["profile"] = {
+            "wall_seconds": 0.5,
+            "phases": {"read": {"seconds": 0.4, "share": 0.8}},
+            "counters": {"stat_calls": 10},
+            "slowest_files": [{"path": "src/a.py", "seconds": 0.1, "size_bytes": 2048}],
+            "files_per_s": 20.0,
+            "bytes_per_s": 20480.0,
+        }
+
+        try:
+            format_output(sample_directory_stats)
+            success = True
+        except Exception:
+            success = False
+
+        assert success is True
+
+    def test_format_output_with_line_estimate(self, sample_directory_stats):
+        """Test format_directory_output with an estimated line total."""
+        sample_directory_stats["line_count"] = {
+            "mode": "estimate", "estimate": 500, "ci_low": 450, "ci_high": 550,
+            "confidence": 0.95, "sampled_files": 4, "sampled_bytes": 4096,
+            "strata": {".py": {"files": 10, "sampled": 4, "lines": 500}},
+        }
+
+        try:
+            format_output(sample_directory_stats)
+            success = True
+        except Exception:
+            success = False
+
+        assert success is True
+
+    def test_format_output_with_links(self, sample_directory_stats):
+        """Test format_directory_output with physical size and link counts."""
+        sample_directory_stats["physical_size_bytes"] = 8192
+        sample_directory_stats["links"] = {
+            "skipped_files": 2, "skipped_bytes": 100, "repeated_dirs": 1, "mount_points": 0,
+        }
+
+        try:
+            format_output(sample_directory_stats)
+            success = True
+        except Exception:
+            success = False
+
+        assert success is True
+
+    def test_format_output_partial(self, sample_directory_stats, capsys):
+        """Test that stopped scans are flagged with their coverage."""
+        sample_directory_stats["incomplete"] = True
+        sample_directory_stats["coverage"] = {
+            "stopped_by": "time_budget", "dirs_visited": 3, "dirs_pending": 9,
+            "dirs_fraction": 0.25, "elapsed_seconds": 30.0,
+        }
+
+        format_output(sample_directory_stats)
+
+        output = capsys.readouterr().out
+        assert "Partial results" in output
+        assert "time budget used up" in output
+        assert "3 of 12 found (25%)" in output
+
+    def test_format_output_content_metrics(self, sample_directory_stats, capsys):
+        """Test that content metrics are shown with the longest line's file."""
+        sample_directory_stats["content_metrics"] = {
+            "lines": 500, "words": 1200, "chars": 9000, "bytes": 9100,
+            "max_line_length": 140, "max_line_path": "src/long.py",
+        }
+
+        format_output(sample_directory_stats)
+
+        output = capsys.readouterr().out
+        assert "Words" in output
+        assert "1200" in output
+        assert "140 (src/long.py)" in output
+
+    def test_format_output_with_distributions(self, sample_directory_stats):
+        """Test format_directory_output with size and line distributions."""
+        from filestat.histogram import LogHistogram, distribution_stats
+
+        sizes, lines = {".py": LogHistogram(), ".bin": LogHistogram()}, {".py": LogHistogram()}
+        for value in (0, 10, 5000, 2 ** 40):
+            sizes[".py"].add(value)
+            lines[".py"].add(value % 100)
+        sizes[".bin"].add(4096)
+        sample_directory_stats["distributions"] = distribution_stats(sizes, lines)
+
+        try:
+            format_output(sample_directory_stats)
+            success = True
+        except Exception:
+            success = False
+
+        assert success is True
+
+    def test_format_diff_output(self, tmp_path, capsys):
+        """Test format_diff_output with and without line deltas."""
+        from filestat.formatter import format_diff_output
+        from filestat.snapshot import SnapshotWriter, diff_snapshots
+
+        for name, lines in (("old.fsnap", "count"), ("new.fsnap", "count"), ("none.fsnap", "none")):
+            with SnapshotWriter(str(tmp_path / name), {"lines": lines}) as writer:
+                writer.add("a.txt", 10 if name == "old.fsnap" else 20, 1, 1)
+                writer.add(name, 5, 1, 1)
+
+        format_diff_output(diff_snapshots(str(tmp_path / "old.fsnap"), str(tmp_path / "new.fsnap")))
+        format_diff_output(diff_snapshots(str(tmp_path / "old.fsnap"), str(tmp_path / "none.fsnap")))
+        output = capsys.readouterr().out
+
+        assert "Largest Growth" in output
+        assert "+10" in output
+
+    def test_format_output_with_duplicates(self, sample_directory_stats):
+        """Test format_directory_output with duplicate groups."""
+        sample_directory_stats["duplicates"] = {
+            "groups": [{"size_bytes": 2048, "files": 2, "wasted_bytes": 2048,
+                        "paths": ["a.bin", "b.bin"]}],
+            "group_count": 1, "duplicate_files": 1, "wasted_bytes": 2048,
+            "hashing": {"candidates": 2, "partial_hashed": 2, "full_hashed": 0, "bytes_read": 4096},
+        }
+
+        try:
+            format_output(sample_directory_stats)
+            success = True
+        except Exception:
+            success = False
+
+        assert success is True
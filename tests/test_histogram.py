@@ -0,0 +1,130 @@
+"""Tests for the histogram module."""
+
+import math
+import random
+import pytest
+from filestat.histogram import SUB_BITS, LogHistogram, distribution_stats, merged
+
+
+def _exact_quantile(values, q):
+    """Nearest-rank quantile of a list of values."""
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(q * len(ordered))) - 1]
+
+
+class TestLogHistogram:
+    """Test suite for LogHistogram."""
+
+    def test_empty(self):
+        """Test that an empty histogram reports zeros."""
+        summary = LogHistogram().to_dict(histogram=True)
+
+        assert summary == {
+            "count": 0, "total": 0, "mean": 0, "min": 0, "max": 0,
+            "p50": 0, "p90": 0, "p99": 0, "histogram": [],
+        }
+
+    def test_small_values_exact(self):
+        """Test that values below 2**(SUB_BITS + 1) are counted exactly."""
+        histogram = LogHistogram()
+        for value in range(1, 101):
+            histogram.add(value)
+
+        assert histogram.quantile(0.5) == 50
+        assert histogram.quantile(0.9) == 90
+        assert histogram.quantile(0.99) == 99
+        assert histogram.to_dict()["min"] == 1
+        assert histogram.to_dict()["mean"] == 50.5
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_relative_error_bound(self, seed):
+        """Test that quantiles of skewed data are within the stated error."""
+        rng = random.Random(seed)
+        values = [int(rng.lognormvariate(9, 3)) for _ in range(20000)]
+        histogram = LogHistogram()
+        for value in values:
+            histogram.add(value)
+
+        for q in (0.01, 0.25, 0.5, 0.9, 0.99, 1.0):
+            exact = _exact_quantile(values, q)
+            assert abs(histogram.quantile(q) - exact) <= exact / 2 ** (SUB_BITS + 1) + 1
+        summary = histogram.to_dict()
+        assert summary["total"] == sum(values)
+        assert summary["max"] >= max(values) >= summary["max"] * (1 - 2 ** -SUB_BITS)
+
+    def test_bucket_count_bounded(self):
+        """Test that memory depends on the range of values, not their number."""
+        histogram = LogHistogram()
+        for value in range(0, 10 ** 7, 7):
+            histogram.add(value)
+
+        assert histogram.count == len(range(0, 10 ** 7, 7))
+        assert len(histogram.counts) < 2 ** (SUB_BITS + 1) + 24 * 2 ** SUB_BITS
+
+    def test_merge_matches_single_histogram(self):
+        """Test that merging equals feeding every value into one histogram."""
+        rng = random.Random(7)
+        values = [rng.randrange(10 ** 6) for _ in range(3000)]
+        single = LogHistogram()
+        parts = [LogHistogram() for _ in range(3)]
+        for i, value in enumerate(values):
+            single.add(value)
+            parts[i % 3].add(value)
+
+        combined = merged(parts)
+
+        assert combined.counts == single.counts
+        assert combined.to_dict(histogram=True) == single.to_dict(histogram=True)
+
+    def test_power_of_two_bins(self):
+        """Test that bins cover powers of two and keep zeros apart."""
+        histogram = LogHistogram()
+        for value in [0, 0, 1, 3, 1000, 1023, 1024]:
+            histogram.add(value)
+
+        assert histogram.power_of_two_bins() == [
+            {"low": 0, "high": 0, "count": 2},
+            {"low": 1, "high": 1, "count": 1},
+            {"low": 2, "high": 3, "count": 1},
+            {"low": 512, "high": 1023, "count": 2},
+            {"low": 1024, "high": 2047, "count": 1},
+        ]
+
+    @pytest.mark.parametrize("q", [-0.1, 1.5])
+    def test_rejects_invalid_quantile(self, q):
+        """Test that quantiles outside [0, 1] raise ValueError."""
+        with pytest.raises(ValueError):
+            LogHistogram().quantile(q)
+
+
+class TestDistributionStats:
+    """Test suite for distribution_stats."""
+
+    def test_overall_and_per_extension(self):
+        """Test overall summaries and extensions ordered by total bytes."""
+        sizes = {".py": LogHistogram(), ".bin": LogHistogram()}
+        lines = {".py": LogHistogram()}
+        for size in (10, 20, 30):
+            sizes[".py"].add(size)
+            lines[".py"].add(size // 10)
+        sizes[".bin"].add(1000)
+
+        result = distribution_stats(sizes, lines)
+
+        assert result["size_bytes"]["count"] == 4
+        assert result["size_bytes"]["total"] == 1060
+        assert result["lines"]["p50"] == 2
+        assert list(result["extensions"]) == [".bin", ".py"]
+        assert "lines" not in result["extensions"][".bin"]
+        assert result["extensions"][".py"]["lines"]["max"] == 3
+        assert "histogram" not in result["extensions"][".py"]["size_bytes"]
+
+    def test_without_lines(self):
+        """Test that line summaries are left out when lines were not counted."""
+        sizes = {".txt": LogHistogram()}
+        sizes[".txt"].add(5)
+
+        result = distribution_stats(sizes)
+
+        assert "lines" not in result
+        assert "lines" not in result["extensions"][".txt"]
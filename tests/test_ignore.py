@@ -0,0 +1,91 @@
+"""Tests for the ignore module."""
+
+import pytest
+from pathlib import Path
+from filestat.ignore import PathFilter, RuleSet
+
+
+def matches(patterns, path, is_dir=False):
+    """Match a path against a rule set built from patterns."""
+    return RuleSet.from_lines(patterns).match(path, is_dir)
+
+
+class TestRuleSet:
+    """Test suite for gitignore-style rule sets."""
+
+    @pytest.mark.parametrize("pattern,path,expected", [
+        ("*.log", "a.log", True),
+        ("*.log", "deep/dir/a.log", True),
+        ("*.log", "a.log.txt", None),
+        ("build", "src/build", True),
+        ("/build", "build", True),
+        ("/build", "src/build", None),
+        ("docs/*.md", "docs/a.md", True),
+        ("docs/*.md", "docs/sub/a.md", None),
+        ("docs/**/*.md", "docs/sub/deeper/a.md", True),
+        ("docs/**/*.md", "docs/a.md", True),
+        ("**/cache", "x/y/cache", True),
+        ("out/**", "out/a/b.txt", True),
+        ("file?.txt", "file1.txt", True),
+        ("file?.txt", "file10.txt", None),
+        ("*.py[cod]", "m.pyc", True),
+        ("[!a]*.txt", "b.txt", True),
+        ("[!a]*.txt", "a.txt", None),
+        ("\\#hash", "#hash", True),
+    ])
+    def test_patterns(self, pattern, path, expected):
+        """Test glob semantics against gitignore behavior."""
+        assert matches([pattern], path) is expected
+
+    def test_dir_only_pattern(self):
+        """Test that a trailing slash only matches directories."""
+        assert matches(["cache/"], "cache", is_dir=True) is True
+        assert matches(["cache/"], "cache", is_dir=False) is None
+
+    def test_negation_last_rule_wins(self):
+        """Test that a later negated rule re-includes a path."""
+        rules = ["*.log", "!keep.log"]
+        assert matches(rules, "drop.log") is True
+        assert matches(rules, "keep.log") is False
+        assert matches(rules + ["keep.log"], "keep.log") is True
+
+    def test_blank_lines_and_comments(self):
+        """Test that blank lines and comments are ignored."""
+        assert not RuleSet.from_lines(["", "# comment", "   "])
+
+
+class TestPathFilter:
+    """Test suite for PathFilter and DirFilter."""
+
+    def test_inactive_filter(self):
+        """Test that an empty filter is falsy."""
+        assert not PathFilter()
+        assert PathFilter(gitignore=True)
+
+    def test_exclude_and_include(self, tmp_path):
+        """Test that excludes apply to both kinds and includes only to files."""
+        root = PathFilter(exclude=["node_modules"], include=["*.py"]).root(str(tmp_path))
+
+        assert root.excludes("node_modules", True)
+        assert not root.excludes("src", True)
+        assert root.excludes("README.md", False)
+        assert not root.excludes("app.py", False)
+        assert root.descend(str(tmp_path / "src"), "src").excludes("node_modules", True)
+
+    def test_nested_gitignore(self, tmp_path):
+        """Test that deeper .gitignore files take precedence and are relative."""
+        Path(tmp_path, ".gitignore").write_text("*.log\n/top.txt\n")
+        Path(tmp_path, "sub").mkdir()
+        Path(tmp_path, "sub", ".gitignore").write_text("!keep.log\n/local.txt\n")
+
+        root = PathFilter(gitignore=True).root(str(tmp_path))
+        sub = root.descend(str(tmp_path / "sub"), "sub")
+
+        assert root.excludes(".git", True)
+        assert root.excludes("a.log", False)
+        assert root.excludes("top.txt", False)
+        assert not sub.excludes("top.txt", False)
+        assert sub.excludes("a.log", False)
+        assert not sub.excludes("keep.log", False)
+        assert sub.excludes("local.txt", False)
+        assert not root.excludes("local.txt", False)
@@ -0,0 +1,115 @@
+"""Tests for the index module."""
+
+import os
+import pytest
+from pathlib import Path
+from filestat.analyzer import FileAnalyzer
+from filestat.index import FileIndex
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a directory with a mix of files."""
+    root = tmp_path / "tree"
+    Path(root, "logs").mkdir(parents=True)
+    Path(root, "a.py").write_text("import os\n" * 10)
+    Path(root, "b.txt").write_text("text\n" * 3)
+    Path(root, "logs", "app.log").write_text("entry\n" * 200)
+    Path(root, "logs", "old.log").write_text("entry\n" * 5)
+    Path(root, "logs", "image.png").write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(500))
+    return root
+
+
+@pytest.fixture
+def index(tree):
+    """Build an index of the tree."""
+    return FileAnalyzer(str(tree)).build_index()
+
+
+class TestFileIndex:
+    """Test suite for FileIndex."""
+
+    def test_one_row_per_file(self, index):
+        """Test that every file becomes a row with interned directories."""
+        assert len(index) == 5
+        assert sorted(index.dirs) == ["", "logs" + os.sep]
+
+    def test_stats_view_matches_analyzer(self, tree, index):
+        """Test that the full stats view equals analyze_directory."""
+        assert index.to_stats() == FileAnalyzer(str(tree)).analyze_directory()
+        assert index.to_stats(top=2) == FileAnalyzer(str(tree), top=2).analyze_directory()
+
+    def test_select_filters(self, index):
+        """Test extension, size and line filters."""
+        logs = index.select(extensions=[".log"])
+        big_logs = index.select(extensions=[".log"], min_lines=100)
+
+        assert {index.names[row] for row in logs} == {"app.log", "old.log"}
+        assert [index.names[row] for row in big_logs] == ["app.log"]
+        assert index.select(extensions=[".missing"]) == []
+        assert len(index.select(min_size=400)) == 2
+
+    def test_top_by_lines(self, index):
+        """Test top-K queries."""
+        top = index.top(2, by="lines")
+
+        assert [record["name"] for record in top] == ["app.log", "a.py"]
+        assert index.top(1)[0]["name"] == "app.log"
+
+    def test_top_invalid_column(self, index):
+        """Test that ranking by an unknown column raises ValueError."""
+        with pytest.raises(ValueError):
+            index.top(1, by="mtime")
+
+    def test_group_by_extension(self, index):
+        """Test per-extension summaries."""
+        groups = index.group_by_extension()
+
+        assert groups[".log"] == {"files": 2, "size_bytes": 1230, "lines": 205}
+        assert groups[".png"]["lines"] == 0
+
+    def test_filtered_stats_view(self, index):
+        """Test statistics computed over selected rows."""
+        stats = index.to_stats(rows=index.select(extensions=[".log"]))
+
+        assert stats["total_files"] == 2
+        assert stats["total_lines"] == 205
+        assert stats["file_types"] == {".log": 2}
+
+    def test_save_load_round_trip(self, index, tmp_path):
+        """Test that a saved index loads back identically."""
+        path = str(tmp_path / "tree.fsidx")
+        index.save(path)
+        loaded = FileIndex.load(path)
+
+        assert len(loaded) == len(index)
+        assert [loaded.record(i) for i in range(len(loaded))] == \
+            [index.record(i) for i in range(len(index))]
+        assert loaded.to_stats() == index.to_stats()
+        assert loaded.select(extensions=[".log"]) == index.select(extensions=[".log"])
+
+    def test_load_rejects_other_files(self, tmp_path):
+        """Test that loading a non-index file raises ValueError."""
+        path = tmp_path / "bogus"
+        path.write_bytes(b"not an index at all, just some bytes here")
+
+        with pytest.raises(ValueError):
+            FileIndex.load(str(path))
+
+    def test_load_rejects_truncated_files(self, index, tmp_path):
+        """Test that an index cut short anywhere raises ValueError."""
+        path = tmp_path / "tree.fsidx"
+        index.save(str(path))
+        data = path.read_bytes()
+
+        for size in (len(data) // 2, len(data) - 1, 60):
+            path.write_bytes(data[:size])
+            with pytest.raises(ValueError, match="Truncated|Corrupt|Not a filestat"):
+                FileIndex.load(str(path))
+
+    def test_empty_index_round_trip(self, tmp_path):
+        """Test saving and loading an empty index."""
+        path = str(tmp_path / "empty.fsidx")
+        FileIndex().save(path)
+
+        assert len(FileIndex.load(path)) == 0
@@ -0,0 +1,128 @@
+"""Tests for the metrics module."""
+
+import io
+import pickle
+import random
+import pytest
+from filestat.counting import BINARY
+from filestat.metrics import ContentMetrics, ContentTally, content_metrics, numpy_available, resolve_kernel
+
+
+KERNELS = [
+    "python",
+    pytest.param("numpy", marks=pytest.mark.skipif(not numpy_available(), reason="needs NumPy")),
+]
+
+# Pieces of random test data: ASCII, every kind of whitespace and line
+# ending, UTF-8 sequences, stray continuation bytes and invalid bytes
+PIECES = [
+    b"a", b"word", b" ", b"\t", b"\n", b"\r", b"\r\n", b"\v", b"\f", b"\x1c",
+    b"\xc3\xa9", b"\xe2\x82\xac", b"\xf0\x9f\x98\x80", b"\x80", b"\xff",
+]
+
+
+def reference(data: bytes) -> dict:
+    """Compute the metrics of ``data`` the slow, obvious way."""
+    def chars(segment: bytes) -> int:
+        return sum(1 for b in segment if not 0x80 <= b <= 0xBF)
+
+    stream = io.TextIOWrapper(io.BytesIO(data), encoding="latin-1", newline=None)
+    return {
+        "lines": len(stream.readlines()),
+        "words": len(data.split()),
+        "chars": chars(data),
+        "bytes": len(data),
+        "max_line_length": max(map(chars, data.splitlines()), default=0),
+    }
+
+
+def tally(data: bytes, kernel: str, splits: list) -> dict:
+    """Feed ``data`` to a tally in pieces ending at ``splits``."""
+    content = ContentTally(kernel)
+    start = 0
+    for end in splits + [len(data)]:
+        content.feed(data[start:end])
+        start = end
+    return content.metrics().to_dict()
+
+
+class TestContentTally:
+    """Test suite for ContentTally."""
+
+    @pytest.mark.parametrize("kernel", KERNELS)
+    @pytest.mark.parametrize("data", [
+        b"",
+        b"hello world\n",
+        b"  leading and trailing  ",
+        b"one\r\ntwo\rthree\n\nfour",
+        b"caf\xc3\xa9 \xe2\x82\xac\n\xf0\x9f\x98\x80",
+        b"\t\v\f",
+        b"\xff\xfe\x80 invalid",
+    ])
+    def test_matches_reference(self, kernel, data):
+        """Test known samples against the reference."""
+        assert tally(data, kernel, []) == reference(data)
+
+    @pytest.mark.parametrize("kernel", KERNELS)
+    def test_random_splits(self, kernel):
+        """Test random data fed in random pieces, words and lines spanning them."""
+        rng = random.Random(0)
+        for _ in range(500):
+            data = b"".join(rng.choice(PIECES) for _ in range(rng.randint(0, 80)))
+            splits = sorted(rng.sample(range(len(data) + 1), min(len(data), rng.randint(0, 6))))
+
+            assert tally(data, kernel, splits) == reference(data), data
+
+    @pytest.mark.skipif(not numpy_available(), reason="needs NumPy")
+    def test_kernels_agree_on_large_buffers(self):
+        """Test that both kernels give identical results on realistic text."""
+        rng = random.Random(1)
+        words = [b"def", b"return", b"    ", b"caf\xc3\xa9", b"\n", b"\r\n", b" ", b"\t", b"x" * 300]
+        data = b" ".join(rng.choice(words) for _ in range(100000))
+        splits = list(range(65536, len(data), 65536))
+
+        assert tally(data, "numpy", splits) == tally(data, "python", splits)
+
+    def test_unknown_kernel(self):
+        """Test that an unknown kernel raises ValueError."""
+        with pytest.raises(ValueError, match="kernel"):
+            ContentTally("simd")
+
+    def test_auto_kernel(self):
+        """Test that auto picks NumPy only when it is installed."""
+        assert resolve_kernel("auto") == ("numpy" if numpy_available() else "python")
+
+
+class TestContentMetrics:
+    """Test suite for ContentMetrics and content_metrics."""
+
+    def test_is_line_count(self):
+        """Test that metrics stand in for the plain line count."""
+        metrics = ContentMetrics(3, words=5, chars=20, bytes=22, max_line_length=9)
+
+        assert metrics == 3
+        assert metrics + 1 == 4
+        assert str(metrics) == "3"
+        assert metrics.lines == 3
+
+    def test_pickle(self):
+        """Test that every metric survives a round trip to a process worker."""
+        metrics = pickle.loads(pickle.dumps(ContentMetrics(3, 5, 20, 22, 9)))
+
+        assert metrics.to_dict() == {"lines": 3, "words": 5, "chars": 20, "bytes": 22, "max_line_length": 9}
+
+    @pytest.mark.parametrize("kernel", KERNELS)
+    def test_file(self, tmp_path, kernel):
+        """Test metrics of a file read in small buffers."""
+        path = tmp_path / "sample.txt"
+        data = b"first line\nna\xc3\xafve caf\xc3\xa9 au lait\n\nlast"
+        path.write_bytes(data)
+
+        assert content_metrics(str(path), kernel, buffer_size=4).to_dict() == reference(data)
+
+    def test_sniff_binary(self, tmp_path):
+        """Test that sniffing returns BINARY for binary files."""
+        path = tmp_path / "data.dat"
+        path.write_bytes(b"\x00\x01\x02" * 100)
+
+        assert content_metrics(str(path), sniff=True) == BINARY
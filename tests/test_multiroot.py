@@ -0,0 +1,127 @@
+"""Tests for the multiroot module."""
+
+import os
+import pytest
+from pathlib import Path
+from filestat.analyzer import FileAnalyzer
+from filestat.multiroot import MultiRootAnalyzer, canonical_roots, read_path_list
+
+
+@pytest.fixture
+def roots(tmp_path):
+    """Create two project directories, one with a nested subdirectory."""
+    Path(tmp_path, "p1", "src").mkdir(parents=True)
+    Path(tmp_path, "p1", "a.py").write_text("1\n2\n3\n")
+    Path(tmp_path, "p1", "src", "b.py").write_text("1\n")
+    Path(tmp_path, "p2").mkdir()
+    Path(tmp_path, "p2", "c.txt").write_text("1\n2\n")
+    Path(tmp_path, "p2", "d.bin").write_bytes(b"\x00\x01" * 100)
+    return tmp_path
+
+
+class TestCanonicalRoots:
+    """Test suite for canonical_roots."""
+
+    def test_collapses_nested_and_repeated(self, roots):
+        """Test that nested, repeated and symlinked roots are dropped."""
+        os.symlink(roots / "p1", roots / "link")
+        paths = [str(roots / "p1" / "src"), str(roots / "p2"), str(roots / "p1"),
+                 str(roots / "p2") + "/", str(roots / "link")]
+
+        kept, collapsed = canonical_roots(paths)
+
+        assert kept == [str(roots / "p2"), str(roots / "p1")]
+        assert collapsed == {
+            str(roots / "p1" / "src"): str(roots / "p1"),
+            str(roots / "p2") + "/": str(roots / "p2"),
+            str(roots / "link"): str(roots / "p1"),
+        }
+
+    def test_sibling_prefix_is_not_nested(self, tmp_path):
+        """Test that /x/ab is not treated as inside /x/a."""
+        Path(tmp_path, "a").mkdir()
+        Path(tmp_path, "ab").mkdir()
+
+        kept, collapsed = canonical_roots([str(tmp_path / "a"), str(tmp_path / "ab")])
+
+        assert len(kept) == 2
+        assert collapsed == {}
+
+    def test_missing_path(self, tmp_path):
+        """Test that a missing path raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            canonical_roots([str(tmp_path / "missing")])
+
+    def test_read_path_list(self, tmp_path):
+        """Test that blank lines and comments are skipped."""
+        listing = tmp_path / "dirs.txt"
+        listing.write_text("# projects\n/a\n\n  /b  \n")
+
+        assert read_path_list(str(listing)) == ["/a", "/b"]
+
+
+class TestMultiRootAnalyzer:
+    """Test suite for MultiRootAnalyzer."""
+
+    @pytest.mark.parametrize("jobs", [1, 3])
+    def test_roots_match_single_scans(self, roots, jobs):
+        """Test that per-root reports equal separate scans and the total adds up."""
+        stats = MultiRootAnalyzer([str(roots / "p1"), str(roots / "p2")], jobs=jobs).analyze()
+
+        for report in stats["roots"]:
+            path = report.pop("path")
+            assert report == FileAnalyzer(path).analyze_directory()
+
+        total = stats["total"]
+        assert total["total_files"] == 4
+        assert total["total_dirs"] == 1
+        assert total["total_lines"] == 6
+        assert total["binary_files"] == 1
+        assert total["file_types"] == {".py": 2, ".txt": 1, ".bin": 1}
+        assert total["largest_files"][0]["path"] == os.path.join(str(roots / "p2"), "d.bin")
+
+    def test_records_use_absolute_paths(self, roots):
+        """Test that streamed records carry their root."""
+        analyzer = MultiRootAnalyzer([str(roots / "p1"), str(roots / "p2")])
+
+        paths = sorted(record["path"] for record in analyzer.iter_records())
+
+        assert paths == sorted([
+            str(roots / "p1" / "a.py"), str(roots / "p1" / "src" / "b.py"),
+            str(roots / "p2" / "c.txt"), str(roots / "p2" / "d.bin"),
+        ])
+
+    def test_duplicates_span_roots(self, roots):
+        """Test that duplicate detection compares files of different roots."""
+        Path(roots, "p2", "copy.py").write_text("1\n2\n3\n")
+
+        stats = MultiRootAnalyzer([str(roots / "p1"), str(roots / "p2")], duplicates=True).analyze()
+
+        assert stats["total"]["duplicates"]["groups"][0]["paths"] == [
+            str(roots / "p1" / "a.py"), str(roots / "p2" / "copy.py"),
+        ]
+
+    def test_distributions_merge(self, roots):
+        """Test that the total's distributions combine every root's files."""
+        stats = MultiRootAnalyzer([str(roots / "p1"), str(roots / "p2")]).analyze()
+        distributions = stats["total"]["distributions"]
+
+        assert distributions["size_bytes"]["count"] == 4
+        assert distributions["size_bytes"]["total"] == stats["total"]["total_size_bytes"]
+        assert 200 <= distributions["size_bytes"]["max"] <= 201
+        assert distributions["lines"]["count"] == 3
+        assert distributions["lines"]["p50"] == 2
+        assert distributions["extensions"][".py"]["size_bytes"]["count"] == 2
+
+    def test_estimates_combine(self, roots):
+        """Test that per-root line estimates are combined into the total."""
+        stats = MultiRootAnalyzer([str(roots / "p1"), str(roots / "p2")], lines="estimate").analyze()
+
+        assert [report["total_lines"] for report in stats["roots"]] == [4, 2]
+        assert stats["total"]["total_lines"] == 6
+        assert stats["total"]["line_count"]["mode"] == "estimate"
+
+    def test_rejects_files(self, roots):
+        """Test that every root must be a directory."""
+        with pytest.raises(NotADirectoryError):
+            MultiRootAnalyzer([str(roots / "p1"), str(roots / "p2" / "c.txt")])
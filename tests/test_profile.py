@@ -0,0 +1,50 @@
+"""Tests for the profile module."""
+
+from filestat.counting import BINARY
+from filestat.profile import ScanProfile
+
+
+class TestScanProfile:
+    """Test suite for ScanProfile."""
+
+    def test_file_counted(self):
+        """Test read time, counters and the slowest files."""
+        profile = ScanProfile(slowest=2)
+        profile.file_counted("a.txt", 100, 5, 0.1)
+        profile.file_counted("b.bin", 50, BINARY, 0.3)
+        profile.file_counted("c.txt", 10, 1, 0.2)
+        data = profile.to_dict()
+
+        assert data["counters"] == {"files_counted": 3, "bytes_counted": 110}
+        assert data["phases"]["read"]["seconds"] == 0.1 + 0.3 + 0.2
+        assert [entry["path"] for entry in data["slowest_files"]] == ["b.bin", "c.txt"]
+
+    def test_timed_wraps_function(self):
+        """Test that timed functions keep their result and add to a phase."""
+        profile = ScanProfile()
+        add = profile.timed("aggregate", lambda a, b: a + b)
+
+        assert add(2, 3) == 5
+        assert profile.seconds["aggregate"] > 0
+
+    def test_rates_exclude_recorded_phases(self):
+        """Test that render time counts towards wall time but not rates."""
+        profile = ScanProfile()
+        profile.scan_seconds = 2.0
+        profile.files = 10
+        profile.size_bytes = 1000
+        profile.record("render", 3.0)
+        data = profile.to_dict()
+
+        assert data["wall_seconds"] == 5.0
+        assert data["files_per_s"] == 5.0
+        assert data["bytes_per_s"] == 500.0
+        assert data["phases"]["render"]["share"] == 0.6
+
+    def test_empty_profile(self):
+        """Test that an unused profile reports zero rates."""
+        data = ScanProfile().to_dict()
+
+        assert data["wall_seconds"] == 0.0
+        assert data["phases"] == {}
+        assert data["files_per_s"] == 0.0
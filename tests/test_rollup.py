@@ -0,0 +1,65 @@
+"""Tests for the rollup module."""
+
+import os
+from filestat.rollup import DirectoryRollup
+
+
+def p(*parts):
+    """Join path parts with the platform separator."""
+    return os.sep.join(parts)
+
+
+class TestDirectoryRollup:
+    """Test suite for DirectoryRollup."""
+
+    def build(self):
+        """Create a rollup over a small synthetic tree."""
+        rollup = DirectoryRollup()
+        rollup.add("root.txt", 10, 1)
+        rollup.add(p("a", "one.txt"), 100, 10)
+        rollup.add(p("a", "b", "two.txt"), 200, 20)
+        rollup.add(p("a", "b", "c", "three.txt"), 300, 30)
+        rollup.add(p("z", "four.txt"), 50, 5)
+        return rollup
+
+    def test_subtree_totals_roll_up(self):
+        """Test that every directory includes its descendants."""
+        totals = self.build().subtree_totals()
+
+        assert totals[""] == [5, 660, 66]
+        assert totals["a"] == [3, 600, 60]
+        assert totals[p("a", "b")] == [2, 500, 50]
+        assert totals["z"] == [1, 50, 5]
+
+    def test_missing_ancestors_are_created(self):
+        """Test that directories holding no files directly still appear."""
+        rollup = DirectoryRollup()
+        rollup.add(p("x", "y", "deep.txt"), 7, 1)
+
+        totals = rollup.subtree_totals()
+
+        assert totals["x"] == [1, 7, 1]
+        assert totals[""] == [1, 7, 1]
+
+    def test_tree_depth_and_order(self):
+        """Test that the tree is cut at depth and sorted heaviest first."""
+        tree = self.build().tree(depth=1)
+
+        assert tree["path"] == "."
+        assert [child["name"] for child in tree["children"]] == ["a", "z"]
+        assert all(child["children"] == [] for child in tree["children"])
+
+    def test_tree_limit(self):
+        """Test that children beyond the limit are reported as omitted."""
+        tree = self.build().tree(depth=3, limit=1)
+
+        assert [child["name"] for child in tree["children"]] == ["a"]
+        assert tree["omitted_dirs"] == 1
+        assert tree["children"][0]["children"][0]["children"][0]["size_bytes"] == 300
+
+    def test_depth_zero_is_root_only(self):
+        """Test that depth 0 reports only whole-tree totals."""
+        tree = self.build().tree(depth=0)
+
+        assert tree["children"] == []
+        assert tree["files"] == 5
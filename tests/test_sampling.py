@@ -0,0 +1,103 @@
+"""Tests for the sampling module."""
+
+import os
+import pytest
+from filestat.sampling import LineSampler, _estimate_stratum, combine_estimates
+
+
+def _record(path, size):
+    """Build a walker-style record with only st_size set."""
+    return (path, path, path, os.stat_result((0, 0, 0, 0, 0, 0, size, 0, 0, 0)))
+
+
+class TestLineSampler:
+    """Test suite for LineSampler."""
+
+    def test_reservoir_is_bounded_per_extension(self):
+        """Test that each extension keeps at most sample_size files."""
+        sampler = LineSampler(sample_size=5)
+        for i in range(100):
+            sampler.offer(".py", _record(f"{i}.py", 10))
+        for i in range(3):
+            sampler.offer(".md", _record(f"{i}.md", 10))
+
+        assert len(sampler.strata[".py"].sample) == 5
+        assert sampler.strata[".py"].files == 100
+        assert sampler.strata[".py"].size_bytes == 1000
+        assert len(sampler.records()) == 8
+
+    def test_sample_depends_only_on_seed(self):
+        """Test that the same seed picks the same files."""
+        picks = []
+        for _ in range(2):
+            sampler = LineSampler(sample_size=3, seed=7)
+            for i in range(50):
+                sampler.offer(".txt", _record(f"{i}.txt", 1))
+            picks.append([record[0] for record in sampler.records()])
+
+        assert picks[0] == picks[1]
+
+    def test_estimate_scales_by_bytes(self):
+        """Test the ratio estimate and that sampled lines bound the interval."""
+        sampler = LineSampler(sample_size=2)
+        sampler.offer(".log", _record("a", 100))
+        sampler.offer(".log", _record("b", 300))
+        sampler.offer(".log", _record("c", 600))
+        # The reservoir is full after two files; pin it for a known result
+        sampler.strata[".log"].sample = [_record("a", 100), _record("b", 300)]
+
+        result = sampler.estimate({"a": 5, "b": 15})
+
+        assert result["estimate"] == 50
+        assert result["ci_low"] == 50 and result["ci_high"] == 50
+        assert result["sampled_files"] == 2
+
+    def test_binary_samples_count_as_zero(self):
+        """Test that negative line counts (BINARY) contribute no lines."""
+        sampler = LineSampler()
+        sampler.offer(".dat2", _record("a", 10))
+        sampler.offer(".dat2", _record("b", 10))
+
+        assert sampler.estimate({"a": -1, "b": 4})["estimate"] == 4
+
+    def test_rejects_tiny_samples(self):
+        """Test that a sample size below 2 is rejected."""
+        with pytest.raises(ValueError):
+            LineSampler(sample_size=1)
+
+
+class TestCombineEstimates:
+    """Test suite for combine_estimates."""
+
+    def test_estimates_and_variances_add_up(self):
+        """Test that totals add and standard errors add in quadrature."""
+        sampler = LineSampler()
+        sampler.offer(".py", _record("a", 10))
+        exact = sampler.estimate({"a": 4})
+        partial = {**exact, "estimate": 100, "stderr": 3.0, "strata": {".py": {"files": 9, "sampled": 2, "lines": 100}}}
+        partial2 = {**partial, "stderr": 4.0}
+
+        combined = combine_estimates([exact, partial, partial2])
+
+        assert combined["estimate"] == 204
+        assert combined["stderr"] == pytest.approx(5.0)
+        assert combined["strata"][".py"] == {"files": 19, "sampled": 5, "lines": 204}
+        assert combined["sampled_lines"] == 12
+
+
+class TestEstimateStratum:
+    """Test suite for the per-stratum estimator."""
+
+    def test_complete_sample_has_no_variance(self):
+        """Test that a fully sampled stratum is exact."""
+        assert _estimate_stratum(2, 30, [10, 20], [1, 5]) == (6.0, 0.0)
+
+    def test_partial_sample_has_variance(self):
+        """Test that an uneven partial sample yields a positive variance."""
+        estimate, variance = _estimate_stratum(10, 150, [10, 20], [1, 5])
+        assert estimate == pytest.approx(30.0)
+        assert variance > 0
+
+    def test_empty_files_use_mean(self):
+        """Test that a sample of empty files falls back to the mean estimator."""
+        assert _estimate_stratum(4, 0, [0, 0], [0, 0]) == (0.0, 0.0)
@@ -0,0 +1,218 @@
+"""Tests for the server module."""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from pathlib import Path
+from filestat.analyzer import FileAnalyzer
+from filestat.server import BYTES_PER_FILE, IndexCache, QueryServer, ServerClient, query, serve
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a small directory tree."""
+    root = tmp_path / "tree"
+    Path(root, "sub").mkdir(parents=True)
+    Path(root, "a.txt").write_text("1\n2\n")
+    Path(root, "sub", "b.py").write_text("x\n")
+    return root
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Run a query server on a background thread."""
+    server = QueryServer(str(tmp_path / "fs.sock"), IndexCache())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestIndexCache:
+    """Test suite for IndexCache."""
+
+    def test_warm_query_matches_scan(self, tree):
+        """Test that repeated queries are cached and equal a fresh scan."""
+        cache = IndexCache()
+
+        first, cached_first = cache.get_stats(str(tree))
+        second, cached_second = cache.get_stats(str(tree))
+
+        assert (cached_first, cached_second) == (False, True)
+        assert first == second == FileAnalyzer(str(tree)).analyze_directory()
+        assert cache.info()["hits"] == 1
+        cache.close()
+
+    def test_revalidates_changes(self, tree):
+        """Test that edits, new files and deletions show up in warm queries."""
+        cache = IndexCache()
+        cache.get_stats(str(tree))
+        Path(tree, "a.txt").write_text("1\n2\n3\n4\n")
+        Path(tree, "sub", "c.md").write_text("# c\n")
+        Path(tree, "sub", "b.py").unlink()
+
+        stats, cached = cache.get_stats(str(tree))
+
+        assert cached
+        assert stats["total_files"] == 2
+        assert stats["total_lines"] == 5
+        assert set(stats["file_types"]) == {".txt", ".md"}
+        cache.close()
+
+    def test_options_get_separate_entries(self, tree):
+        """Test that different options are cached apart, unset ones with defaults."""
+        cache = IndexCache()
+        cache.get_stats(str(tree), {"top": 5})
+        cache.get_stats(str(tree), {"top": 5, "depth": None})
+        stats, cached = cache.get_stats(str(tree), {"lines": "none"})
+
+        assert not cached
+        assert stats["line_count"] == {"mode": "none"}
+        assert len(cache.info()["entries"]) == 2
+        cache.close()
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that trees beyond the memory limit are dropped oldest first."""
+        roots = []
+        for name in "abc":
+            Path(tmp_path, name).mkdir()
+            for i in range(3):
+                Path(tmp_path, name, f"{i}.txt").write_text("x\n")
+            roots.append(str(tmp_path / name))
+        cache = IndexCache(memory_limit=2 * 3 * BYTES_PER_FILE + 2000)
+
+        cache.get_stats(roots[0])
+        cache.get_stats(roots[1])
+        cache.get_stats(roots[0])
+        cache.get_stats(roots[2])
+
+        info = cache.info()
+        assert [entry["path"] for entry in info["entries"]] == [roots[0], roots[2]]
+        assert info["evictions"] == 1
+        assert info["memory_bytes"] <= info["memory_limit"]
+        assert cache.get_stats(roots[1])[1] is False
+        cache.close()
+
+    def test_files_are_not_cached(self, tree):
+        """Test that single files are answered without an entry."""
+        cache = IndexCache()
+
+        stats, cached = cache.get_stats(str(tree / "a.txt"))
+
+        assert stats["lines"] == 2
+        assert not cached
+        assert cache.info()["entries"] == []
+
+    def test_rejects_unsupported_options(self, tree):
+        """Test that unknown options and estimates raise ValueError."""
+        cache = IndexCache()
+        with pytest.raises(ValueError, match="jobs"):
+            cache.get_stats(str(tree), {"jobs": 4})
+        with pytest.raises(ValueError):
+            cache.get_stats(str(tree), {"lines": "estimate"})
+
+    def test_drop(self, tree):
+        """Test that dropping a tree forgets every entry of it."""
+        cache = IndexCache()
+        cache.get_stats(str(tree))
+        cache.get_stats(str(tree), {"top": 1})
+
+        assert cache.drop(str(tree)) == 2
+        assert cache.info()["memory_bytes"] == 0
+        assert cache.get_stats(str(tree))[1] is False
+        cache.close()
+
+
+class TestQueryServer:
+    """Test suite for QueryServer and ServerClient."""
+
+    def test_stats_round_trip(self, server, tree):
+        """Test that the client gets the same statistics as a local scan."""
+        with ServerClient(server.socket_path) as client:
+            first = client.request("stats", path=str(tree), options={"top": 2})
+            second = client.request("stats", path=str(tree), options={"top": 2})
+
+            assert (first["cached"], second["cached"]) == (False, True)
+            assert first["result"] == FileAnalyzer(str(tree), top=2).analyze_directory()
+            assert client.info()["hits"] == 1
+
+    def test_socket_is_private(self, server):
+        """Test that only the owner can connect."""
+        assert os.stat(server.socket_path).st_mode & 0o777 == 0o600
+
+    def test_errors_keep_their_type(self, server, tree):
+        """Test that server errors are raised by the client under their type."""
+        with ServerClient(server.socket_path) as client:
+            with pytest.raises(FileNotFoundError):
+                client.get_stats(str(tree / "missing"))
+            with pytest.raises(ValueError, match="op"):
+                client.request("bogus")
+            # The connection stays usable after an error
+            assert client.request("ping")["ok"]
+
+    def test_query_several_paths(self, server, tree):
+        """Test the query helper over one connection."""
+        results = query([str(tree), str(tree / "sub")], server.socket_path, lines="none")
+
+        assert [stats["total_files"] for stats in results] == [2, 1]
+
+    def test_refuses_second_server(self, server):
+        """Test that a live socket is not taken over."""
+        with pytest.raises(OSError, match="already listening"):
+            QueryServer(server.socket_path, IndexCache())
+
+    def test_replaces_stale_socket(self, tmp_path):
+        """Test that a socket left behind by a dead server is replaced."""
+        path = str(tmp_path / "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+
+        server = QueryServer(path, IndexCache())
+        server.server_close()
+
+        assert not os.path.exists(path)
+
+    def test_refuses_regular_file(self, tmp_path):
+        """Test that serve never replaces a path that is not a socket."""
+        path = tmp_path / "notes.txt"
+        path.write_text("important\n")
+
+        with pytest.raises(FileExistsError, match="not a socket"):
+            serve(str(path))
+
+        assert path.read_text() == "important\n"
+
+    def test_sigterm_removes_socket(self, tmp_path):
+        """Test that a server stopped with SIGTERM removes its socket."""
+        path = tmp_path / "term.sock"
+        process = subprocess.Popen(
+            [sys.executable, "-c", "import sys; from filestat.server import serve; serve(sys.argv[1])", str(path)]
+        )
+        try:
+            deadline = time.monotonic() + 10
+            while not path.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert path.exists()
+
+            process.send_signal(signal.SIGTERM)
+            assert process.wait(10) == 0
+        finally:
+            process.kill()
+
+        assert not path.exists()
+
+    def test_no_server(self, tmp_path):
+        """Test that connecting without a server raises ConnectionError."""
+        with pytest.raises(ConnectionError, match="filestat serve"):
+            ServerClient(str(tmp_path / "none.sock"))
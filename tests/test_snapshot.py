@@ -0,0 +1,188 @@
+"""Tests for the snapshot module."""
+
+import gzip
+import json
+import os
+import pytest
+from pathlib import Path
+from filestat.analyzer import FileAnalyzer
+from filestat.counting import BINARY
+from filestat.snapshot import SnapshotReader, SnapshotWriter, diff_snapshots, iter_diff_events
+
+
+def _write(path, records, **options):
+    """Write records to a snapshot and return its path."""
+    with SnapshotWriter(str(path), {"root": "/data", "lines": "count"}, **options) as writer:
+        for record in records:
+            writer.add(*record)
+    return str(path)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a small directory to snapshot."""
+    root = tmp_path / "tree"
+    Path(root, "src").mkdir(parents=True)
+    Path(root, "a.txt").write_text("1\n2\n")
+    Path(root, "src", "b.py").write_text("x = 1\n")
+    Path(root, "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 50)
+    return root
+
+
+class TestSnapshotFile:
+    """Test suite for SnapshotWriter and SnapshotReader."""
+
+    @pytest.mark.parametrize("run_size", [1, 2, 1000])
+    def test_records_sorted(self, tmp_path, run_size):
+        """Test that records come back sorted by path, also after spilled runs."""
+        records = [("b/z", 3, 30, 1), ("a", 1, 10, 2), ("b/a", 2, 20, BINARY), ("c", 4, 40, 0)]
+        path = _write(tmp_path / "s.fsnap", records, run_size=run_size)
+
+        with SnapshotReader(path) as reader:
+            assert list(reader) == sorted(records)
+            assert reader.header["files"] == 4
+            assert reader.header["root"] == "/data"
+
+    def test_compressed(self, tmp_path):
+        """Test that gzipped snapshots are written and recognized."""
+        records = [(f"f{i:03}", i, i, i) for i in range(100)]
+        path = _write(tmp_path / "s.fsnap.gz", records, compress=True)
+
+        with open(path, "rb") as f:
+            assert f.read(2) == b"\x1f\x8b"
+        with SnapshotReader(path) as reader:
+            assert list(reader) == records
+
+    def test_awkward_names_round_trip(self, tmp_path):
+        """Test that tabs, newlines, backslashes and undecodable bytes survive."""
+        names = ["tab\there", "new\nline", "back\\slash\\t", "bad-\udcff-byte", "cr\rname"]
+        records = [(name, 1, 2, 3) for name in names]
+        path = _write(tmp_path / "s.fsnap", records)
+
+        with SnapshotReader(path) as reader:
+            assert list(reader) == sorted(records)
+
+    def test_failed_scan_leaves_no_file(self, tmp_path):
+        """Test that an exception inside the writer discards the snapshot."""
+        target = tmp_path / "s.fsnap"
+        with pytest.raises(RuntimeError):
+            with SnapshotWriter(str(target), run_size=1) as writer:
+                writer.add("a", 1, 1, 1)
+                writer.add("b", 1, 1, 1)
+                raise RuntimeError("scan failed")
+
+        assert os.listdir(tmp_path) == []
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test that files that are not snapshots raise ValueError."""
+        other = tmp_path / "other.txt"
+        other.write_text("hello\n")
+        with pytest.raises(ValueError):
+            SnapshotReader(str(other))
+
+        compressed = tmp_path / "other.gz"
+        with gzip.open(compressed, "wt") as f:
+            f.write(json.dumps({"format": "filestat-snapshot", "version": 99}) + "\n")
+        with pytest.raises(ValueError, match="version"):
+            SnapshotReader(str(compressed))
+
+    def test_rejects_unsorted(self, tmp_path):
+        """Test that out-of-order records are detected while reading."""
+        path = tmp_path / "s.fsnap"
+        path.write_text(json.dumps({"format": "filestat-snapshot", "version": 1}) + "\nb\t1\t1\t1\na\t1\t1\t1\n")
+
+        with SnapshotReader(str(path)) as reader:
+            with pytest.raises(ValueError, match="sorted"):
+                list(reader)
+
+
+class TestDiff:
+    """Test suite for snapshot diffs."""
+
+    def test_added_removed_changed(self, tmp_path):
+        """Test counts, deltas and per-extension totals of a diff."""
+        old = _write(tmp_path / "old.fsnap", [
+            ("keep.txt", 10, 1, 2), ("grow.log", 100, 1, 10), ("gone.py", 50, 1, 5), ("touch.txt", 5, 1, 1),
+        ])
+        new = _write(tmp_path / "new.fsnap.gz", [
+            ("keep.txt", 10, 1, 2), ("grow.log", 400, 2, 40), ("new.bin", 70, 1, BINARY), ("touch.txt", 5, 2, 1),
+        ], compress=True)
+
+        diff = diff_snapshots(old, new)
+
+        assert (diff["old"]["files"], diff["new"]["files"]) == (4, 4)
+        assert diff["size_delta"] == 485 - 165
+        assert diff["lines_delta"] == 43 - 18
+        assert diff["added"] == {"files": 1, "size_delta": 70, "lines_delta": 0}
+        assert diff["removed"] == {"files": 1, "size_delta": -50, "lines_delta": -5}
+        assert diff["changed"] == {"files": 2, "size_delta": 300, "lines_delta": 30}
+        assert diff["unchanged"] == {"files": 1}
+        assert list(diff["extensions"]) == [".log", ".bin", ".py", ".txt"]
+        assert diff["extensions"][".py"]["files_delta"] == -1
+        assert [change["path"] for change in diff["grown"]] == ["grow.log", "new.bin"]
+        assert [change["path"] for change in diff["shrunk"]] == ["gone.py"]
+
+    def test_events_stream_every_change(self, tmp_path):
+        """Test that events list each change in path order, then the summary."""
+        old = _write(tmp_path / "old.fsnap", [(f"f{i:04}", i, 0, 0) for i in range(0, 1000, 2)], run_size=7)
+        new = _write(tmp_path / "new.fsnap", [(f"f{i:04}", i, 0, 0) for i in range(0, 1000, 3)], run_size=7)
+
+        events = list(iter_diff_events(old, new, top=3))
+        changes = [payload for kind, payload in events if kind == "file"]
+
+        assert events[-1][0] == "summary"
+        assert [change["path"] for change in changes] == sorted(change["path"] for change in changes)
+        assert sum(change["status"] == "added" for change in changes) == len(set(range(0, 1000, 3)) - set(range(0, 1000, 2)))
+        assert sum(change["status"] == "removed" for change in changes) == len(set(range(0, 1000, 2)) - set(range(0, 1000, 3)))
+        assert len(events[-1][1]["grown"]) == 3
+
+    def test_no_line_deltas_without_counts(self, tmp_path):
+        """Test that line deltas are left out unless both snapshots counted lines."""
+        old = _write(tmp_path / "old.fsnap", [("a.txt", 1, 1, 1)])
+        with SnapshotWriter(str(tmp_path / "new.fsnap"), {"lines": "none"}) as writer:
+            writer.add("a.txt", 2, 2, 0)
+
+        diff = diff_snapshots(old, str(tmp_path / "new.fsnap"))
+
+        assert "lines_delta" not in diff
+        assert "total_lines" not in diff["old"]
+        assert "lines_delta" not in diff["changed"]
+        assert "lines_delta" not in diff["grown"][0]
+
+
+class TestSaveSnapshot:
+    """Test suite for FileAnalyzer.save_snapshot."""
+
+    def test_snapshot_matches_scan(self, tree, tmp_path):
+        """Test that the snapshot holds every scanned file and the stats are returned."""
+        path = str(tmp_path / "tree.fsnap")
+
+        stats = FileAnalyzer(str(tree)).save_snapshot(path)
+
+        assert stats == FileAnalyzer(str(tree)).analyze_directory()
+        with SnapshotReader(path) as reader:
+            records = list(reader)
+            assert reader.header["root"] == str(tree)
+            assert reader.header["dirs"] == 1
+        assert [record[0] for record in records] == ["a.txt", "logo.png", os.path.join("src", "b.py")]
+        assert records[0][3] == 2
+        assert records[1][3] == BINARY
+
+    def test_diff_after_changes(self, tree, tmp_path):
+        """Test a diff between snapshots taken before and after edits."""
+        before, after = str(tmp_path / "1.fsnap"), str(tmp_path / "2.fsnap.gz")
+        FileAnalyzer(str(tree)).save_snapshot(before)
+        Path(tree, "a.txt").write_text("1\n2\n3\n")
+        Path(tree, "src", "b.py").unlink()
+        FileAnalyzer(str(tree)).save_snapshot(after, compress=True)
+
+        diff = diff_snapshots(before, after)
+
+        assert diff["changed"]["files"] == 1
+        assert diff["removed"]["files"] == 1
+        assert diff["lines_delta"] == 0
+
+    def test_rejects_estimate(self, tree, tmp_path):
+        """Test that estimated line counts cannot be snapshotted."""
+        with pytest.raises(ValueError):
+            FileAnalyzer(str(tree), lines="estimate").save_snapshot(str(tmp_path / "s.fsnap"))
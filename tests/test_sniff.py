@@ -0,0 +1,53 @@
+"""Tests for the sniff module."""
+
+import pytest
+from filestat.sniff import has_binary_extension, is_binary_block, is_binary_file
+
+
+class TestSniff:
+    """Test suite for text/binary classification."""
+
+    @pytest.mark.parametrize("block", [
+        b"",
+        b"plain ascii text\n",
+        "unicode text: café ☃\n".encode("utf-8"),
+        b"\tindented\r\nwith \x1b[31mcolour\x1b[0m\f\n",
+        "utf-16 text\n".encode("utf-16"),
+    ])
+    def test_text_blocks(self, block):
+        """Test blocks that should be classified as text."""
+        assert is_binary_block(block) is False
+
+    @pytest.mark.parametrize("block", [
+        b"\x89PNG\r\n\x1a\n" + b"rest",
+        b"PK\x03\x04 zip archive",
+        b"\x7fELF\x02\x01\x01",
+        b"SQLite format 3\x00",
+        b"text with a \x00 NUL byte",
+        bytes(range(1, 32)) * 10,
+    ])
+    def test_binary_blocks(self, block):
+        """Test blocks that should be classified as binary."""
+        assert is_binary_block(block) is True
+
+    @pytest.mark.parametrize("name,expected", [
+        ("photo.PNG", True),
+        ("lib.so", True),
+        ("archive.tar.gz", True),
+        ("script.py", False),
+        ("README", False),
+        (".db", False),
+    ])
+    def test_binary_extensions(self, name, expected):
+        """Test the extension fast path."""
+        assert has_binary_extension(name) is expected
+
+    def test_is_binary_file(self, tmp_path):
+        """Test classifying files on disk."""
+        text = tmp_path / "notes"
+        text.write_text("hello\n")
+        binary = tmp_path / "blob"
+        binary.write_bytes(b"\x00\x01\x02")
+
+        assert is_binary_file(str(text)) is False
+        assert is_binary_file(str(binary)) is True
@@ -0,0 +1,64 @@
+"""Tests for the topk module."""
+
+import pytest
+from filestat.topk import TopK
+
+
+class TestTopK:
+    """Test suite for TopK."""
+
+    def test_keeps_largest(self):
+        """Test that only the k largest keys are kept, largest first."""
+        top = TopK(3)
+        for key in [5, 1, 9, 3, 7, 2]:
+            top.push(key, f"f{key}")
+
+        assert [key for key, _, _ in top.items()] == [9, 7, 5]
+        assert len(top) == 3
+
+    def test_matches_stable_sort(self):
+        """Test ties resolve in push order, like a stable descending sort."""
+        keys = [3, 5, 3, 5, 1, 5, 3]
+        top = TopK(4)
+        for i, key in enumerate(keys):
+            top.push(key, f"f{i}", i)
+
+        expected = sorted(enumerate(keys), key=lambda item: item[1], reverse=True)[:4]
+        assert [(key, value) for key, _, value in top.items()] == [(k, i) for i, k in expected]
+
+    def test_floor(self):
+        """Test that the floor is the smallest kept key once full."""
+        top = TopK(2)
+        assert top.floor == float("-inf")
+
+        for key in [4, 8, 6, 1]:
+            top.push(key, f"f{key}")
+
+        assert top.floor == 6
+        assert TopK(0).floor == float("inf")
+
+    def test_zero_keeps_nothing(self):
+        """Test that k=0 keeps no entries."""
+        top = TopK(0)
+        top.push(10, "a")
+
+        assert top.items() == []
+
+    def test_negative_k_raises_error(self):
+        """Test that a negative k raises ValueError."""
+        with pytest.raises(ValueError):
+            TopK(-1)
+
+    def test_merge_matches_single_tracker(self):
+        """Test that merging two trackers keeps the overall top k, with prefixed paths."""
+        first, second = TopK(3), TopK(3)
+        for key in [4, 8, 1]:
+            first.push(key, f"f{key}")
+        for key in [8, 6, 2]:
+            second.push(key, f"g{key}")
+
+        first.merge(second, "root/")
+
+        assert [(key, relpath) for key, relpath, _ in first.items()] == [
+            (8, "f8"), (8, "root/g8"), (6, "root/g6"),
+        ]
@@ -0,0 +1,252 @@
+"""Tests for the walker module."""
+
+import os
+import pytest
+from pathlib import Path
+from filestat.ignore import PathFilter
+from filestat.profile import ScanProfile
+from filestat.walker import DirectoryWalker, file_extension
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a small nested directory tree."""
+    Path(tmp_path, "a.txt").write_text("a\n")
+    Path(tmp_path, "b.py").write_text("b\n")
+    Path(tmp_path, "sub", "deeper").mkdir(parents=True)
+    Path(tmp_path, "sub", "c.json").write_text("{}\n")
+    Path(tmp_path, "sub", "deeper", "d").write_text("d\n")
+    Path(tmp_path, "empty").mkdir()
+    return tmp_path
+
+
+class TestFileExtension:
+    """Test suite for file_extension."""
+
+    @pytest.mark.parametrize("name", [
+        "file.txt", "archive.tar.gz", "README", ".bashrc", "trailing.", "..x", "a.b.",
+    ])
+    def test_matches_path_suffix(self, name):
+        """Test that extensions match Path.suffix."""
+        assert file_extension(name) == Path(name).suffix
+
+
+class TestDirectoryWalker:
+    """Test suite for DirectoryWalker."""
+
+    def test_matches_os_walk(self, tree):
+        """Test records and order match os.walk."""
+        expected = []
+        for root, _dirs, files in os.walk(tree):
+            for file in files:
+                expected.append(str(Path(root, file).relative_to(tree)))
+
+        walker = DirectoryWalker(str(tree))
+        assert [relpath for _, relpath, _, _ in walker] == expected
+
+    def test_profiled_walk_matches(self, tree):
+        """Test that profiling yields the same records and counts calls."""
+        profile = ScanProfile()
+        plain = DirectoryWalker(str(tree))
+        profiled = DirectoryWalker(str(tree), profile)
+
+        assert [r[1] for r in profiled] == [r[1] for r in plain]
+        assert (profiled.files, profiled.dirs) == (plain.files, plain.dirs)
+        assert profile.counters["dirs_listed"] == 4
+        assert profile.counters["stat_calls"] == 4
+        assert profile.seconds["listing"] >= 0
+        assert profile.seconds["stat"] > 0
+
+    def test_excluded_directory_is_pruned(self, tree):
+        """Test that excluded directories are never listed."""
+        profile = ScanProfile()
+        walker = DirectoryWalker(str(tree), profile, PathFilter(exclude=["sub", "*.py"]))
+        relpaths = [relpath for _, relpath, _, _ in walker]
+
+        assert relpaths == ["a.txt"]
+        assert walker.pruned_dirs == 1
+        assert walker.pruned_files == 1
+        assert walker.dirs == 1
+        assert profile.counters["dirs_listed"] == 2
+
+    def test_include_keeps_descending(self, tree):
+        """Test that include patterns select files at any depth."""
+        walker = DirectoryWalker(str(tree), path_filter=PathFilter(include=["*.json"]))
+
+        assert [relpath for _, relpath, _, _ in walker] == [os.path.join("sub", "c.json")]
+        assert walker.pruned_files == 3
+        assert walker.pruned_dirs == 0
+
+    def test_counts(self, tree):
+        """Test file and directory counters."""
+        walker = DirectoryWalker(str(tree))
+        records = list(walker)
+
+        assert walker.files == 4
+        assert walker.dirs == 3
+        assert len(records) == 4
+
+    def test_record_contents(self, tree):
+        """Test that records carry path, name and stat data."""
+        records = {relpath: (path, name, st) for path, relpath, name, st in DirectoryWalker(str(tree))}
+        path, name, st = records[os.path.join("sub", "c.json")]
+
+        assert name == "c.json"
+        assert path == os.path.join(str(tree), "sub", "c.json")
+        assert st.st_size == 3
+
+    @pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+    def test_symlinked_directory_not_followed(self, tree):
+        """Test that symlinked directories are counted but not descended."""
+        os.symlink(tree / "sub", tree / "link")
+        walker = DirectoryWalker(str(tree))
+        relpaths = [relpath for _, relpath, _, _ in walker]
+
+        assert walker.dirs == 4
+        assert not any(relpath.startswith("link") for relpath in relpaths)
+
+    @pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+    def test_broken_symlink_counted_as_error(self, tree):
+        """Test that files whose stat fails are counted but not yielded."""
+        os.symlink(tree / "missing", tree / "dangling")
+        walker = DirectoryWalker(str(tree))
+        records = list(walker)
+
+        assert walker.files == 5
+        assert walker.errors == 1
+        assert len(records) == 4
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="hard links not supported")
+class TestBreadthFirst:
+    """Test suite for breadth-first walks."""
+
+    def test_level_order(self, tmp_path):
+        """Test that every directory of a level is listed before the next level."""
+        for top in ("a", "b"):
+            Path(tmp_path, top, "deep").mkdir(parents=True)
+            Path(tmp_path, top, "1.txt").write_text("x\n")
+            Path(tmp_path, top, "deep", "2.txt").write_text("x\n")
+
+        walker = DirectoryWalker(str(tmp_path), breadth_first=True)
+        depths = [relpath.count(os.sep) for _, relpath, _, _ in walker]
+
+        assert depths == sorted(depths) == [1, 1, 2, 2]
+        assert (walker.files, walker.dirs) == (4, 4)
+
+    def test_same_records_as_depth_first(self, tree):
+        """Test that only the order differs from a depth-first walk."""
+        breadth = DirectoryWalker(str(tree), breadth_first=True)
+        depth = DirectoryWalker(str(tree))
+
+        assert sorted(r[1] for r in breadth) == sorted(r[1] for r in depth)
+        assert (breadth.files, breadth.dirs, breadth.dirs_visited) == (depth.files, depth.dirs, depth.dirs_visited)
+
+    def test_pending_directories(self, tree):
+        """Test that directories found but not yet listed are counted."""
+        walker = DirectoryWalker(str(tree), breadth_first=True)
+        records = iter(walker)
+        next(records)
+
+        # The root is still being listed, so it is pending along with the
+        # queued "sub" and "empty"
+        assert (walker.dirs_visited, walker.dirs_pending) == (0, 3)
+        list(records)
+        assert (walker.dirs_visited, walker.dirs_pending) == (4, 0)
+
+
+class TestLinks:
+    """Test suite for hard link, symlink and mount point handling."""
+
+    def test_hard_links_yielded_once(self, tree):
+        """Test that every hard link after the first is skipped."""
+        os.link(tree / "a.txt", tree / "sub" / "a-link.txt")
+        walker = DirectoryWalker(str(tree))
+        relpaths = [relpath for _, relpath, _, _ in walker]
+
+        assert relpaths.count("a.txt") == 1
+        assert os.path.join("sub", "a-link.txt") not in relpaths
+        assert walker.files == 4
+        assert (walker.linked_files, walker.linked_bytes) == (1, 2)
+
+    def test_profiled_walk_skips_links(self, tree):
+        """Test that profiled walks skip repeated links the same way."""
+        os.link(tree / "a.txt", tree / "sub" / "a-link.txt")
+        plain = DirectoryWalker(str(tree))
+        profiled = DirectoryWalker(str(tree), ScanProfile())
+
+        assert [r[1] for r in profiled] == [r[1] for r in plain]
+        assert profiled.linked_files == plain.linked_files == 1
+
+    def test_file_symlink_to_walked_file_skipped(self, tree):
+        """Test that a symlink to a file already yielded is skipped when following."""
+        os.symlink(tree / "b.py", tree / "sub" / "b-link.py")
+        walker = DirectoryWalker(str(tree), follow_symlinks=True)
+        records = list(walker)
+
+        assert len(records) == 4
+        assert walker.linked_files == 1
+
+    def test_shared_inodes_across_walkers(self, tree, tmp_path_factory):
+        """Test that walkers sharing an inode set count a file once."""
+        other = tmp_path_factory.mktemp("other")
+        os.link(tree / "a.txt", other / "a.txt")
+        inodes = set()
+        first = list(DirectoryWalker(str(tree), inodes=inodes))
+        second = DirectoryWalker(str(other), inodes=inodes)
+
+        assert len(first) == 4
+        assert list(second) == []
+        assert second.linked_files == 1
+
+    def test_follow_symlinks_enters_linked_directory(self, tree, tmp_path_factory):
+        """Test that symlinked directories are walked when following."""
+        outside = tmp_path_factory.mktemp("outside")
+        Path(outside, "e.md").write_text("e\n")
+        os.symlink(outside, tree / "link")
+
+        walker = DirectoryWalker(str(tree), follow_symlinks=True)
+        relpaths = [relpath for _, relpath, _, _ in walker]
+
+        assert os.path.join("link", "e.md") in relpaths
+        assert walker.repeated_dirs == 0
+
+    @pytest.mark.parametrize("profiled", [False, True])
+    def test_symlink_loop_entered_once(self, tree, profiled):
+        """Test that a symlink back to an ancestor does not loop."""
+        os.symlink(tree, tree / "sub" / "loop")
+        os.symlink(tree / "sub", tree / "sub-again")
+
+        walker = DirectoryWalker(str(tree), ScanProfile() if profiled else None, follow_symlinks=True)
+        records = list(walker)
+
+        assert len(records) == 4
+        assert walker.repeated_dirs == 2
+        assert walker.dirs == 5
+
+    def test_one_file_system_stops_at_other_devices(self, tree, monkeypatch):
+        """Test that directories on another device than the root are not entered."""
+        real_stat = os.stat
+
+        def stat_on_other_device(path, *args, **kwargs):
+            st = real_stat(path, *args, **kwargs)
+            if os.fspath(path) != str(tree):
+                return st
+            fields = list(st)
+            fields[2] += 1  # st_dev
+            return os.stat_result(fields)
+
+        monkeypatch.setattr(os, "stat", stat_on_other_device)
+        walker = DirectoryWalker(str(tree), one_file_system=True)
+        relpaths = [relpath for _, relpath, _, _ in walker]
+
+        assert sorted(relpaths) == ["a.txt", "b.py"]
+        assert walker.mount_points == 2
+        assert walker.dirs == 2
+
+    def test_one_file_system_same_device(self, tree):
+        """Test that a tree on one device is walked completely."""
+        walker = DirectoryWalker(str(tree), one_file_system=True)
+
+        assert len(list(walker)) == 4
+        assert walker.mount_points == 0
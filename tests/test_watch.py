@@ -0,0 +1,164 @@
+"""Tests for the watch module."""
+
+import os
+import shutil
+import sys
+import pytest
+from pathlib import Path
+from filestat.analyzer import FileAnalyzer
+from filestat.cache import LineCountCache
+from filestat.watch import DirectoryWatcher
+
+
+MODES = [pytest.param(False, id="poll")]
+if sys.platform.startswith("linux"):
+    MODES.append(pytest.param(True, id="inotify"))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Create a small directory tree."""
+    Path(tmp_path, "a.txt").write_text("1\n2\n")
+    Path(tmp_path, "sub").mkdir()
+    Path(tmp_path, "sub", "b.py").write_text("x\n")
+    return tmp_path
+
+
+@pytest.fixture(params=MODES)
+def watcher(request, tree):
+    """Create a watcher that has completed its initial scan."""
+    with DirectoryWatcher(FileAnalyzer(str(tree)), use_inotify=request.param) as watcher:
+        watcher.scan()
+        yield watcher
+
+
+class TestDirectoryWatcher:
+    """Test suite for DirectoryWatcher."""
+
+    def test_initial_scan_matches_analyzer(self, tree):
+        """Test that the initial scan equals analyze_directory."""
+        with DirectoryWatcher(FileAnalyzer(str(tree)), use_inotify=False) as watcher:
+            assert watcher.scan() == FileAnalyzer(str(tree)).analyze_directory()
+
+    def test_no_changes(self, watcher):
+        """Test that an unchanged tree reports no delta."""
+        assert watcher.poll(0.05) is None
+
+    def test_added_and_modified(self, watcher, tree):
+        """Test that new and changed files are reported with total diffs."""
+        Path(tree, "sub", "c.log").write_text("a\nb\nc\n")
+        with open(Path(tree, "a.txt"), "a") as f:
+            f.write("3\n")
+
+        delta = watcher.poll(0.1)
+
+        assert [r["path"] for r in delta["added"]] == [os.path.join("sub", "c.log")]
+        assert [r["path"] for r in delta["modified"]] == ["a.txt"]
+        assert delta["diff"]["total_files"] == 1
+        assert delta["diff"]["total_lines"] == 4
+        assert delta["totals"]["total_lines"] == 7
+
+    def test_removed_directory(self, watcher, tree):
+        """Test that deleting a subtree removes its files and directories."""
+        shutil.rmtree(Path(tree, "sub"))
+
+        delta = watcher.poll(0.1)
+
+        assert delta["removed"] == [os.path.join("sub", "b.py")]
+        assert delta["dirs_removed"] == 1
+        assert delta["totals"]["total_dirs"] == 0
+
+    def test_new_directory_is_scanned(self, watcher, tree):
+        """Test that files in new directories are found and later watched."""
+        Path(tree, "new", "deeper").mkdir(parents=True)
+        Path(tree, "new", "deeper", "d.txt").write_text("d\n")
+        delta = watcher.poll(0.1)
+        assert [r["path"] for r in delta["added"]] == [os.path.join("new", "deeper", "d.txt")]
+        assert delta["dirs_added"] == 2
+
+        Path(tree, "new", "deeper", "d.txt").write_text("d\nd\n")
+        delta = watcher.poll(0.1)
+        assert [r["path"] for r in delta["modified"]] == [os.path.join("new", "deeper", "d.txt")]
+
+    def test_state_matches_full_rescan(self, watcher, tree):
+        """Test that incremental state equals a fresh scan after changes."""
+        Path(tree, "a.txt").unlink()
+        Path(tree, "sub", "e.bin").write_bytes(b"\x00\x01\x02")
+        Path(tree, "other").mkdir()
+        Path(tree, "other", "f.md").write_text("# f\n")
+        watcher.poll(0.1)
+        stats = watcher.stats()
+        expected = FileAnalyzer(str(tree)).analyze_directory()
+
+        # Files with equal sizes or line counts may be listed in another order
+        for key in ("largest_files", "longest_files"):
+            assert sorted(stats.pop(key), key=str) == sorted(expected.pop(key), key=str)
+        assert stats == expected
+
+    def test_excluded_changes_are_ignored(self, tree):
+        """Test that the analyzer's exclude patterns apply while watching."""
+        analyzer = FileAnalyzer(str(tree), exclude=["*.log"])
+        with DirectoryWatcher(analyzer, use_inotify=False) as watcher:
+            watcher.scan()
+            Path(tree, "sub", "noise.log").write_text("x\n")
+            assert watcher.poll() is None
+
+            Path(tree, "sub", "real.txt").write_text("x\n")
+            delta = watcher.poll()
+            assert [r["path"] for r in delta["added"]] == [os.path.join("sub", "real.txt")]
+
+    def test_no_lines_matches_analyzer(self, tree):
+        """Test that watching without line counts matches a --no-lines scan."""
+        analyzer = FileAnalyzer(str(tree), lines="none")
+        with DirectoryWatcher(analyzer, use_inotify=False) as watcher:
+            assert watcher.scan() == analyzer.analyze_directory()
+
+    @pytest.mark.skipif(not hasattr(os, "symlink") or sys.platform == "win32", reason="needs symlinks")
+    def test_unstatable_files_count_as_errors(self, tree):
+        """Test that files that cannot be stat'ed count like in a full scan."""
+        os.symlink(tree / "missing", tree / "sub" / "dangling")
+        with DirectoryWatcher(FileAnalyzer(str(tree)), use_inotify=False) as watcher:
+            assert watcher.scan() == FileAnalyzer(str(tree)).analyze_directory()
+            assert watcher.errors == 1
+
+            os.unlink(tree / "sub" / "dangling")
+            delta = watcher.poll(0.1)
+
+            assert delta["diff"]["total_files"] == -1
+            assert watcher.errors == 0
+
+    def test_uses_line_count_cache(self, tree, tmp_path_factory):
+        """Test that changed files are counted through the analyzer's cache."""
+        cache_path = str(tmp_path_factory.mktemp("cache") / "lines.db")
+        with DirectoryWatcher(FileAnalyzer(str(tree), cache=cache_path), use_inotify=False) as watcher:
+            watcher.scan()
+
+        path = tree / "a.txt"
+        with LineCountCache(cache_path) as cache:
+            assert cache.lookup(str(path), os.stat(path)) == 2
+
+    def test_rejects_estimate(self, tree):
+        """Test that watch mode refuses to estimate line counts."""
+        with pytest.raises(ValueError):
+            DirectoryWatcher(FileAnalyzer(str(tree), lines="estimate"))
+
+    @pytest.mark.parametrize("option", ["follow_symlinks", "one_file_system"])
+    def test_rejects_link_options(self, tree, option):
+        """Test that watch mode refuses to follow symlinks or stop at mounts."""
+        with pytest.raises(ValueError):
+            DirectoryWatcher(FileAnalyzer(str(tree), **{option: True}))
+
+    def test_rejects_limits(self, tree):
+        """Test that watch mode refuses scan limits."""
+        with pytest.raises(ValueError, match="limits"):
+            DirectoryWatcher(FileAnalyzer(str(tree), max_files=10))
+
+    def test_rejects_metrics(self, tree):
+        """Test that watch mode refuses content metrics."""
+        with pytest.raises(ValueError, match="metrics"):
+            DirectoryWatcher(FileAnalyzer(str(tree), metrics=True))
+
+    def test_rejects_file(self, tree):
+        """Test that watching a file raises NotADirectoryError."""
+        with pytest.raises(NotADirectoryError):
+            DirectoryWatcher(FileAnalyzer(str(tree / "a.txt")))